@@ -61,6 +61,9 @@ if TYPE_CHECKING:
     from src.backend.MediaManager import MediaManager
     from src.backend.PageManagement.PageManagerBackend import PageManagerBackend
     from src.backend.SettingsManager import SettingsManager
+    from src.backend.ContentHashIndex import ContentHashIndex
+    from src.backend.DeckManagement.FontRegistry import FontRegistry
+    from src.backend.DeckManagement.LabelCache import LabelCache
     from src.backend.DeckManagement.DeckManager import DeckManager
     from src.backend.PluginManager.PluginManager import PluginManager
     from src.backend.IconPackManagement.IconPackManager import IconPackManager
@@ -85,6 +88,9 @@ page_manager_window: "PageManager" = None # Only if opened
 page_manager:"PageManagerBackend" = None #PageManager #TODO: Rename to page_manager_backend in 2.0.0
 gnome_extensions:"GnomeExtensions" = None
 settings_manager:"SettingsManager" = None #SettingsManager
+font_registry: "FontRegistry" = None
+hash_index: "ContentHashIndex" = None
+label_cache: "LabelCache" = None
 app:"App" = None #App
 deck_manager:"DeckManager" = None #DeckManager
 plugin_manager:"PluginManager" = None #PluginManager
@@ -39,6 +39,9 @@ from src.backend.MediaManager import MediaManager
 from src.backend.AssetManagerBackend import AssetManagerBackend
 from src.backend.PageManagement.PageManagerBackend import PageManagerBackend
 from src.backend.SettingsManager import SettingsManager
+from src.backend.ContentHashIndex import ContentHashIndex
+from src.backend.DeckManagement.FontRegistry import FontRegistry
+from src.backend.DeckManagement.LabelCache import LabelCache
 from src.backend.PluginManager.PluginManager import PluginManager
 from src.backend.DeckManagement.HelperMethods import get_sys_args_without_param
 from src.backend.IconPackManagement.IconPackManager import IconPackManager
@@ -104,9 +107,13 @@ def create_global_objects():
 
     gl.flatpak_permission_manager = FlatpakPermissionManager()
 
+    gl.hash_index = ContentHashIndex()
+
     gl.gnome_extensions = GnomeExtensions()
 
     gl.settings_manager = SettingsManager()
+    gl.font_registry = FontRegistry()
+    gl.label_cache = LabelCache()
 
     gl.signal_manager = SignalManager()
 
@@ -145,14 +152,15 @@ def update_assets():
         return
 
     log.info("Updating store assets")
-    start = time.time()
-    number_of_installed_updates = asyncio.run(gl.store_backend.update_everything())
+    report = asyncio.run(gl.store_backend.run_updates())
+    number_of_installed_updates = gl.store_backend.get_update_count(report)
     if isinstance(number_of_installed_updates, NoConnectionError):
         log.error("Failed to update store assets")
         if hasattr(gl.app, "main_win"):
             gl.app.main_win.show_error_toast("Failed to update store assets")
         return
-    log.info(f"Updating {number_of_installed_updates} store assets took {time.time() - start} seconds")
+    for item in report.items:
+        log.debug(f"Store update of {item.kind} {item.asset_id}: {item.status}, download: {item.download_time:.2f}s, install: {item.install_time:.2f}s")
 
     if number_of_installed_updates <= 0:
         return
@@ -13,14 +13,45 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
-from src.Signals.Signals import AppQuit, Signal
+from dataclasses import dataclass, field
+import threading
+import time
+from loguru import logger as log
+
+from src.Signals.Signals import AppQuit, Signal, VideoCacheProgress
 
 from gi.repository import GLib
 
+@dataclass
+class CoalescingConfig:
+    mode: str # "last" or "batch"
+    key: callable = None # Only triggers with the same key replace each other in "last" mode
+    interval: float = 1 / 60 # Minimum seconds between two deliveries
+
+    # Pending triggers: {key: (args, kwargs)} in "last" mode, [(args, kwargs)] in "batch" mode
+    pending: object = None
+    flush_scheduled: bool = False
+    last_flush: float = 0
+
+    def __post_init__(self):
+        if self.mode not in ["last", "batch"]:
+            raise ValueError("mode must be 'last' or 'batch'")
+        self.pending = {} if self.mode == "last" else []
+
 class SignalManager:
     def __init__(self):
         self.connected_signals: dict = {}
 
+        self.lock = threading.Lock()
+        self.coalescing: dict[type, CoalescingConfig] = {}
+        # Number of triggers and number of triggers that actually reached the main loop, per signal
+        self.queued: dict[type, int] = {}
+        self.delivered: dict[type, int] = {}
+
+        # Coalescing changes which triggers the callbacks see, so signals have to opt in with set_coalescing.
+        # The video caches report their progress many times per second, only the latest one matters.
+        self.set_coalescing(VideoCacheProgress, mode="last", key=lambda video_path, *args, **kwargs: video_path, interval=0.1)
+
     def connect_signal(self, signal: Signal, callback: callable) -> None:
         # Verify signal
         if not issubclass(signal, Signal):
@@ -33,13 +64,107 @@ class SignalManager:
         self.connected_signals.setdefault(signal, [])
         self.connected_signals[signal].append(callback)
 
+    def set_coalescing(self, signal: Signal, mode: str = "last", key: callable = None, interval: float = 1 / 60) -> None:
+        """
+        Merges triggers of the signal that happen within interval seconds into one idle callback.
+        mode "last": only the latest arguments (per key, if given) are delivered.
+        mode "batch": callbacks get called once with a list of all (args, kwargs) tuples.
+        """
+        if not issubclass(signal, Signal):
+            raise TypeError("signal must be of type Signal")
+        with self.lock:
+            self.coalescing[signal] = CoalescingConfig(mode=mode, key=key, interval=interval)
+
+    def disable_coalescing(self, signal: Signal) -> None:
+        with self.lock:
+            self.coalescing.pop(signal, None)
+
     def trigger_signal(self, signal: Signal, *args, **kwargs) -> None:
         # Verify signal
         if not issubclass(signal, Signal):
             raise TypeError("signal must be of type Signal")
+
+        with self.lock:
+            self.queued[signal] = self.queued.get(signal, 0) + 1
+            config = self.coalescing.get(signal)
+            if config is not None and signal != AppQuit:
+                self.queue_coalesced(signal, config, args, kwargs)
+                return
         
         for callback in self.connected_signals.get(signal, []):
             if signal == AppQuit:
                 callback(*args, **kwargs)
             else:
-                GLib.idle_add(callback, *args, **kwargs)
\ No newline at end of file
+                GLib.idle_add(callback, *args, **kwargs)
+        self.count_delivered(signal)
+
+    def queue_coalesced(self, signal: Signal, config: CoalescingConfig, args: tuple, kwargs: dict) -> None:
+        """
+        Has to be called with the lock held
+        """
+        if config.mode == "last":
+            key = config.key(*args, **kwargs) if config.key is not None else None
+            # Re-insert to keep the order of the latest triggers
+            config.pending.pop(key, None)
+            config.pending[key] = (args, kwargs)
+        else:
+            config.pending.append((args, kwargs))
+
+        if config.flush_scheduled:
+            return
+        config.flush_scheduled = True
+
+        # Rate limit
+        delay = config.last_flush + config.interval - time.monotonic()
+        if delay > 0:
+            GLib.timeout_add(max(1, int(delay * 1000)), self.flush_coalesced, signal)
+        else:
+            GLib.idle_add(self.flush_coalesced, signal)
+
+    def flush_coalesced(self, signal: Signal) -> bool:
+        with self.lock:
+            config = self.coalescing.get(signal)
+            if config is None:
+                return False
+            pending = config.pending
+            config.pending = {} if config.mode == "last" else []
+            config.flush_scheduled = False
+            config.last_flush = time.monotonic()
+
+        callbacks = self.connected_signals.get(signal, [])
+        if config.mode == "last":
+            for args, kwargs in pending.values():
+                for callback in callbacks:
+                    self.run_callback(callback, *args, **kwargs)
+                self.count_delivered(signal)
+        elif len(pending) > 0:
+            for callback in callbacks:
+                self.run_callback(callback, pending)
+            self.count_delivered(signal)
+
+        # Don't repeat
+        return False
+
+    def run_callback(self, callback: callable, *args, **kwargs) -> None:
+        # One failing callback must not keep the others from getting the signal
+        try:
+            callback(*args, **kwargs)
+        except Exception as e:
+            log.exception(f"Signal callback {callback} failed: {e}")
+
+    def count_delivered(self, signal: Signal) -> None:
+        with self.lock:
+            self.delivered[signal] = self.delivered.get(signal, 0) + 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns the number of queued and delivered triggers per signal name
+        """
+        with self.lock:
+            return {
+                signal.__name__: {
+                    "queued": self.queued.get(signal, 0),
+                    "delivered": self.delivered.get(signal, 0),
+                }
+                for signal in set(self.queued) | set(self.delivered)
+            }
@@ -58,4 +58,11 @@ class RemoveState(Signal):
     Callback:
     state: int
     state_map: dict {old_int: new_int}
-    """
\ No newline at end of file
+    """
+
+class VideoCacheProgress(Signal):
+    """
+    Callback:
+    video_path: str
+    progress: float (0 to 1)
+    """
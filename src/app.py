@@ -167,16 +167,23 @@ class App(Adw.Application):
 
         # Close all decks
         gl.deck_manager.close_all()
+
+        # Write the settings that are still waiting for their debounced save, including the ones saved during the teardown
+        gl.settings_manager.flush()
+
         # Stop timer
         log.success("Stopped StreamController. Have a nice day!")
         sys.exit(0)
 
     def force_quit(self):
         log.info("Forcing quit...")
+        # os._exit skips the atexit handlers
+        gl.settings_manager.flush()
         os._exit(1)
 
     def register_sigint_handler(self):
         signal.signal(signal.SIGINT, self.on_quit)
+        signal.signal(signal.SIGTERM, self.on_quit)
 
     def add_signals(self):
         self.update_all_assets_action = Gio.SimpleAction.new("update-all-assets", None)
@@ -216,8 +223,8 @@ class App(Adw.Application):
             self.set_working(False)
             return
         
-        success = asyncio.run(gl.store_backend.install_plugin(plugin))
-        if not success:
+        response = asyncio.run(gl.store_backend.install_plugin(plugin))
+        if gl.store_backend.get_download_error(response) is not None:
             gl.app.send_notification("dialog-information-symbolic", "Failed to install plugin",
                                      f"The plugin {plugin_id} could not be installed")
         else:
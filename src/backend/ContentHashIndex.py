@@ -0,0 +1,116 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+# Import Python modules
+import hashlib
+import json
+import os
+import threading
+from loguru import logger as log
+
+# Import globals
+import globals as gl
+
+class ContentHashIndex:
+    """
+    Persistent index of file hashes.
+    A hash is only recomputed if the size, modification time or inode of the file changed.
+    """
+    CHUNK_SIZE = 2**20
+    SAVE_DELAY = 2 # Seconds to wait for more changes before writing the index
+
+    def __init__(self, index_path: str = None):
+        if index_path is None:
+            index_path = os.path.join(gl.DATA_PATH, "cache", "hash_index.json")
+        self.index_path = index_path
+
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        self.save_timer: threading.Timer = None
+
+        self.load()
+
+    @staticmethod
+    def compute_hash(file_path: str, algorithm: str = "sha256") -> str:
+        hasher = hashlib.new(algorithm)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(ContentHashIndex.CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def get_hash(self, file_path: str, algorithm: str = "sha256") -> str:
+        """
+        Returns the hash of the file or None if it doesn't exist
+        """
+        file_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+
+        key = f"{algorithm}:{file_path}"
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and self.matches_stat(entry, stat):
+            return entry["digest"]
+
+        digest = self.compute_hash(file_path, algorithm)
+
+        with self.lock:
+            self.entries[key] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "inode": stat.st_ino,
+                "digest": digest,
+            }
+        self.schedule_save()
+
+        return digest
+
+    def matches_stat(self, entry: dict, stat: os.stat_result) -> bool:
+        return entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("inode") == stat.st_ino
+
+    def load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path) as f:
+                entries = json.load(f)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.error(f"Failed to load hash index, starting with an empty one: {e}")
+            return
+
+        # Forget files that don't exist anymore
+        self.entries = {key: entry for key, entry in entries.items() if os.path.exists(key.split(":", 1)[1])}
+
+    def schedule_save(self) -> None:
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+            self.save_timer = threading.Timer(self.SAVE_DELAY, self.save)
+            self.save_timer.setDaemon(True)
+            self.save_timer.setName("SaveHashIndex")
+            self.save_timer.start()
+
+    @log.catch
+    def save(self) -> None:
+        with self.lock:
+            self.save_timer = None
+            entries = dict(self.entries)
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.index_path)
@@ -13,6 +13,7 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 # Import Python modules
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from copy import copy
 from functools import lru_cache
@@ -37,6 +38,9 @@ import asyncio
 from src.backend.DeckManagement.Subclasses.SingleKeyAsset import SingleKeyAsset
 from src.backend.DeckManagement.Subclasses.background_video_cache import BackgroundVideoCache
 from src.backend.DeckManagement.Subclasses.key_video_cache import VideoFrameCache
+from src.backend.DeckManagement.Subclasses.key_render_cache import KeyRenderCache
+from src.backend.DeckManagement.Subclasses.action_executor import ActionExecutor
+from src.backend.DeckManagement.Subclasses.tick_registry import TickRegistry
 from src.backend.DeckManagement.Subclasses.KeyImage import InputImage
 from src.backend.DeckManagement.Subclasses.KeyVideo import InputVideo
 from src.backend.DeckManagement.Subclasses.KeyLabel import KeyLabel
@@ -124,18 +128,27 @@ class MediaPlayerSetImageTask:
 
     n_failed_in_row: ClassVar[dict] = {}
 
-    def run(self):
+    def run(self) -> bool:
+        """
+        Returns True if the image has been written to the deck
+        """
         try:
             self.deck_controller.deck.set_key_image(self.key_index, self.native_image)
             self.native_image = None
             del self.native_image
             MediaPlayerSetImageTask.n_failed_in_row[self.deck_controller.serial_number()] = 0
+            return True
         except StreamDeck.TransportError as e:
             log.error(f"Failed to set deck key image. Error: {e}")
 
+            # The deck doesn't show the cached image - send it again on the next update
+            key = self.deck_controller.get_key_by_index(self.key_index)
+            if key is not None:
+                key.render_cache.forget_deck_image()
+
             beta_resume = gl.settings_manager.get_app_settings().get("system", {}).get("beta-resume-mode", True)
             if beta_resume:
-                return
+                return False
 
             MediaPlayerSetImageTask.n_failed_in_row[self.deck_controller.serial_number()] += 1
             if MediaPlayerSetImageTask.n_failed_in_row[self.deck_controller.serial_number()] > 5:
@@ -147,9 +160,54 @@ class MediaPlayerSetImageTask:
                 gl.deck_manager.remove_controller(self.deck_controller)
 
                 gl.deck_manager.connect_new_decks()
+            return False
+
 
+class MediaSchedule:
+    """
+    Keeps track of when the next frame of a media source (background video, key video, dial video) is due.
+    """
+    def __init__(self, media, fps: float, max_fps: float):
+        self.media = media
+        self.fps = fps
+        self.interval: float = 1 / max(1, min(fps or max_fps, max_fps))
+        self.next_due: float = time.monotonic()
+
+        self.frames_shown: int = 0
+        self.frames_dropped: int = 0
+        self.shown_times: deque[float] = deque(maxlen=30)
+
+    def take_due_frame(self, now: float) -> int:
+        """
+        Advances the deadline past now.
+        Returns the number of frames that have to be dropped to catch up.
+        """
+        late = int((now - self.next_due) / self.interval)
+        self.next_due += (late + 1) * self.interval
+
+        self.frames_shown += 1
+        self.frames_dropped += late
+        self.shown_times.append(now)
+        return late
+
+    def get_achieved_fps(self) -> float:
+        if len(self.shown_times) < 2:
+            return 0
+        duration = self.shown_times[-1] - self.shown_times[0]
+        if duration <= 0:
+            return 0
+        return (len(self.shown_times) - 1) / duration
+
+@dataclass
+class FrameCommitStats:
+    usb_time: float
+    bytes_sent: int
+    keys_written: int
+    keys_skipped: int
 
 class MediaPlayerThread(threading.Thread):
+    STATS_LOG_INTERVAL = 10 # Seconds between two performance debug logs while media is playing
+
     def __init__(self, deck_controller: "DeckController"):
         super().__init__(name="MediaPlayerThread", daemon=True)
         self.deck_controller: DeckController = deck_controller
@@ -165,8 +223,19 @@ class MediaPlayerThread(threading.Thread):
         self.image_tasks = {}
         self.touchscreen_task = None
 
+        # Notified whenever there is new work - the thread parks on it until the next frame is due
+        self.wakeup = threading.Condition()
+        self.wakeup_pending: bool = False
+
+        self.media_schedules: dict[object, MediaSchedule] = {}
+
+        # Last payload that has successfully been written to each key
+        self.written_key_images: dict[int, bytes] = {}
+        self.frame_commit_stats: deque[FrameCommitStats] = deque(maxlen=self.FPS * 2)
+
         self.fps: list[float] = []
         self.old_warning_state = False
+        self.last_stats_log: float = time.monotonic()
 
         self.show_fps_warnings = gl.settings_manager.get_app_settings().get("warnings", {}).get("enable-fps-warnings", True)
 
@@ -175,61 +244,163 @@ class MediaPlayerThread(threading.Thread):
         self.running = True
 
         while True:
-            start = time.time()
+            start = time.monotonic()
 
             # self.check_connection()
 
             if not self.pause:
-                if self.deck_controller.background.video is not None:
-                    if self.deck_controller.background.video.page is self.deck_controller.active_page:
-                        # There is a background video
-                        video_each_nth_frame = self.FPS // self.deck_controller.background.video.fps
-                        if self.media_ticks % video_each_nth_frame == 0:
-                            self.deck_controller.background.update_tiles()
-
-                #TODO: generalize
-                for key in self.deck_controller.inputs[Input.Key]:
-                    key_state = key.get_active_state()
-                    if key_state.key_video is not None:
-                        video_each_nth_frame = self.FPS // key_state.key_video.fps
-                        if self.media_ticks % video_each_nth_frame == 0:
-                            key.update()
-                    elif self.deck_controller.background.video is not None:
-                        key.update()
-
-                for dial in self.deck_controller.inputs[Input.Dial]:
-                    dial_state = dial.get_active_state()
-                    if dial_state.video is not None:
-                        video_each_nth_frame = self.FPS // dial_state.video.fps
-                        if self.media_ticks % video_each_nth_frame == 0:
-                            dial.update()
-
-                # self.deck_controller.update_all_inputs()
+                self.play_due_media(start)
 
                 # Perform media player tasks
                 self.perform_media_player_tasks()
 
             self.media_ticks += 1
 
-            # Wait for approximately 1/30th of a second before the next call
-            end = time.time()
-            # print(f"possible FPS: {1 / (end - start)}")
-            self.append_fps(1 / (end - start))
-            self.update_low_fps_warning()
-            wait = max(0, 1/self.FPS - (end - start))
-            time.sleep(wait)
+            end = time.monotonic()
+            if len(self.media_schedules) > 0:
+                if end > start:
+                    self.append_fps(1 / (end - start))
+                self.update_low_fps_warning()
+                self.log_performance_stats(end)
+            elif len(self.fps) > 0:
+                # Nothing is playing anymore - the fps of the last playback are meaningless now
+                self.fps.clear()
+                self.update_low_fps_warning()
+
+            if self._stop:
+                break
+
+            # Sleep until the next frame is due or new work arrives
+            self.park(self.get_wait_time())
 
             if self._stop:
                 break
 
         self.running = False
 
+    def get_media_sources(self) -> list[tuple[object, object, callable]]:
+        """
+        Returns (source key, media, callback) for every media that is currently playing on the deck
+        """
+        sources = []
+
+        background_video = self.deck_controller.background.video
+        if background_video is not None and background_video.page is self.deck_controller.active_page:
+            sources.append(("background", background_video, self.show_next_background_frame))
+
+        for key in self.deck_controller.inputs.get(Input.Key, []):
+            key_video = key.get_active_state().key_video
+            if key_video is not None:
+                sources.append((key.identifier, key_video, key.update))
+
+        for dial in self.deck_controller.inputs.get(Input.Dial, []):
+            dial_video = dial.get_active_state().video
+            if dial_video is not None:
+                sources.append((dial.identifier, dial_video, dial.update))
+
+        return sources
+
+    def play_due_media(self, now: float) -> None:
+        active_sources = set()
+        for source_key, media, callback in self.get_media_sources():
+            active_sources.add(source_key)
+
+            schedule = self.media_schedules.get(source_key)
+            if schedule is None or schedule.media is not media or schedule.fps != media.fps:
+                schedule = MediaSchedule(media, media.fps, self.FPS)
+                self.media_schedules[source_key] = schedule
+
+            if now < schedule.next_due:
+                continue
+
+            late = schedule.take_due_frame(now)
+            if late > 0:
+                # Drop the frames we missed instead of playing the video in slow motion
+                media.skip_frames(late)
+                log.trace(f"Dropped {late} frames of {source_key} on deck {self.deck_controller.serial_number()}")
+
+            callback()
+
+        # Forget sources that stopped playing
+        for source_key in list(self.media_schedules.keys()):
+            if source_key not in active_sources:
+                del self.media_schedules[source_key]
+
+    def show_next_background_frame(self) -> None:
+        self.deck_controller.background.update_tiles()
+
+        # Keys with their own video are updated on their own schedule
+        for key in self.deck_controller.inputs.get(Input.Key, []):
+            if key.get_active_state().key_video is None:
+                key.update()
+
+    def get_wait_time(self) -> float:
+        """
+        Returns the seconds until the next frame is due or None if the thread can stay idle until woken
+        """
+        if self.pause or len(self.media_schedules) == 0:
+            return None
+        next_due = min(schedule.next_due for schedule in self.media_schedules.values())
+        return max(0, next_due - time.monotonic())
+
+    def get_achieved_fps(self) -> dict:
+        """
+        Returns the achieved fps and number of dropped frames of each playing media source
+        """
+        return {
+            str(source_key): {
+                "fps": schedule.get_achieved_fps(),
+                "target-fps": 1 / schedule.interval,
+                "dropped-frames": schedule.frames_dropped,
+            }
+            for source_key, schedule in list(self.media_schedules.items())
+        }
+
+    def log_performance_stats(self, now: float) -> None:
+        if now - self.last_stats_log < self.STATS_LOG_INTERVAL:
+            return
+        self.last_stats_log = now
+
+        for source_key, stats in self.get_achieved_fps().items():
+            log.debug(f"Media {source_key} on deck {self.deck_controller.serial_number()}: {stats['fps']:.1f}/{stats['target-fps']:.1f} fps, "
+                      f"{stats['dropped-frames']} dropped frames")
+
+        render_stats = {"hits": 0, "resends": 0, "misses": 0}
+        for key in getattr(self.deck_controller, "inputs", {}).get(Input.Key, []):
+            for name, value in key.render_cache.get_stats().items():
+                render_stats[name] += value
+        log.debug(f"Key renders on deck {self.deck_controller.serial_number()}: {render_stats['hits']} skipped, "
+                  f"{render_stats['resends']} re-sent from the cache, {render_stats['misses']} rendered")
+
+        usb_stats = self.get_usb_stats()
+        if len(usb_stats) > 0:
+            log.debug(f"USB writes on deck {self.deck_controller.serial_number()} over the last {usb_stats['frames']} frames: "
+                      f"{usb_stats['avg-usb-time'] * 1000:.1f} ms and {usb_stats['avg-bytes-sent'] / 1024:.1f} KiB per frame, "
+                      f"{usb_stats['keys-written']} keys written, {usb_stats['keys-skipped']} unchanged keys skipped")
+
+    def park(self, timeout: float = None) -> None:
+        with self.wakeup:
+            if not self.wakeup_pending:
+                self.wakeup.wait(timeout)
+            self.wakeup_pending = False
+
+    def wake(self) -> None:
+        with self.wakeup:
+            self.wakeup_pending = True
+            self.wakeup.notify()
+
+    def set_pause(self, pause: bool) -> None:
+        self.pause = pause
+        self.wake()
+
     def append_fps(self, fps: float) -> None:
         self.fps.append(fps)
         if len(self.fps) > self.FPS *2:
             self.fps.pop(0)
 
     def get_median_fps(self) -> float:
+        if len(self.fps) == 0:
+            return self.FPS
         return statistics.median(self.fps)
     
     def update_low_fps_warning(self):
@@ -262,6 +433,7 @@ class MediaPlayerThread(threading.Thread):
 
     def stop(self) -> None:
         self._stop = True
+        self.wake()
         while self.running:
             time.sleep(0.1)
 
@@ -273,6 +445,7 @@ class MediaPlayerThread(threading.Thread):
             args=args,
             kwargs=kwargs
         ))
+        self.wake()
 
     def add_touchscreen_task(self, native_image: bytes):
         self.touchscreen_task = MediaPlayerSetTouchscreenImageTask(
@@ -280,6 +453,7 @@ class MediaPlayerThread(threading.Thread):
             page=self.deck_controller.active_page,
             native_image=native_image
         )
+        self.wake()
 
     def add_image_task(self, key_index: int, native_image: bytes):
         self.image_tasks[key_index] = MediaPlayerSetImageTask(
@@ -288,6 +462,7 @@ class MediaPlayerThread(threading.Thread):
             key_index=key_index,
             native_image=native_image
         )
+        self.wake()
 
     def perform_media_player_tasks(self):
         for task in self.tasks.copy():
@@ -299,17 +474,70 @@ class MediaPlayerThread(threading.Thread):
             except ValueError:
                 pass
 
-        for key in list(self.image_tasks.keys()):
-            try:
-                self.image_tasks[key].run()
-                del self.image_tasks[key]
-            except KeyError:
-                pass
+        self.commit_key_images()
 
         if self.touchscreen_task is not None:
             self.touchscreen_task.run()
             del self.touchscreen_task
             self.touchscreen_task = None
+
+    def commit_key_images(self) -> None:
+        """
+        Writes all key images collected for this frame in one pass while holding the device lock only once.
+        Images that are identical to what the deck already shows are skipped.
+        """
+        if len(self.image_tasks) == 0:
+            return
+
+        # Collect the images of this frame - only the latest image of each key is kept
+        frame_tasks: list[MediaPlayerSetImageTask] = []
+        for key in list(self.image_tasks.keys()):
+            task = self.image_tasks.pop(key, None)
+            if task is not None:
+                frame_tasks.append(task)
+
+        stats = FrameCommitStats(usb_time=0, bytes_sent=0, keys_written=0, keys_skipped=0)
+
+        start = time.perf_counter()
+        with self.deck_controller.deck:
+            for task in frame_tasks:
+                native_image = task.native_image
+                if native_image is not None and self.written_key_images.get(task.key_index) == native_image:
+                    stats.keys_skipped += 1
+                    continue
+
+                if task.run():
+                    self.written_key_images[task.key_index] = native_image
+                    stats.keys_written += 1
+                    stats.bytes_sent += len(native_image or b"")
+                else:
+                    self.written_key_images.pop(task.key_index, None)
+
+                if not self.running:
+                    # The deck has been removed
+                    break
+        stats.usb_time = time.perf_counter() - start
+
+        self.frame_commit_stats.append(stats)
+
+    def get_usb_stats(self) -> dict:
+        """
+        Returns the average usb write time and traffic of the recently committed frames
+        """
+        frames = list(self.frame_commit_stats)
+        if len(frames) == 0:
+            return {}
+        return {
+            "frames": len(frames),
+            "avg-usb-time": sum(f.usb_time for f in frames) / len(frames),
+            "avg-bytes-sent": sum(f.bytes_sent for f in frames) / len(frames),
+            "keys-written": sum(f.keys_written for f in frames),
+            "keys-skipped": sum(f.keys_skipped for f in frames),
+        }
+
+    def forget_written_key_images(self) -> None:
+        self.written_key_images.clear()
+
     def check_connection(self):
         try:
             self.deck_controller.deck.get_firmware_version()
@@ -352,6 +580,8 @@ class DeckController:
 
         # Tasks
         self.media_player_tasks: Queue[MediaPlayerTask] = Queue()
+        # Runs the callbacks of the actions - serialized per input
+        self.action_executor = ActionExecutor(name=f"actions_{self.deck.get_serial_number()}")
 
         self.ui_image_changes_while_hidden: dict = {}
 
@@ -378,6 +608,8 @@ class DeckController:
 
         self.keep_actions_ticking = True
         self.TICK_DELAY = 1
+        # Actions that want on_tick calls - filled by the pages when they create the action objects
+        self.tick_registry = TickRegistry(default_interval=self.TICK_DELAY)
         self.tick_thread = Thread(target=self.tick_actions, name="tick_actions")
         self.tick_thread.start()
 
@@ -433,6 +665,12 @@ class DeckController:
 
     def set_deck_key_image(self, key: int, image) -> None:
         if not self.get_alive(): return
+        # Written outside of the media player - neither it nor the key's render cache know what the key shows now
+        self.media_player.written_key_images.pop(key, None)
+        for controller_key in getattr(self, "inputs", {}).get(Input.Key, []):
+            if controller_key.index == key:
+                controller_key.render_cache.forget_deck_image()
+                break
         try:
             with self.deck:
                 self.deck.set_key_image(key, image)
@@ -674,6 +912,7 @@ class DeckController:
 
         old_tick = self.media_player.media_ticks
         old_time = time.time()
+        self.notify_media_changed()
         while self.media_player.media_ticks <= old_tick and time.time() - old_time <= 0.5:
             time.sleep(0.05)
 
@@ -707,23 +946,39 @@ class DeckController:
 
     def tick_actions(self) -> None:
         time.sleep(self.TICK_DELAY)
+        next_screen_saver_update = 0
         while self.keep_actions_ticking:
-            start = time.time()
+            now = time.monotonic()
             self.mark_page_ready_to_clear(False)
-            if not self.screen_saver.showing and True:
-                for t in self.inputs:
-                    for i in self.inputs[t]:
-                        i.get_active_state().own_actions_tick_threaded()
-            else:
+            if not self.screen_saver.showing:
+                # Only actions that subscribed to ticks and are due
+                for action in self.tick_registry.pop_due_actions(now):
+                    self.tick_action(action)
+            elif now >= next_screen_saver_update:
                 for t in self.inputs:
                     for i in self.inputs[t]:
                         i.update()
+                next_screen_saver_update = now + self.TICK_DELAY
 
             self.mark_page_ready_to_clear(True)
 
-            end = time.time()
-            wait = max(0.1, self.TICK_DELAY - (end - start))
-            time.sleep(wait)
+            wait = self.tick_registry.get_time_until_next_due()
+            if wait is None or self.screen_saver.showing:
+                wait = self.TICK_DELAY
+            self.tick_registry.wait(min(max(0.01, wait), self.TICK_DELAY))
+
+    def tick_action(self, action: ActionBase) -> None:
+        if not action.on_ready_called:
+            return
+        # Only tick actions on the active page and of the active state of their input
+        if self.active_page is None or action.page is not self.active_page:
+            return
+        controller_input = self.get_input(action.input_ident)
+        if controller_input is None or controller_input.state != action.state:
+            return
+
+        # Runs in order with the events of the input, skipped if the previous tick is still waiting
+        self.action_executor.submit(action.input_ident, action.on_tick, coalesce=True)
 
     # -------------- #
     # Helper methods #
@@ -771,6 +1026,7 @@ class DeckController:
     def clear(self):
         if not self.is_visual():
             return
+        self.invalidate_render_caches()
         alpha_image = self.generate_alpha_key()
         native_image = PILHelper.to_native_key_format(self.deck, alpha_image.convert("RGB"))
         for i in range(self.deck.key_count()):
@@ -795,10 +1051,30 @@ class DeckController:
         self.own_key_grid = deck_stack_child.page_settings.deck_config.grid
         return deck_stack_child.page_settings.deck_config.grid
     
+    def notify_media_changed(self) -> None:
+        """
+        Wakes the media player so that it picks up new or changed videos
+        """
+        if hasattr(self, "media_player"):
+            self.media_player.wake()
+
+    def invalidate_render_caches(self):
+        """
+        Forces the next update of each key to send its image again.
+        Needed whenever the deck might show something else than the last rendered image.
+        """
+        for key in getattr(self, "inputs", {}).get(Input.Key, []):
+            key.render_cache.forget_deck_image()
+        if hasattr(self, "media_player"):
+            self.media_player.forget_written_key_images()
+
     def clear_media_player_tasks(self):
         ticks = self.media_player.media_ticks
         self.media_player.tasks.clear()
         self.media_player.image_tasks.clear()
+        # Dropped image tasks never reached the deck
+        self.invalidate_render_caches()
+        self.media_player.wake()
 
         # Wait until tick is over
         while self.media_player.media_ticks <= ticks:
@@ -824,6 +1100,9 @@ class DeckController:
         self.keep_actions_ticking = False
         self.deck.run_read_thread = False
 
+        if hasattr(self, "action_executor"):
+            self.action_executor.shutdown()
+
     def get_alive(self) -> bool:
         try:
             return self.deck.is_open()
@@ -839,26 +1118,36 @@ class Background:
         self.video = None
 
         self.tiles: list[Image.Image] = [None] * deck_controller.deck.key_count()
+        # False if the tiles are owned by someone else and must not be closed here
+        self.tiles_owned: bool = True
+        # Incremented on every tile change - part of the key render fingerprints
+        self.tiles_version: int = 0
 
     def set_image(self, image: "BackgroundImage", update: bool = True) -> None:
+        old_video = self.video
         self.image = image
-        if self.video is not None:
-            self.video.close()
         self.video = None
-        gc.collect()
 
+        # Replace the tiles first - the old ones belong to the video and become invalid once it is closed
         self.update_tiles()
+        if old_video is not None:
+            old_video.close()
+        gc.collect()
+
         if update:
             self.deck_controller.update_all_inputs()
 
     def set_video(self, video: "BackgroundVideo", update: bool = True) -> None:
-        if self.video is not None:
-            self.video.close()
+        old_video = self.video
         self.image = None
         self.video = video
-        gc.collect()
+        self.deck_controller.notify_media_changed()
 
         self.update_tiles()
+        if old_video is not None and old_video is not video:
+            old_video.close()
+        gc.collect()
+
         if update:
             self.deck_controller.update_all_inputs()
 
@@ -878,6 +1167,7 @@ class Background:
                     self.video.page = self.deck_controller.active_page
                     self.video.fps = fps
                     self.video.loop = loop
+                    self.deck_controller.notify_media_changed()
                     return
             self.set_video(BackgroundVideo(self.deck_controller, path, loop=loop, fps=fps), update=update)
         else:
@@ -890,13 +1180,21 @@ class Background:
 
     def update_tiles(self) -> None:
         old_tiles = self.tiles # Why store them and close them later? So that there is not key error if the media threads fetches them during the update
+        old_tiles_owned = self.tiles_owned
         if self.image is not None:
             self.tiles = self.image.get_tiles()
+            self.tiles_owned = True
         elif self.video is not None:
+            # Video tiles are views into the video cache, which also closes them
             self.tiles = self.video.get_next_tiles()
+            self.tiles_owned = False
         else:
             self.tiles = [self.deck_controller.generate_alpha_key() for _ in range(self.deck_controller.deck.key_count())]
+            self.tiles_owned = True
+        self.tiles_version += 1
 
+        if not old_tiles_owned:
+            return
         for tile in old_tiles:
             if tile is not None:
                 tile.close()
@@ -984,6 +1282,14 @@ class BackgroundVideo(BackgroundVideoCache):
 
         super().__init__(video_path, deck_controller=deck_controller)
 
+    def skip_frames(self, n: int) -> None:
+        self.active_frame += n
+        if self.active_frame >= self.n_frames:
+            if self.loop:
+                self.active_frame %= max(1, self.n_frames)
+            else:
+                self.active_frame = self.n_frames - 1
+
     def get_next_tiles(self) -> list[Image.Image]:
         # return [self.deck_controller.generate_alpha_key() for _ in range(self.deck_controller.deck.key_count())]
         self.active_frame += 1
@@ -992,12 +1298,8 @@ class BackgroundVideo(BackgroundVideoCache):
             if self.loop:
                 self.active_frame = 0
 
-        tiles =  self.get_tiles(self.active_frame)
-        try:
-            copied_tiles = [tile.copy() for tile in tiles]
-        except:
-            copied_tiles = [None for _ in range(len(tiles))]
-        return copied_tiles
+        # The tiles belong to the cache - they are not copied, Background.update_tiles doesn't close them
+        return self.get_tiles(self.active_frame)
 
         frame = self.get_next_frame()
         frame_full_sized_image = self.create_full_deck_sized_image(frame)
@@ -1097,6 +1399,18 @@ class KeyGIF(SingleKeyAsset):
     
     def get_raw_image(self) -> Image.Image:
         return self.get_next_frame()
+
+    def skip_frames(self, n: int) -> None:
+        self.active_frame += n
+        if self.active_frame >= len(self.frames):
+            if self.loop:
+                self.active_frame %= max(1, len(self.frames))
+            else:
+                self.active_frame = len(self.frames) - 1
+
+    def get_frame_id(self):
+        # Every call to get_raw_image advances the gif
+        return None
     
     def close(self) -> None:
         self.gif = None
@@ -1245,36 +1559,21 @@ class LabelManager:
         self.controller_input.update()
 
     def add_labels_to_image(self, image: Image.Image) -> Image.Image:
-        draw = ImageDraw.Draw(image)
-
         labels = self.get_composed_labels()
         for label in labels:
             text = labels[label].text
             if text in [None, ""]:
                 continue
 
-            font_path = labels[label].get_font_path()
-            color = tuple(labels[label].color)
-            font_size = labels[label].font_size
-            font = ImageFont.truetype(font_path, font_size)
-            outline_width = labels[label].outline_width
-            outline_color = tuple(labels[label].outline_color)
-
-            _, _, w, h = draw.textbbox((0, 0), text, font=font)
+            # Pre-rasterized by the label cache - static labels only get drawn once
+            layer, dest = gl.label_cache.get_label_layer(labels[label], label, image.size)
+            if layer is None:
+                continue
 
-            if label == "top":
-                position = (image.width / 2, h/2 + 3)
-            elif label == "bottom":
-                position = (image.width / 2, image.height - h/2 - 3)
+            if image.mode == "RGBA":
+                image.alpha_composite(layer, dest)
             else:
-                position = ((image.width - 0) / 2, (image.height - 0) / 2)
-
-            draw.text(position,
-                      text=text, font=font, anchor="mm", align="center",
-                      fill=color, stroke_width=outline_width,
-                      stroke_fill=outline_color)
-
-        del draw
+                image.paste(layer, dest, layer)
 
         return image.copy()
 
@@ -1496,17 +1795,20 @@ class ControllerInputState:
 
             action.event_callback(parsed_event, data)
 
+    # The threaded variants run on the action executor of the deck, in order per input
+
     def own_actions_ready_threaded(self) -> None:
-        threading.Thread(target=self.own_actions_ready, name="own_actions_ready").start()
+        self.deck_controller.action_executor.submit(self.controller_input.identifier, self.own_actions_ready)
 
     def own_actions_update_threaded(self) -> None:
-        threading.Thread(target=self.own_actions_update, name="own_actions_update").start()
+        self.deck_controller.action_executor.submit(self.controller_input.identifier, self.own_actions_update)
 
     def own_actions_tick_threaded(self) -> None:
-        threading.Thread(target=self.own_actions_tick, name="own_actions_tick").start()
+        # Don't pile up ticks if the previous one is still waiting
+        self.deck_controller.action_executor.submit(self.controller_input.identifier, self.own_actions_tick, coalesce=True)
 
     def own_actions_event_callback_threaded(self, event: InputEvent, data: dict = None, show_notifications: bool = False) -> None:
-        threading.Thread(target=self.own_actions_event_callback, args=(event, data, show_notifications), name="own_actions_event_callback").start()
+        self.deck_controller.action_executor.submit(self.controller_input.identifier, self.own_actions_event_callback, event, data, show_notifications)
 
     def remove_media(self) -> None:
         page = self.controller_input.deck_controller.active_page
@@ -1746,6 +2048,8 @@ class ControllerKey(ControllerInput):
 
         self.down_start_time: float = None
 
+        self.render_cache = KeyRenderCache()
+
     def on_hold_timer_end(self):
         state = self.get_active_state()
         state.own_actions_event_callback_threaded(
@@ -1772,17 +2076,120 @@ class ControllerKey(ControllerInput):
         return y * cols + x
 
     def update(self):
+        if self.update_from_native_video_frame():
+            return
+
+        fingerprint = self.get_render_fingerprint()
+        fresh, cached_native_image = self.render_cache.lookup(fingerprint)
+        if fresh:
+            # Nothing changed since the last render - the deck and the ui already show this image
+            return
+        if cached_native_image is not None:
+            # Only the deck lost the image, the ui still shows it
+            self.deck_controller.media_player.add_image_task(self.index, cached_native_image)
+            return
+
         image = self.get_current_image()
         rgb_image = image.convert("RGB")
 
+        native_image = None
         if self.deck_controller.is_visual():
             native_image = PILHelper.to_native_key_format(self.deck_controller.deck, rgb_image)
             rgb_image.close()
             self.deck_controller.media_player.add_image_task(self.index, native_image)
 
+        self.render_cache.store(fingerprint, native_image)
+
         del rgb_image
         self.set_ui_key_image(image)
 
+    def update_from_native_video_frame(self) -> bool:
+        """
+        Fast path for keys that show nothing but a video: the device payload of each frame is only encoded once
+        and replayed from the video afterwards.
+        Returns False if the key has to be rendered normally.
+        """
+        if not self.deck_controller.is_visual():
+            return False
+        state = self.get_active_state()
+        if not isinstance(state.key_video, InputVideo):
+            return False
+        if not self.is_plain_video_key(state):
+            return False
+
+        video = state.key_video
+        frame = video.get_next_frame()
+        if frame is None:
+            return True
+
+        frame_index = video.get_active_frame_index()
+        native_image = video.native_frames.get(frame_index)
+        if native_image is None:
+            image = state.layout_manager.add_image_to_background(frame, self.deck_controller.generate_alpha_key())
+            rgb_image = image.convert("RGB")
+            native_image = PILHelper.to_native_key_format(self.deck_controller.deck, rgb_image)
+            rgb_image.close()
+            image.close()
+            # While the frame is not decoded yet, get_next_frame returns the last decoded one in its place
+            if video.video_cache.is_decoded_frame(frame_index, frame):
+                video.native_frames[frame_index] = native_image
+
+        # The deck no longer shows what the render cache remembers
+        self.render_cache.invalidate()
+        self.deck_controller.media_player.add_image_task(self.index, native_image)
+        self.set_ui_key_image(frame)
+        return True
+
+    def is_plain_video_key(self, state: "ControllerKeyState") -> bool:
+        """
+        Checks if nothing but the video influences the image of the key
+        """
+        if state.background_color[-1] > 0:
+            return False
+        if state._show_error or self.is_pressed():
+            return False
+        if self.has_unavailable_action() and not self.deck_controller.screen_saver.showing:
+            return False
+
+        layout = state.layout_manager.get_composed_layout()
+        if (layout.valign, layout.halign, layout.fill_mode, layout.size) != (0, 0, "cover", 1):
+            return False
+
+        labels = state.label_manager.get_composed_labels()
+        for label in labels.values():
+            if label.text not in [None, ""]:
+                return False
+
+        return True
+
+    def get_render_fingerprint(self) -> tuple:
+        """
+        Returns a hashable summary of everything get_current_image depends on or None if the key can't be cached
+        """
+        state = self.get_active_state()
+
+        media_frame_id = None
+        media = state.key_image or state.key_video
+        if media is not None:
+            media_frame_id = media.get_frame_id()
+            if media_frame_id is None:
+                return None
+
+        labels = state.label_manager.get_composed_labels()
+        layout = state.layout_manager.get_composed_layout()
+
+        return (
+            self.state,
+            self.deck_controller.background.tiles_version,
+            tuple(state.background_color),
+            media_frame_id,
+            tuple(labels[position].get_fingerprint() for position in labels),
+            (layout.valign, layout.halign, layout.fill_mode, layout.size),
+            self.is_pressed(),
+            state._show_error,
+            self.has_unavailable_action() and not self.deck_controller.screen_saver.showing,
+        )
+
     def event_callback(self, press_state):
         screensaver_was_showing = self.deck_controller.screen_saver.showing
         if press_state:
@@ -2414,6 +2821,7 @@ class ControllerDialState(ControllerInputState):
             self.video.close()
 
         self.video = video
+        self.deck_controller.notify_media_changed()
 
 
     def get_rendered_touch_image(self) -> Image.Image:
@@ -2483,6 +2891,7 @@ class ControllerKeyState(ControllerInputState):
         if self.key_image is not None:
             self.key_image.close()
         self.key_image = None
+        self.deck_controller.notify_media_changed()
 
     def clear(self):
         self.key_image = None
@@ -0,0 +1,97 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+# Import Python modules
+from collections import OrderedDict
+import threading
+import matplotlib.font_manager
+from PIL import ImageFont
+
+# Import globals
+import globals as gl
+
+class FontRegistry:
+    """
+    Process wide LRU cache for fonts used to draw labels.
+    Avoids running matplotlib's findfont and parsing the font file for every rendered label.
+    """
+    def __init__(self, max_fonts: int = 128):
+        self.max_fonts = max_fonts
+        self.lock = threading.Lock()
+
+        self.fonts: OrderedDict[tuple, ImageFont.FreeTypeFont] = OrderedDict()
+        self.font_paths: OrderedDict[tuple, str] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get_font_path(self, family: str, weight: int = None, style: str = None) -> str:
+        if family in ["", None]:
+            family = gl.fallback_font
+
+        key = (family, weight, style)
+        with self.lock:
+            if key in self.font_paths:
+                self.font_paths.move_to_end(key)
+                return self.font_paths[key]
+
+        font_path = matplotlib.font_manager.findfont(
+            matplotlib.font_manager.FontProperties(
+                family=family,
+                weight=weight,
+                style=style
+            )
+        )
+
+        with self.lock:
+            self.font_paths[key] = font_path
+            if len(self.font_paths) > self.max_fonts:
+                self.font_paths.popitem(last=False)
+
+        return font_path
+
+    def get_font(self, family: str, weight: int, style: str, size: int) -> ImageFont.FreeTypeFont:
+        if family in ["", None]:
+            family = gl.fallback_font
+
+        key = (family, weight, style, size)
+        with self.lock:
+            if key in self.fonts:
+                self.fonts.move_to_end(key)
+                self.hits += 1
+                return self.fonts[key]
+            self.misses += 1
+
+        font = ImageFont.truetype(self.get_font_path(family, weight, style), size)
+
+        with self.lock:
+            self.fonts[key] = font
+            if len(self.fonts) > self.max_fonts:
+                self.fonts.popitem(last=False)
+
+        return font
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.fonts),
+                "max-size": self.max_fonts,
+            }
+
+    def clear(self) -> None:
+        with self.lock:
+            self.fonts.clear()
+            self.font_paths.clear()
@@ -14,7 +14,6 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from datetime import datetime
 from functools import lru_cache
-import hashlib
 import os
 import matplotlib.font_manager
 import sys
@@ -32,6 +31,26 @@ from gi.repository import Gdk, Pango
 # Import globals
 import globals as gl
 
+def file_hash(file_path, algorithm: str = "sha256"):
+    """
+    Returns the hash of a file.
+    Served from the persistent hash index, so unchanged files are not read again.
+
+    Args:
+        file_path (str): The path to the file.
+        algorithm (str): Any algorithm supported by hashlib.
+
+    Returns:
+        str: The hash of the file or None if it doesn't exist.
+    """
+    if not os.path.exists(file_path):
+        return
+    if gl.hash_index is None:
+        # Not created yet
+        from src.backend.ContentHashIndex import ContentHashIndex
+        return ContentHashIndex.compute_hash(file_path, algorithm)
+    return gl.hash_index.get_hash(file_path, algorithm)
+
 def sha256(file_path):
     """
     Calculates the sha256 hash of a file.
@@ -42,13 +61,7 @@ def sha256(file_path):
     Returns:
         str: The sha256 hash of the file.
     """
-    hash_sha256 = hashlib.sha256()
-    if not os.path.exists(file_path):
-        return
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_sha256.update(chunk)
-    return hash_sha256.hexdigest()
+    return file_hash(file_path, "sha256")
 
 def file_in_dir(file_path, directory) -> None:
     """
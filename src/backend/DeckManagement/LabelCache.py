@@ -0,0 +1,118 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+# Import Python modules
+from collections import OrderedDict
+import threading
+from PIL import Image, ImageDraw
+
+# Import typing
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.backend.DeckManagement.Subclasses.KeyLabel import KeyLabel
+
+class LabelCache:
+    """
+    Process wide LRU cache of pre-rasterized label layers.
+    Each entry holds the cropped RGBA layer of a label and the position it has to be pasted to,
+    so drawing a label becomes a single composite instead of a textbbox and a stroked draw.text.
+    """
+    def __init__(self, max_labels: int = 512):
+        self.max_labels = max_labels
+        self.lock = threading.Lock()
+
+        self.layers: OrderedDict[tuple, tuple[Image.Image, tuple[int, int]]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get_label_layer(self, label: "KeyLabel", position: str, image_size: tuple[int, int]) -> tuple[Image.Image, tuple[int, int]]:
+        """
+        Returns the rasterized label and the top left corner it has to be placed at.
+        Returns (None, None) if the label would not be visible at all.
+        """
+        key = (
+            label.text,
+            label.font_name,
+            label.font_weight,
+            label.style,
+            label.font_size,
+            tuple(label.color),
+            label.outline_width,
+            tuple(label.outline_color),
+            position,
+            tuple(image_size),
+        )
+
+        with self.lock:
+            if key in self.layers:
+                self.layers.move_to_end(key)
+                self.hits += 1
+                return self.layers[key]
+            self.misses += 1
+
+        layer, dest = self.render_label(label, position, image_size)
+
+        with self.lock:
+            self.layers[key] = (layer, dest)
+            if len(self.layers) > self.max_labels:
+                self.layers.popitem(last=False)
+
+        return layer, dest
+
+    def render_label(self, label: "KeyLabel", position: str, image_size: tuple[int, int]) -> tuple[Image.Image, tuple[int, int]]:
+        width, height = image_size
+        font = label.get_font()
+
+        layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(layer)
+
+        _, _, w, h = draw.textbbox((0, 0), label.text, font=font)
+
+        if position == "top":
+            xy = (width / 2, h/2 + 3)
+        elif position == "bottom":
+            xy = (width / 2, height - h/2 - 3)
+        else:
+            xy = (width / 2, height / 2)
+
+        draw.text(xy,
+                  text=label.text, font=font, anchor="mm", align="center",
+                  fill=tuple(label.color), stroke_width=label.outline_width,
+                  stroke_fill=tuple(label.outline_color))
+        del draw
+
+        # Only keep the part of the layer that actually contains the label
+        bbox = layer.getbbox()
+        if bbox is None:
+            layer.close()
+            return None, None
+
+        cropped = layer.crop(bbox)
+        layer.close()
+
+        return cropped, (bbox[0], bbox[1])
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.layers),
+                "max-size": self.max_labels,
+            }
+
+    def clear(self) -> None:
+        with self.lock:
+            self.layers.clear()
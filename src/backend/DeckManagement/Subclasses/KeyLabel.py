@@ -13,9 +13,8 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from src.backend.DeckManagement.Subclasses.SingleKeyAsset import SingleKeyAsset
-from PIL import Image
+from PIL import Image, ImageFont
 from dataclasses import dataclass
-import matplotlib.font_manager
 
 import globals as gl
 
@@ -36,21 +35,25 @@ class KeyLabel:
     outline_color: list[int] = None
 
     def get_font_path(self) -> str:
-        font_name = self.font_name
-        if self.font_name in ["", None]:
-            font_name = gl.fallback_font
-
-        return matplotlib.font_manager.findfont(
-            matplotlib.font_manager.FontProperties(
-                family=font_name,
-                weight=self.font_weight,
-                size=self.font_size,
-                style=self.style
-            )
-        )
+        return gl.font_registry.get_font_path(self.font_name, self.font_weight, self.style)
 
+    def get_font(self) -> ImageFont.FreeTypeFont:
+        return gl.font_registry.get_font(self.font_name, self.font_weight, self.style, self.font_size)
 
-        # return matplotlib.font_manager.findfont(matplotlib.font_manager.FontProperties(family=font_name))
+    def get_fingerprint(self) -> tuple:
+        """
+        Hashable representation of everything that influences how this label gets rendered
+        """
+        return (
+            self.text,
+            self.font_size,
+            self.font_name,
+            self.font_weight,
+            self.style,
+            tuple(self.color) if self.color is not None else None,
+            self.outline_width,
+            tuple(self.outline_color) if self.outline_color is not None else None,
+        )
 
     def clear_values(self):
         self.text = None
@@ -33,6 +33,9 @@ class InputVideo(SingleKeyAsset):
 
         self.active_frame: int = -1
 
+        # Final device payloads of each frame - only used if the key shows nothing but this video
+        self.native_frames: dict[int, bytes] = {}
+
     def get_next_frame(self) -> Image:
         self.active_frame += 1
 
@@ -44,4 +47,23 @@ class InputVideo(SingleKeyAsset):
     
     def get_raw_image(self) -> Image.Image:
         return self.get_next_frame()
+
+    def close(self) -> None:
+        self.video_cache.close()
+        self.native_frames.clear()
+
+    def get_active_frame_index(self) -> int:
+        return max(0, min(self.active_frame, self.video_cache.n_frames - 1))
+
+    def skip_frames(self, n: int) -> None:
+        self.active_frame += n
+        if self.active_frame >= self.video_cache.n_frames:
+            if self.loop:
+                self.active_frame %= max(1, self.video_cache.n_frames)
+            else:
+                self.active_frame = self.video_cache.n_frames - 1
+
+    def get_frame_id(self):
+        # Every call to get_raw_image advances the video
+        return None
      
\ No newline at end of file
@@ -14,17 +14,30 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 from PIL import Image, ImageOps, ImageDraw, ImageFont
+from itertools import count
 import os
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.backend.DeckManagement.DeckController import ControllerInput
 
+# Unique over the lifetime of the process - unlike id() which can be reused after an asset got garbage collected
+_asset_ids = count()
+
 class SingleKeyAsset:
     def __init__(self, controller_input: "ControllerInput"):
         self.controller_input = controller_input
         self.deck_controller = controller_input.deck_controller
 
+        self.asset_id: int = next(_asset_ids)
+
+    def get_frame_id(self):
+        """
+        Identifies the image the next get_raw_image call will return. Used to fingerprint rendered keys.
+        Returns None if this can't be known without decoding the frame (e.g. for videos)
+        """
+        return self.asset_id
+
     def get_raw_image(self) -> Image.Image:
         return Image.open(os.path.join("Assets", "images", "error.png"))
     
@@ -0,0 +1,226 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+import threading
+import time
+from loguru import logger as log
+
+@dataclass
+class ActionTask:
+    func: callable
+    args: tuple
+    kwargs: dict
+    coalesce: bool
+    queued_at: float = field(default_factory=time.monotonic)
+
+@dataclass
+class RunningTask:
+    key: object
+    task: ActionTask
+    started_at: float = field(default_factory=time.monotonic)
+    # True once the task counts as blocked and its worker slot has been handed to others
+    handed_off: bool = False
+
+class ActionExecutor:
+    """
+    Runs action callbacks on a bounded set of worker threads.
+    Tasks with the same key (e.g. the same input) run one after another in submission order,
+    so a DOWN event can never be overtaken by the following UP event. Different keys run in parallel.
+
+    Handlers that block (e.g. wait for a process) must not hold up the other inputs. A watchdog hands tasks that
+    run longer than BLOCKED_THRESHOLD off: a new worker takes their slot and serves the other keys.
+    The blocked task keeps its key, the following tasks of that key only start once it returns.
+    Its thread then schedules the next task of the key and ends.
+    """
+    SLOW_ACTION_THRESHOLD = 0.5 # Seconds
+    BLOCKED_THRESHOLD = 2 # Seconds
+
+    def __init__(self, name: str = "actions", max_workers: int = 8):
+        self.name = name
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+
+        self.queues: dict[object, deque[ActionTask]] = {}
+        # Keys that currently have a worker draining their queue or are waiting for one
+        self.running_keys: set = set()
+        # Keys waiting for a worker
+        self.ready_keys: deque = deque()
+
+        self.n_workers: int = 0 # Not counting the workers whose task has been handed off
+        self.idle_workers: int = 0
+        self.running: dict[threading.Thread, RunningTask] = {}
+        self.watchdog: threading.Thread = None
+
+        self.shut_down: bool = False
+
+        # Metrics
+        self.queued: int = 0
+        self.max_queued: int = 0
+        self.completed: int = 0
+        self.dropped: int = 0
+        self.slow_tasks: int = 0
+        self.handed_off: int = 0
+        self.max_wait_time: float = 0
+
+    def submit(self, key, func: callable, *args, coalesce: bool = False, **kwargs) -> None:
+        """
+        Queues func for the given key.
+        If coalesce is True, the task is dropped if the same function is already waiting for this key (used for ticks).
+        """
+        with self.lock:
+            if self.shut_down:
+                return
+
+            queue = self.queues.setdefault(key, deque())
+            if coalesce and any(task.coalesce and task.func == func for task in queue):
+                self.dropped += 1
+                return
+
+            queue.append(ActionTask(func, args, kwargs, coalesce))
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+            if key in self.running_keys:
+                return
+            self.running_keys.add(key)
+            self.schedule(key)
+
+    def schedule(self, key) -> None:
+        """
+        Has to be called with the lock held
+        """
+        self.ready_keys.append(key)
+        if self.idle_workers > 0:
+            self.condition.notify()
+        elif self.n_workers < self.max_workers:
+            self.start_worker()
+
+    def start_worker(self) -> None:
+        """
+        Has to be called with the lock held
+        """
+        self.n_workers += 1
+        threading.Thread(target=self.work, name=f"{self.name}_{self.n_workers}", daemon=True).start()
+
+        if self.watchdog is None:
+            self.watchdog = threading.Thread(target=self.watch, name=f"{self.name}_watchdog", daemon=True)
+            self.watchdog.start()
+
+    def work(self) -> None:
+        thread = threading.current_thread()
+        while True:
+            with self.lock:
+                while not self.ready_keys and not self.shut_down:
+                    self.idle_workers += 1
+                    self.condition.wait()
+                    self.idle_workers -= 1
+                if self.shut_down:
+                    self.n_workers -= 1
+                    return
+
+                key = self.ready_keys.popleft()
+                task = self.queues[key].popleft()
+                self.queued -= 1
+                running = RunningTask(key, task)
+                self.running[thread] = running
+
+            self.run_task(key, task)
+
+            with self.lock:
+                del self.running[thread]
+                self.completed += 1
+
+                # Only running one task per turn keeps busy inputs from starving the others
+                self.release_key(key)
+
+                if running.handed_off:
+                    # The worker slot belongs to another thread now
+                    return
+
+    def release_key(self, key) -> None:
+        """
+        Schedules the next task of the key. Has to be called with the lock held
+        """
+        if self.shut_down or not self.queues.get(key):
+            self.running_keys.discard(key)
+            self.queues.pop(key, None)
+            return
+        self.schedule(key)
+
+    def run_task(self, key, task: ActionTask) -> None:
+        start = time.monotonic()
+        self.max_wait_time = max(self.max_wait_time, start - task.queued_at)
+        try:
+            task.func(*task.args, **task.kwargs)
+        except Exception as e:
+            log.exception(f"Action task {getattr(task.func, '__qualname__', task.func)} failed: {e}")
+        duration = time.monotonic() - start
+
+        if duration > self.SLOW_ACTION_THRESHOLD:
+            self.slow_tasks += 1
+            log.warning(f"Slow action task {getattr(task.func, '__qualname__', task.func)} for {key} took {duration:.2f} seconds")
+
+    def watch(self) -> None:
+        """
+        Hands off tasks that have been running for longer than BLOCKED_THRESHOLD
+        """
+        while True:
+            time.sleep(self.BLOCKED_THRESHOLD / 4)
+            with self.lock:
+                if self.shut_down:
+                    return
+
+                now = time.monotonic()
+                for running in self.running.values():
+                    if running.handed_off or now - running.started_at < self.BLOCKED_THRESHOLD:
+                        continue
+                    running.handed_off = True
+                    self.handed_off += 1
+                    log.warning(f"Action task {getattr(running.task.func, '__qualname__', running.task.func)} for {running.key} "
+                                f"is blocked, running the other inputs without it")
+
+                    # The blocked thread leaves the pool but keeps its key until the task returns
+                    self.n_workers -= 1
+                    if self.ready_keys and self.idle_workers == 0:
+                        self.start_worker()
+
+    def get_queue_depth(self, key=None) -> int:
+        with self.lock:
+            if key is None:
+                return self.queued
+            return len(self.queues.get(key, ()))
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "queued": self.queued,
+                "max-queued": self.max_queued,
+                "completed": self.completed,
+                "dropped": self.dropped,
+                "slow": self.slow_tasks,
+                "handed-off": self.handed_off,
+                "max-wait-time": self.max_wait_time,
+            }
+
+    def shutdown(self) -> None:
+        with self.lock:
+            self.shut_down = True
+            self.queues.clear()
+            self.ready_keys.clear()
+            self.running_keys.clear()
+            self.queued = 0
+            self.condition.notify_all()
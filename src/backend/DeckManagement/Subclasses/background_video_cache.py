@@ -1,16 +1,21 @@
-import bz2
-import hashlib
+import mmap
 import os
 import pickle
+import struct
 import sys
 import threading
 import time
+import weakref
 from PIL import Image, ImageOps
 import cv2
 from StreamDeck.ImageHelpers import PILHelper
 import indexed_bzip2 as ibz2
 from loguru import logger as log
 
+from src.backend.DeckManagement.Subclasses.video_predecoder import VideoPreDecoder
+from src.backend.DeckManagement.HelperMethods import file_hash
+from src.Signals import Signals
+
 import globals as gl
 
 VID_CACHE = os.path.join(gl.DATA_PATH, "cache", "videos")
@@ -21,6 +26,102 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.backend.DeckManagement.DeckController import DeckController
 
+class TileFile:
+    """
+    Flat, memory-mapped file holding the raw RGBA tiles of every frame of a background video.
+
+    Layout:
+        header: magic, version, n_frames, key_count, tile width, tile height
+        offset table: (offset, length) for every tile, ordered by frame and then key index
+        data: the raw tile bytes
+
+    The file is mapped read-only and the tiles are stored as RGBA, which Pillow can map directly
+    instead of unpacking into a new buffer. Tiles are therefore only paged in when they are shown.
+    Decks showing the same video share the same mapping and therefore the same pages.
+    """
+    MAGIC = b"SCVT"
+    VERSION = 2
+    MODE = "RGBA"
+    HEADER = struct.Struct("<4sHIIHH")
+    ENTRY = struct.Struct("<QQ")
+
+    _open_files: "weakref.WeakValueDictionary[str, TileFile]" = weakref.WeakValueDictionary()
+    _open_files_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_frames, self.key_count, width, height = self.HEADER.unpack_from(self.mm, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.mm.close()
+            raise ValueError(f"{path} is not a tile file of version {self.VERSION}")
+        self.tile_size = (width, height)
+
+        table_end = self.HEADER.size + self.n_frames * self.key_count * self.ENTRY.size
+        if len(self.mm) < table_end:
+            self.mm.close()
+            raise ValueError(f"Tile file {path} is truncated")
+
+    @classmethod
+    def open(cls, path: str) -> "TileFile":
+        """
+        Returns the already open mapping of path if there is one, otherwise maps the file
+        """
+        with cls._open_files_lock:
+            tile_file = cls._open_files.get(path)
+            if tile_file is None:
+                tile_file = cls(path)
+                cls._open_files[path] = tile_file
+            return tile_file
+
+    @classmethod
+    def write(cls, path: str, frames: dict[int, list[Image.Image]], key_count: int, tile_size: tuple[int, int]) -> None:
+        """
+        Writes the tiles atomically - readers never see a partially written file
+        """
+        n_frames = len(frames)
+        tile_length = tile_size[0] * tile_size[1] * len(cls.MODE)
+        tmp_path = f"{path}.tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, n_frames, key_count, tile_size[0], tile_size[1]))
+
+                # All tiles have the same size, so the offsets are known before any tile is converted
+                data_start = cls.HEADER.size + n_frames * key_count * cls.ENTRY.size
+                for i in range(n_frames * key_count):
+                    f.write(cls.ENTRY.pack(data_start + i * tile_length, tile_length))
+
+                for n in range(n_frames):
+                    for tile in frames[n]:
+                        if tile.size != tuple(tile_size):
+                            raise ValueError(f"Tile of frame {n} has size {tile.size} instead of {tuple(tile_size)}")
+                        f.write(tile.convert(cls.MODE).tobytes())
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, path)
+
+    def get_tiles(self, n: int) -> list[Image.Image]:
+        tiles: list[Image.Image] = []
+        for key in range(self.key_count):
+            offset, length = self.ENTRY.unpack_from(self.mm, self.HEADER.size + (n * self.key_count + key) * self.ENTRY.size)
+            buffer = memoryview(self.mm)[offset:offset + length]
+            # RGBA with these raw arguments is mapped by Pillow, the image uses the buffer directly
+            tiles.append(Image.frombuffer(self.MODE, self.tile_size, buffer, "raw", self.MODE, 0, 1))
+        return tiles
+
+    def close(self) -> None:
+        try:
+            self.mm.close()
+        except BufferError:
+            # Some tiles are still in use - the mapping gets closed once they are garbage collected
+            pass
+
 class BackgroundVideoCache:
     def __init__(self, video_path, deck_controller: "DeckController") -> None:
         self.deck_controller = deck_controller
@@ -42,6 +143,12 @@ class BackgroundVideoCache:
         self.spacing = self.deck_controller.spacing
 
         self.cache_stored = False
+        self.tile_file: TileFile = None
+        self.predecoder: VideoPreDecoder = None
+
+        self.last_tiles: list[Image.Image] = []
+
+        self.do_caching = gl.settings_manager.get_app_settings().get("performance", {}).get("cache-videos", True)
 
         thread = threading.Thread(target=self.load_cache, name="load_video_cache")
         thread.start()
@@ -52,14 +159,19 @@ class BackgroundVideoCache:
         else:
             log.info("Cache is not complete. Continuing with video capture.")
 
-        self.last_tiles: list[Image.Image] = []
-
-        self.do_caching = gl.settings_manager.get_app_settings().get("performance", {}).get("cache-videos", True)
-
     def get_tiles(self, n):
         n = min(n, self.n_frames - 1)
         tiles = None
+
+        predecoder = self.predecoder
+        if predecoder is not None:
+            # Keep the read-ahead window in front of the playhead
+            predecoder.set_playhead(n)
+
         with self.lock:
+            if self.tile_file is not None:
+                return self.tile_file.get_tiles(n)
+
             if self.is_cache_complete():
                 self.cap.release()
                 return self.cache.get(n, None)
@@ -67,7 +179,14 @@ class BackgroundVideoCache:
             # Otherwise, continue with video capture
             # Check if the frame is already decoded
             if n in self.cache:
+                self.last_tiles = self.cache[n]
                 return self.cache[n]
+
+            if self.predecoder is not None and self.predecoder.will_decode(n):
+                # The frame is not decoded yet - keep showing the last one instead of decoding it on the media thread
+                if len(self.last_tiles) > 0:
+                    return self.last_tiles
+                return [self.deck_controller.generate_alpha_key() for _ in range(self.key_count)]
             
             # If the requested frame is before the last decoded one, reset the capture
             if n < self.last_frame_index:
@@ -84,24 +203,14 @@ class BackgroundVideoCache:
                 frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  
                 pil_image = Image.fromarray(frame_rgb)
 
-                # Resize the image
-                full_sized = self.create_full_deck_sized_image(pil_image)
-
-                tiles: list[Image.Image] = []
-                for key in range(self.key_count):
-                    current_tiles = self.crop_key_image_from_deck_sized_image(full_sized, key)
-                    tiles.append(current_tiles)
-
-                    if n >= self.n_frames - 1:
-                        if not self.is_cache_complete():
-                            self.save_cache_threaded()
+                tiles = self.split_frame_into_tiles(pil_image)
 
                 if self.do_caching:
                     self.cache[self.last_frame_index] = tiles
+                    if len(self.cache) == self.n_frames and not self.cache_stored:
+                        self.save_cache_threaded()
                 self.last_tiles = tiles
-                
 
-                full_sized.close()
                 pil_image.close()
 
 
@@ -112,6 +221,52 @@ class BackgroundVideoCache:
             tiles = [self.deck_controller.generate_alpha_key() for _ in range(self.deck_controller.deck.key_count())]
         return self.cache.get(n, tiles)
     
+    def split_frame_into_tiles(self, frame: Image.Image) -> list[Image.Image]:
+        full_sized = self.create_full_deck_sized_image(frame)
+
+        tiles: list[Image.Image] = []
+        for key in range(self.key_count):
+            tiles.append(self.crop_key_image_from_deck_sized_image(full_sized, key))
+
+        full_sized.close()
+        return tiles
+
+    def start_predecoder(self) -> None:
+        if not self.do_caching or self.n_frames <= 0:
+            return
+        with self.lock:
+            if self.tile_file is not None or self.predecoder is not None:
+                return
+            self.predecoder = VideoPreDecoder(
+                video_path=self.video_path,
+                n_frames=self.n_frames,
+                process_frame=self.split_frame_into_tiles,
+                on_frames=self.on_predecoded_frames,
+                on_progress=self.on_predecode_progress
+            )
+        self.predecoder.start()
+
+    def stop_predecoder(self) -> None:
+        predecoder = self.predecoder
+        self.predecoder = None
+        if predecoder is not None:
+            predecoder.stop()
+
+    def on_predecoded_frames(self, frames: dict[int, list[Image.Image]]) -> None:
+        with self.lock:
+            if getattr(self, "cache", None) is None or self.tile_file is not None:
+                return
+            self.cache.update(frames)
+            complete = len(self.cache) == self.n_frames and not self.cache_stored
+
+        if complete:
+            self.save_cache_threaded()
+
+    def on_predecode_progress(self, progress: float) -> None:
+        gl.signal_manager.trigger_signal(Signals.VideoCacheProgress, self.video_path, progress)
+        if progress >= 1:
+            log.info(f"Pre-decoded all frames of {self.video_path}")
+    
     def create_full_deck_sized_image(self, frame: Image.Image) -> Image.Image:
         key_width *= self.key_layout[0]
         key_height *= self.key_layout[1]
@@ -156,62 +311,122 @@ class BackgroundVideoCache:
         return segment
 
     def get_video_hash(self) -> str:
-        sha1sum = hashlib.md5()
-        with open(self.video_path, 'rb') as video:
-            block = video.read(2**16)
-            while len(block) != 0:
-                sha1sum.update(block)
-                block = video.read(2**16)
-            return sha1sum.hexdigest()
+        return file_hash(self.video_path, "md5")
         
     def save_cache_threaded(self):
         t = threading.Thread(target=self.save_cache, name="save_video_cache")
         t.start()
         
+    def get_tile_file_path(self) -> str:
+        return os.path.join(VID_CACHE, self.key_layout_str, f"{self.video_md5}_{self.key_size[0]}x{self.key_size[1]}.tiles")
+
+    def get_legacy_cache_path(self) -> str:
+        return os.path.join(VID_CACHE, self.key_layout_str, f"{self.video_md5}.cache")
+
     @log.catch
     def save_cache(self):
         """
-        Store cache using pickle
+        Store the tiles as a memory-mappable tile file and switch over to it
         """
         if self.cache_stored:
             return
         self.cache_stored = True
         
         start = time.time()
-        cache_path = os.path.join(VID_CACHE, self.key_layout_str, f"{self.video_md5}.cache")
+        cache_path = self.get_tile_file_path()
         os.makedirs(os.path.dirname(cache_path), exist_ok=True)
 
         data = self.cache.copy()
+        if not self.is_complete_frame_dict(data):
+            log.warning("Not saving incomplete video cache")
+            self.cache_stored = False
+            return
 
-        with bz2.open(cache_path, "wb") as f:
-            pickle.dump(data, f)
+        TileFile.write(cache_path, data, self.key_count, self.key_size)
 
         log.success(f"Saved cache in {time.time() - start:.2f} seconds")
         self.last_save = time.time()
         del data
 
+        self.use_tile_file(cache_path)
 
     @log.catch
     def load_cache(self, key_index: int = None):
-        cache_path = os.path.join(VID_CACHE, self.key_layout_str, f"{self.video_md5}.cache")
+        cache_path = self.get_tile_file_path()
         if not os.path.exists(cache_path):
+            self.migrate_legacy_cache()
+        if os.path.exists(cache_path):
+            self.use_tile_file(cache_path)
+
+        if self.tile_file is None:
+            self.start_predecoder()
+
+    def use_tile_file(self, path: str) -> None:
+        try:
+            tile_file = TileFile.open(path)
+        except (OSError, ValueError, struct.error) as e:
+            log.error(f"Failed to load cache: {e}")
+            os.remove(path)
             return
-        
-        # with open(os.path.join(VID_CACHE, "3x5", f"{self.video_md5}.pkl"), "rb") as f:
-            # self.cache = pickle.load(f)
-        
-        # return
+
+        if tile_file.n_frames != self.n_frames or tile_file.key_count != self.key_count or tile_file.tile_size != tuple(self.key_size):
+            log.warning(f"Cache {path} does not match the video, ignoring it")
+            return
+
+        with self.lock:
+            self.tile_file = tile_file
+            self.cache_stored = True
+            # The tiles are now served from the mapped file
+            self.cache = {}
+            if hasattr(self, "cap"):
+                self.cap.release()
+        self.stop_predecoder()
+        log.info(f"Using memory-mapped video cache {path}")
+
+    @log.catch
+    def migrate_legacy_cache(self) -> None:
+        """
+        Converts a bz2-pickled cache from older versions into a tile file
+        """
+        legacy_path = self.get_legacy_cache_path()
+        if not os.path.exists(legacy_path):
+            return
+
         _time = time.time()
         try:
-            with ibz2.open(cache_path, parallelization=os.cpu_count()) as f:
-                self.cache = pickle.load(f)
-            log.success(f"Loaded cache in {time.time() - _time:.2f} seconds")
+            with ibz2.open(legacy_path, parallelization=os.cpu_count()) as f:
+                legacy_cache = pickle.load(f)
         except Exception as e:
-            os.remove(cache_path)
-            log.error(f"Failed to load cache: {e}")
+            os.remove(legacy_path)
+            log.error(f"Failed to load legacy cache: {e}")
             return
 
+        if self.is_complete_frame_dict(legacy_cache):
+            TileFile.write(self.get_tile_file_path(), legacy_cache, self.key_count, self.key_size)
+            log.success(f"Migrated legacy video cache in {time.time() - _time:.2f} seconds")
+        else:
+            log.warning(f"Dropping incomplete legacy video cache {legacy_path}")
+
+        for tiles in legacy_cache.values():
+            for tile in tiles:
+                tile.close()
+        os.remove(legacy_path)
+
+    def is_complete_frame_dict(self, frames: dict) -> bool:
+        if self.n_frames != len(frames):
+            return False
+        for n in range(self.n_frames):
+            if len(frames.get(n, [])) != self.key_count:
+                return False
+        return True
+
+    def release(self) -> None:
+        with self.lock:
+            self.cap.release()
+
     def is_cache_complete(self) -> bool:
+        if self.tile_file is not None:
+            return True
         if self.n_frames != len(self.cache):
             return False
         
@@ -223,9 +438,13 @@ class BackgroundVideoCache:
     
     def close(self) -> None:
         import gc
+        self.stop_predecoder()
         with self.lock:
             self.cap.release()
 
+        # Other decks might still use the same mapping - it gets closed once the last user is gone
+        self.tile_file = None
+
         for n in self.cache:
             for f in self.cache[n]:
                 # ref = gc.get_referrers(f)
@@ -0,0 +1,83 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import threading
+
+class KeyRenderCache:
+    """
+    Remembers the fingerprint of the inputs used for the last rendered key image together with the resulting native image.
+    If the next update produces the same fingerprint the key neither has to be re-composited nor re-sent to the deck.
+    If only the deck lost the image (e.g. a failed write or an image written by someone else), the cached native image
+    is sent again without re-compositing it.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        self.fingerprint: tuple = None
+        self.native_image: bytes = None
+        # False if the deck might show something else than native_image
+        self.on_deck: bool = False
+
+        self.hits: int = 0
+        self.resends: int = 0
+        self.misses: int = 0
+
+    def lookup(self, fingerprint: tuple) -> tuple[bool, bytes]:
+        """
+        Returns (fresh, native_image):
+        fresh: the deck and the ui already show the image of the fingerprint
+        native_image: the cached image of the fingerprint if only the deck has to get it again, otherwise None
+
+        fingerprint: None means that the inputs can't be fingerprinted (e.g. a playing video) - never treated as fresh
+        """
+        with self.lock:
+            if fingerprint is None or fingerprint != self.fingerprint:
+                self.misses += 1
+                return False, None
+            if self.on_deck:
+                self.hits += 1
+                return True, None
+            if self.native_image is None:
+                self.misses += 1
+                return False, None
+            self.resends += 1
+            self.on_deck = True
+            return False, self.native_image
+
+    def store(self, fingerprint: tuple, native_image: bytes) -> None:
+        with self.lock:
+            self.fingerprint = fingerprint
+            self.native_image = native_image
+            self.on_deck = True
+
+    def forget_deck_image(self) -> None:
+        """
+        The deck might no longer show the cached image, but the inputs didn't change
+        """
+        with self.lock:
+            self.on_deck = False
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.fingerprint = None
+            self.native_image = None
+            self.on_deck = False
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "resends": self.resends,
+                "misses": self.misses,
+            }
@@ -13,8 +13,6 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
-from functools import lru_cache
-import hashlib
 import os
 import sys
 import threading
@@ -22,6 +20,9 @@ import time
 from PIL import Image, ImageOps
 import cv2
 from loguru import logger as log
+from src.backend.DeckManagement.Subclasses.video_predecoder import VideoPreDecoder
+from src.backend.DeckManagement.HelperMethods import file_hash
+from src.Signals import Signals
 import globals as gl
 
 VID_CACHE = os.path.join(gl.DATA_PATH, "cache", "videos")
@@ -37,6 +38,7 @@ class VideoFrameCache:
         self.size = size
         self.last_decoded_frame = None
         self.last_frame_index = -1
+        self.predecoder: VideoPreDecoder = None
 
         self.video_md5 = self.get_video_hash()
 
@@ -51,6 +53,7 @@ class VideoFrameCache:
             self.release()
         else:
             log.info("Cache is not complete. Continuing with video capture.")
+            self.start_predecoder()
 
         # Print size of cache in memory in mb:
         log.trace(f"Size of cache in memory: {sys.getsizeof(self.cache) / 1024 / 1024:.2f} MB")
@@ -62,11 +65,21 @@ class VideoFrameCache:
         if self.is_cache_complete():
             return self.cache.get(n, None)
 
+        predecoder = self.predecoder
+        if predecoder is not None:
+            # Keep the read-ahead window in front of the playhead
+            predecoder.set_playhead(n)
+
         # Otherwise, continue with video capture
         # Check if the frame is already decoded
         if n in self.cache:
+            self.last_decoded_frame = self.cache[n]
             return self.cache[n]
 
+        if predecoder is not None and predecoder.will_decode(n):
+            # The frame is not decoded yet - keep showing the last one instead of decoding it on the media thread
+            return self.last_decoded_frame
+
         # If the requested frame is before the last decoded one, reset the capture
         if n < self.last_frame_index:
             with self.lock:
@@ -83,10 +96,7 @@ class VideoFrameCache:
             
             # Calculate the new height to maintain aspect ratio
             frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(frame_rgb)
-
-            # Fill a 72x72 square completely with the image, keeping the aspect ratio
-            pil_image = ImageOps.fit(pil_image, self.size, Image.Resampling.LANCZOS)
+            pil_image = self.resize_frame(Image.fromarray(frame_rgb))
 
             self.last_decoded_frame = pil_image
             if self.do_caching:
@@ -98,19 +108,52 @@ class VideoFrameCache:
         # Return the last decoded frame if the nth frame is not available
         return self.cache.get(n, self.last_decoded_frame)
 
+    def is_decoded_frame(self, n: int, frame: Image.Image) -> bool:
+        """
+        Checks if frame really is frame n and not the last decoded frame shown in its place
+        """
+        n = min(n, self.n_frames - 1)
+        return frame is not None and self.cache.get(n) is frame
+
+    def resize_frame(self, frame: Image.Image) -> Image.Image:
+        # Fill a 72x72 square completely with the image, keeping the aspect ratio
+        return ImageOps.fit(frame, self.size, Image.Resampling.LANCZOS)
+
+    def start_predecoder(self) -> None:
+        if not self.do_caching or self.n_frames <= 0:
+            return
+        self.predecoder = VideoPreDecoder(
+            video_path=self.video_path,
+            n_frames=self.n_frames,
+            process_frame=self.resize_frame,
+            on_frames=self.on_predecoded_frames,
+            on_progress=self.on_predecode_progress
+        )
+        self.predecoder.start()
+
+    def on_predecoded_frames(self, frames: dict[int, Image.Image]) -> None:
+        self.cache.update(frames)
+        for frame_index, frame in frames.items():
+            self.write_cache(frame, frame_index)
+
+        if self.is_cache_complete():
+            self.release()
+
+    def on_predecode_progress(self, progress: float) -> None:
+        gl.signal_manager.trigger_signal(Signals.VideoCacheProgress, self.video_path, progress)
+
     def release(self):
         with self.lock:
             self.cap.release()
 
+    def close(self) -> None:
+        if self.predecoder is not None:
+            self.predecoder.stop()
+            self.predecoder = None
+        self.release()
+
     def get_video_hash(self) -> str:
-        with self.lock:
-            sha1sum = hashlib.md5()
-            with open(self.video_path, 'rb') as video:
-                block = video.read(2**16)
-                while len(block) != 0:
-                    sha1sum.update(block)
-                    block = video.read(2**16)
-                return sha1sum.hexdigest()
+        return file_hash(self.video_path, "md5")
 
     def write_cache(self, image: Image, frame_index: int, key_index: int = None):
         """
@@ -154,6 +197,5 @@ class VideoFrameCache:
 
             log.info(f"Loaded cache in {time.time() - start:.2f} seconds")
 
-    @lru_cache(maxsize=None)
     def is_cache_complete(self) -> bool:
         return len(self.cache) == self.n_frames
@@ -0,0 +1,143 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import heapq
+import threading
+import time
+import weakref
+
+# Import typing
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.backend.PluginManager.ActionBase import ActionBase
+
+class TickRegistry:
+    """
+    Schedule of the actions of a deck that actually want to be ticked.
+    Actions that neither override on_tick nor declare a tick_interval are never added,
+    so the tick loop only touches subscribed actions, each at its own interval.
+    """
+    MIN_INTERVAL = 0.05 # Seconds
+
+    def __init__(self, default_interval: float = 1):
+        self.default_interval = default_interval
+        # Reentrant because the weakref callbacks can run while the lock is held
+        self.lock = threading.RLock()
+
+        # Heap of (next_due, token) - every registration gets a new token, so stale heap entries of
+        # removed actions can never be mistaken for a new action that got the same id()
+        self.schedule: list[tuple[float, int]] = []
+        self.actions: dict[int, weakref.ref] = {}
+        self.tokens: dict[int, int] = {}
+        self.next_token: int = 0
+
+        # Set whenever an action is added, so that the tick loop can pick it up right away
+        self.changed = threading.Event()
+
+    @staticmethod
+    def wants_ticks(action: "ActionBase") -> bool:
+        from src.backend.PluginManager.ActionBase import ActionBase
+        if not isinstance(action, ActionBase):
+            return False
+        if getattr(action, "tick_interval", None) is not None:
+            return True
+        return type(action).on_tick is not ActionBase.on_tick
+
+    def get_interval(self, action: "ActionBase") -> float:
+        interval = getattr(action, "tick_interval", None)
+        if interval is None:
+            interval = self.default_interval
+        return max(self.MIN_INTERVAL, interval)
+
+    def add(self, action: "ActionBase") -> bool:
+        """
+        Adds the action if it wants to be ticked. Returns whether it was added.
+        """
+        if not self.wants_ticks(action):
+            return False
+
+        action_id = id(action)
+        with self.lock:
+            ref = self.actions.get(self.tokens.get(action_id))
+            if ref is not None and ref() is action:
+                return True
+            self.next_token += 1
+            token = self.next_token
+            self.tokens[action_id] = token
+            self.actions[token] = weakref.ref(action, lambda _, token=token: self.forget_token(token))
+            heapq.heappush(self.schedule, (time.monotonic() + self.get_interval(action), token))
+        self.changed.set()
+        return True
+
+    def remove(self, action: "ActionBase") -> None:
+        # The heap entry is skipped once it becomes due
+        with self.lock:
+            token = self.tokens.get(id(action))
+            ref = self.actions.get(token)
+            if ref is None or ref() is not action:
+                return
+        self.forget_token(token)
+
+    def forget_token(self, token: int) -> None:
+        with self.lock:
+            self.actions.pop(token, None)
+            for action_id, action_token in list(self.tokens.items()):
+                if action_token == token:
+                    del self.tokens[action_id]
+
+    def pop_due_actions(self, now: float = None) -> list["ActionBase"]:
+        """
+        Returns all actions that are due and schedules their next tick
+        """
+        if now is None:
+            now = time.monotonic()
+
+        due_actions: list["ActionBase"] = []
+        with self.lock:
+            while len(self.schedule) > 0 and self.schedule[0][0] <= now:
+                due, token = heapq.heappop(self.schedule)
+                ref = self.actions.get(token)
+                if ref is None:
+                    continue
+                action = ref()
+                if action is None:
+                    continue
+                due_actions.append(action)
+
+                # Don't try to catch up on missed ticks
+                next_due = due + self.get_interval(action)
+                if next_due <= now:
+                    next_due = now + self.get_interval(action)
+                heapq.heappush(self.schedule, (next_due, token))
+
+        return due_actions
+
+    def get_time_until_next_due(self, now: float = None) -> float:
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            if len(self.schedule) == 0:
+                return None
+            return max(0, self.schedule[0][0] - now)
+
+    def wait(self, timeout: float) -> None:
+        """
+        Sleeps until timeout or until an action gets added
+        """
+        self.changed.wait(timeout)
+        self.changed.clear()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.actions)
@@ -0,0 +1,186 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+from PIL import Image
+import cv2
+from loguru import logger as log
+
+# Shared by all videos so that the total number of decoding threads stays bounded.
+# cv2 and PIL release the GIL while decoding and resizing, so the threads actually decode in parallel.
+MAX_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+_executor: ThreadPoolExecutor = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="video_predecode")
+        return _executor
+
+class VideoPreDecoder:
+    """
+    Decodes a video in frame ranges on a shared worker pool and hands the processed frames to the cache.
+    Only frames inside the read-ahead window after the playhead are decoded, so work stays bounded
+    if the video isn't playing.
+    """
+    def __init__(self, video_path: str, n_frames: int, process_frame: callable, on_frames: callable,
+                 on_progress: callable = None, chunk_size: int = 30, read_ahead: int = 300):
+        """
+        process_frame: turns a decoded PIL frame into what the cache stores (e.g. resized tiles)
+        on_frames: receives a dict {frame_index: processed_frame} for every decoded range
+        on_progress: receives the fraction of decoded frames (0 to 1)
+        """
+        self.video_path = video_path
+        self.n_frames = n_frames
+        self.process_frame = process_frame
+        self.on_frames = on_frames
+        self.on_progress = on_progress
+        self.chunk_size = max(1, chunk_size)
+        self.read_ahead = max(self.chunk_size, read_ahead)
+
+        self.condition = threading.Condition()
+        self.playhead: int = 0
+        self.stopped: bool = False
+
+        n_chunks = (n_frames + self.chunk_size - 1) // self.chunk_size
+        self.pending_chunks: list[int] = list(range(n_chunks))
+        self.futures: dict[int, Future] = {}
+        self.decoded_frames: int = 0
+        # Frames of finished ranges that couldn't be decoded - the range failed or the video is shorter than reported
+        self.missing_frames: set[int] = set()
+
+        self.max_in_flight = MAX_WORKERS
+
+        self.thread = threading.Thread(target=self.schedule, name="video_predecode_scheduler", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        with self.condition:
+            self.stopped = True
+            for future in self.futures.values():
+                future.cancel()
+            self.condition.notify_all()
+
+    def set_playhead(self, n: int) -> None:
+        with self.condition:
+            if n == self.playhead:
+                return
+            self.playhead = n
+            self.condition.notify_all()
+
+    def get_progress(self) -> float:
+        if self.n_frames <= 0:
+            return 1
+        return min(1, self.decoded_frames / self.n_frames)
+
+    def is_done(self) -> bool:
+        return len(self.pending_chunks) == 0 and len(self.futures) == 0
+
+    def will_decode(self, n: int) -> bool:
+        """
+        Returns False if the frame is not going to be handed to on_frames, because its range finished without it
+        or the pre-decoder has been stopped. The caller has to decode such frames itself instead of waiting for them.
+        """
+        with self.condition:
+            if self.stopped:
+                return False
+            return n not in self.missing_frames
+
+    def get_next_chunk(self) -> int:
+        """
+        Returns the pending chunk closest after the playhead if it is inside the read-ahead window
+        """
+        if len(self.pending_chunks) == 0:
+            return None
+
+        def distance(chunk: int) -> int:
+            return (chunk * self.chunk_size - self.playhead) % max(1, self.n_frames)
+
+        # Also consider the chunk the playhead is in right now
+        playhead_chunk = self.playhead // self.chunk_size
+        if playhead_chunk in self.pending_chunks:
+            return playhead_chunk
+
+        chunk = min(self.pending_chunks, key=distance)
+        if distance(chunk) >= self.read_ahead:
+            return None
+        return chunk
+
+    def schedule(self) -> None:
+        with self.condition:
+            while not self.stopped and not self.is_done():
+                chunk = None
+                if len(self.futures) < self.max_in_flight:
+                    chunk = self.get_next_chunk()
+
+                if chunk is None:
+                    # Wait for a range to finish or the playhead to move
+                    self.condition.wait()
+                    continue
+
+                self.pending_chunks.remove(chunk)
+                start = chunk * self.chunk_size
+                end = min(start + self.chunk_size, self.n_frames)
+                future = get_executor().submit(self.decode_range, start, end)
+                self.futures[chunk] = future
+                future.add_done_callback(lambda f, chunk=chunk: self.on_chunk_done(chunk, f))
+
+    def decode_range(self, start: int, end: int) -> dict:
+        frames = {}
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if start > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            for n in range(start, end):
+                if self.stopped:
+                    break
+                success, frame = cap.read()
+                if not success:
+                    break
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                pil_image = Image.fromarray(frame_rgb)
+                frames[n] = self.process_frame(pil_image)
+                pil_image.close()
+        finally:
+            cap.release()
+        return frames
+
+    def on_chunk_done(self, chunk: int, future: Future) -> None:
+        frames = {}
+        if not future.cancelled():
+            try:
+                frames = future.result()
+            except Exception as e:
+                log.error(f"Failed to pre-decode frames of {self.video_path}: {e}")
+
+        if len(frames) > 0 and not self.stopped:
+            self.on_frames(frames)
+
+        start = chunk * self.chunk_size
+        end = min(start + self.chunk_size, self.n_frames)
+        with self.condition:
+            self.futures.pop(chunk, None)
+            self.missing_frames.update(n for n in range(start, end) if n not in frames)
+            # Count failed ranges as done as well - otherwise the progress would never reach 100%
+            self.decoded_frames += end - start
+            self.condition.notify_all()
+
+        if self.on_progress is not None and not self.stopped:
+            self.on_progress(self.get_progress())
@@ -35,6 +35,9 @@ class IconPackManager:
         packs = {}
         os.makedirs(os.path.join(gl.DATA_PATH, "icons"), exist_ok=True)
         for pack in os.listdir(os.path.join(gl.DATA_PATH, "icons")):
+            if pack.startswith("."):
+                # Hidden folders like the staging folders of running installs
+                continue
             icon_pack = IconPack(os.path.join(gl.DATA_PATH, "icons", pack))
             if icon_pack.is_valid:
                 packs[pack] = icon_pack
@@ -87,6 +87,7 @@ class Page:
             self.move_key_to_end(without_objects, type)
         with open(self.json_path, "w") as f:
             json.dump(without_objects, f, indent=4)
+        gl.page_manager.invalidate_page_json(self.json_path)
         self.file_access_semaphore.release()
 
     def make_backup(self):
@@ -156,6 +157,7 @@ class Page:
 
         for old_action in old_actions:
             if old_action not in new_actions:
+                self.deck_controller.tick_registry.remove(old_action)
                 old_action.on_removed_from_cache()
 
         self.action_objects = new_action_objects
@@ -188,6 +190,8 @@ class Page:
             state=state,
             input_ident=input_ident,
         )
+        # Only actions that override on_tick or declare a tick_interval get ticked
+        self.deck_controller.tick_registry.add(action_object)
         return action_object
 
     def _load_action_objects(self):
@@ -308,6 +312,7 @@ class Page:
         self.action_objects[input_ident.input_type].setdefault(input_ident.json_identifier, {})
         self.action_objects[input_ident.input_type][input_ident.json_identifier].setdefault(int(state), {})
         self.action_objects[input_ident.input_type][input_ident.json_identifier][int(state)][i] = action_object
+        self.deck_controller.tick_registry.add(action_object)
 
     def remove_plugin_action_objects(self, plugin_id: str) -> bool:
         plugin_obj = gl.plugin_manager.get_plugin_by_id(plugin_id)
@@ -548,6 +553,7 @@ class Page:
             for input_identifier in self.action_objects[input_type]:
                 for state in self.action_objects[input_type][input_identifier]:
                     for i, action in enumerate(list(self.action_objects[input_type][input_identifier][state].values())):
+                        self.deck_controller.tick_registry.remove(action)
                         self.action_objects[input_type][input_identifier][state][i].page = None
                         self.action_objects[input_type][input_identifier][state][i] = None
                         if isinstance(self.action_objects[input_type][input_identifier][state][i], ActionBase):
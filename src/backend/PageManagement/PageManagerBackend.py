@@ -13,12 +13,15 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 # Import Python modules
+from dataclasses import dataclass
 import datetime
 import gc
 import os
+import re
 import shutil
 import json
-from copy import copy
+import threading
+from copy import copy, deepcopy
 from signal import Signals
 import time
 from loguru import logger as log
@@ -33,6 +36,17 @@ from src.backend.DeckManagement.HelperMethods import get_sub_folders, natural_so
 # Import globals
 import globals as gl
 
+@dataclass
+class AutoChangeRule:
+    page_path: str
+    wm_class: re.Pattern
+    title: re.Pattern
+
+    def matches(self, wm_class: str, title: str) -> bool:
+        if None in (wm_class, title):
+            return False
+        return self.wm_class.search(wm_class) is not None and self.title.search(title) is not None
+
 class PageManagerBackend:
     def __init__(self, settings_manager):
         self.settings_manager = settings_manager
@@ -50,7 +64,14 @@ class PageManagerBackend:
 
         self.custom_pages = []
 
+        # Parsed page files, validated by their size and modification time
+        self.page_json_cache: dict[str, tuple[tuple[int, int], dict]] = {}
+        self.page_json_cache_lock = threading.Lock()
+
         self.auto_change_info = {}
+        # Compiled auto change rules of enabled pages, bucketed by deck serial number and sorted like get_pages()
+        self.auto_change_rules: dict[str, AutoChangeRule] = {}
+        self.auto_change_index: dict[str, list[AutoChangeRule]] = {}
         self.update_auto_change_info()
 
         self.dummy_page = DummyPage()
@@ -201,11 +222,13 @@ class PageManagerBackend:
 
         # Remove old page
         os.remove(old_path)
+        self.invalidate_page_json(old_path)
 
         # Update ui
         # self.update_ui()
 
-        self.update_auto_change_info()
+        self.remove_auto_change_info_for_page(old_path)
+        self.load_auto_change_info_for_page(new_path)
 
 
     def remove_page(self, page_path: str):
@@ -231,6 +254,7 @@ class PageManagerBackend:
 
         # Remove page json file
         os.remove(page_path)
+        self.invalidate_page_json(page_path)
 
         self.remove_page_path_from_created_pages(page_path)
 
@@ -244,7 +268,7 @@ class PageManagerBackend:
         # Update ui
         # self.update_ui()
 
-        self.update_auto_change_info()
+        self.remove_auto_change_info_for_page(page_path)
 
     def remove_page_path_from_created_pages(self, path: str):
         for controller in self.created_pages:
@@ -257,13 +281,15 @@ class PageManagerBackend:
 
 
     def add_page(self, name:str, page_dict: dict = {}):
-        with open(os.path.join(gl.DATA_PATH, "pages", f"{name}.json"), "w") as f:
+        path = os.path.join(gl.DATA_PATH, "pages", f"{name}.json")
+        with open(path, "w") as f:
             json.dump(page_dict, f)
+        self.invalidate_page_json(path)
 
         # Update ui
         # self.update_ui()
 
-        self.update_auto_change_info()
+        self.load_auto_change_info_for_page(path)
 
     def register_page(self, path: str):
         if not os.path.exists(path):
@@ -276,10 +302,11 @@ class PageManagerBackend:
         # self.update_ui()
         gl.signal_manager.trigger_signal(Signals.PageAdd, path)
 
-        self.update_auto_change_info()
+        self.load_auto_change_info_for_page(path)
 
     def unregister_page(self, path: str):
         self.custom_pages.remove(path)
+        self.remove_auto_change_info_for_page(path)
 
         gl.signal_manager.trigger_signal(Signals.PageDelete, path)
 
@@ -322,25 +349,86 @@ class PageManagerBackend:
     def update_auto_change_info(self):
         start = time.time()
         self.auto_change_info = {}
+        self.auto_change_rules = {}
         pages = self.get_pages(sort=False)
         for page in pages:
             abs_path = os.path.abspath(page)
-            page_dict = self.get_page_json(abs_path)
+            page_dict = self.get_shared_page_json(abs_path)
             if page_dict is None:
                 continue
-            self.auto_change_info[abs_path] = page_dict.get("auto-change", {})
+            self.auto_change_info[abs_path] = deepcopy(page_dict.get("auto-change", {}))
+            self.update_auto_change_rule(page, self.auto_change_info[abs_path])
+
+        self.rebuild_auto_change_index()
 
         log.info(f"Updated auto-change info in {time.time() - start} seconds")
 
+    def load_auto_change_info_for_page(self, page_path: str) -> None:
+        abs_path = os.path.abspath(page_path)
+        page_dict = self.get_shared_page_json(abs_path)
+        if page_dict is None:
+            self.remove_auto_change_info_for_page(page_path)
+            return
+        self.auto_change_info[abs_path] = deepcopy(page_dict.get("auto-change", {}))
+        self.update_auto_change_rule(page_path, self.auto_change_info[abs_path])
+        self.rebuild_auto_change_index()
+
+    def remove_auto_change_info_for_page(self, page_path: str) -> None:
+        abs_path = os.path.abspath(page_path)
+        self.auto_change_info.pop(abs_path, None)
+        self.auto_change_rules.pop(abs_path, None)
+        self.rebuild_auto_change_index()
+
+    def update_auto_change_rule(self, page_path: str, info: dict) -> None:
+        """
+        Compiles the regexes of the page. Pages that are disabled or have invalid regexes get no rule.
+        Call rebuild_auto_change_index() afterwards.
+        """
+        abs_path = os.path.abspath(page_path)
+        self.auto_change_rules.pop(abs_path, None)
+
+        if not info.get("enable", False):
+            return
+        wm_regex = info.get("wm_class")
+        title_regex = info.get("title")
+        if None in (wm_regex, title_regex):
+            return
+        try:
+            rule = AutoChangeRule(
+                page_path=page_path,
+                wm_class=re.compile(wm_regex, re.IGNORECASE),
+                title=re.compile(title_regex, re.IGNORECASE)
+            )
+        except re.error as e:
+            log.warning(f"Invalid auto change regex in {page_path}: {e}")
+            return
+        self.auto_change_rules[abs_path] = rule
+
+    def rebuild_auto_change_index(self) -> None:
+        index: dict[str, list[AutoChangeRule]] = {}
+        for abs_path in natural_sort_by_filenames(list(self.auto_change_rules.keys())):
+            rule = self.auto_change_rules[abs_path]
+            for serial_number in self.auto_change_info.get(abs_path, {}).get("decks", []):
+                index.setdefault(serial_number, []).append(rule)
+
+        # Swap in one step so readers on other threads never see a half built index
+        self.auto_change_index = index
+
+    def get_auto_change_rules_for_deck(self, serial_number: str) -> list[AutoChangeRule]:
+        return self.auto_change_index.get(serial_number, [])
+
     def set_auto_change_info_for_page(self, page_path: str, info: dict) -> None:
         abs_path = os.path.abspath(page_path)
         self.auto_change_info[abs_path] = info
+        self.update_auto_change_rule(page_path, info)
+        self.rebuild_auto_change_index()
         page = self.get_page_json(abs_path)
 
         page["auto-change"] = info
 
         with open(abs_path, "w") as f:
             json.dump(page, f, indent=4)
+        self.invalidate_page_json(abs_path)
 
         self.update_dict_of_pages_with_path(abs_path)
 
@@ -352,10 +440,46 @@ class PageManagerBackend:
         """
         Loads and returns the json of the page.
         If the page is corrupt it will fallback to the backed up page.
+        The returned dict is a copy and can be modified freely.
         """
-        if not os.path.exists(page_path):
+        page_dict = self.get_shared_page_json(page_path)
+        if page_dict is None:
             return
-        
+        return deepcopy(page_dict)
+
+    def get_shared_page_json(self, page_path: str) -> dict:
+        """
+        Like get_page_json() but returns the cached dict itself. It must NOT be modified.
+        The file is only parsed again if its size or modification time changed.
+        """
+        abs_path = os.path.abspath(page_path)
+        try:
+            stat = os.stat(abs_path)
+        except OSError:
+            return
+        stat_key = (stat.st_size, stat.st_mtime_ns)
+
+        with self.page_json_cache_lock:
+            cached = self.page_json_cache.get(abs_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+        page_dict = self.read_page_json(abs_path)
+        if page_dict is None:
+            return
+
+        with self.page_json_cache_lock:
+            self.page_json_cache[abs_path] = (stat_key, page_dict)
+        return page_dict
+
+    def invalidate_page_json(self, page_path: str) -> None:
+        """
+        Drops the cached json of the page. Call this after writing to a page file.
+        """
+        with self.page_json_cache_lock:
+            self.page_json_cache.pop(os.path.abspath(page_path), None)
+
+    def read_page_json(self, page_path: str) -> dict:
         try:
             with open(page_path, "r") as f:
                 return json.load(f)
@@ -379,22 +503,30 @@ class PageManagerBackend:
         if path in ["", None]:
             raise ValueError("Invalid path")
         
+        abs_asset_path = os.path.abspath(path)
         for page_path in self.get_pages():
-            page_had_asset = False
-            with open(page_path, "r") as f:
-                page_dict = json.load(f)
-                for key in page_dict.get("keys", {}):
-                    for state in page_dict["keys"][key].get("states", {}):
-                        dict_path = page_dict["keys"][key]["states"][state].get("media", {}).get("path")
-                        if dict_path is None:
-                            continue
-                        if os.path.abspath(dict_path) == os.path.abspath(path):
-                            page_had_asset = True
-                            page_dict["keys"][key]["states"][state]["media"]["path"] = None
+            page_dict = self.get_shared_page_json(page_path)
+            if page_dict is None:
+                continue
+
+            # Look for the asset in the shared dict and only copy pages that actually have to be changed
+            asset_states: list[tuple[str, str]] = []
+            for key in page_dict.get("keys", {}):
+                for state in page_dict["keys"][key].get("states", {}):
+                    dict_path = page_dict["keys"][key]["states"][state].get("media", {}).get("path")
+                    if dict_path is None:
+                        continue
+                    if os.path.abspath(dict_path) == abs_asset_path:
+                        asset_states.append((key, state))
+
+            if len(asset_states) > 0:
+                page_dict = deepcopy(page_dict)
+                for key, state in asset_states:
+                    page_dict["keys"][key]["states"][state]["media"]["path"] = None
 
-            if page_had_asset:
                 with open(page_path, "w") as f:
                     json.dump(page_dict, f, indent=4)
+                self.invalidate_page_json(page_path)
 
                 self.update_dict_of_pages_with_path(page_path)
 
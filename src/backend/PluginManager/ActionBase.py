@@ -70,6 +70,10 @@ class ActionBase(rpyc.Service):
         self.has_configuration = False
         self.allow_event_configuration: bool = True
 
+        # Seconds between two on_tick calls. Setting it also enables ticks for actions that don't override on_tick.
+        # None uses the tick delay of the deck
+        self.tick_interval: float = None
+
         self.labels = {}
         
         self.locale_manager: LegacyLocaleManager = None
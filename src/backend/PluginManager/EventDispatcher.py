@@ -0,0 +1,111 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+import time
+from loguru import logger as log
+
+class EventDispatcher:
+    """
+        Long-lived asyncio loop running in its own thread, shared by all EventHolders.
+        Sync callbacks run on a bounded executor instead of a new one per trigger.
+    """
+    MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        # Marks the executor's threads, see in_executor_thread
+        self.thread_state = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix="event_callback",
+                                           initializer=self._init_executor_thread)
+        self.loop.set_default_executor(self.executor)
+
+        self.thread = threading.Thread(target=self._run_loop, name="EventDispatcher", daemon=True)
+        self.thread.start()
+
+        self.stats_lock = threading.Lock()
+        # event_id: {"triggered", "completed", "failed", "total-latency", "max-latency"}
+        self.stats: dict[str, dict] = {}
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _init_executor_thread(self):
+        self.thread_state.is_executor_thread = True
+
+    def in_loop_thread(self) -> bool:
+        return threading.current_thread() is self.thread
+
+    def in_executor_thread(self) -> bool:
+        """
+            True if called by a sync callback - waiting for the executor there can use up all of its workers
+        """
+        return getattr(self.thread_state, "is_executor_thread", False)
+
+    def submit(self, event_id: str, coroutine) -> Future:
+        """
+            Schedules the coroutine on the loop and returns a concurrent.futures.Future for its result
+        """
+        start = time.perf_counter()
+        self._count(event_id, "triggered")
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        future.add_done_callback(lambda f: self._on_done(event_id, start, f))
+        return future
+
+    def _on_done(self, event_id: str, start: float, future: Future):
+        self._record_done(event_id, start, failed=future.cancelled() or future.exception() is not None)
+
+    def record(self, event_id: str, start: float, failed: bool = False):
+        """
+            Records an event that was run without the loop
+        """
+        self._count(event_id, "triggered")
+        self._record_done(event_id, start, failed)
+
+    def _record_done(self, event_id: str, start: float, failed: bool):
+        latency = time.perf_counter() - start
+        with self.stats_lock:
+            stats = self._get_event_stats(event_id)
+            stats["failed" if failed else "completed"] += 1
+            stats["total-latency"] += latency
+            stats["max-latency"] = max(stats["max-latency"], latency)
+
+    def _count(self, event_id: str, key: str):
+        with self.stats_lock:
+            self._get_event_stats(event_id)[key] += 1
+
+    def _get_event_stats(self, event_id: str) -> dict:
+        return self.stats.setdefault(event_id, {
+            "triggered": 0,
+            "completed": 0,
+            "failed": 0,
+            "total-latency": 0.0,
+            "max-latency": 0.0,
+        })
+
+    def get_stats(self) -> dict:
+        """
+            Returns the trigger counts and the average and max latency (in seconds) per event id
+        """
+        with self.stats_lock:
+            result = {}
+            for event_id, stats in self.stats.items():
+                finished = stats["completed"] + stats["failed"]
+                result[event_id] = {
+                    **stats,
+                    "average-latency": stats["total-latency"] / finished if finished > 0 else 0.0,
+                }
+            return result
+
+
+_dispatcher: EventDispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_event_dispatcher() -> EventDispatcher:
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = EventDispatcher()
+        return _dispatcher
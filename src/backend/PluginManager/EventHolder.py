@@ -1,6 +1,10 @@
 import asyncio
+from concurrent.futures import Future
+import time
 from loguru import logger as log
 
+from src.backend.PluginManager.EventDispatcher import get_event_dispatcher
+
 class EventHolder:
     """
         Holder for Event Callbacks for the specified Event ID
@@ -24,9 +28,64 @@ class EventHolder:
             self.observers.remove(callback)
 
     def trigger_event(self, *args, **kwargs):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(self._run_event(self.event_id, *args, **kwargs))
+        """
+            Runs all observers on the shared event loop and waits until they are done
+        """
+        dispatcher = get_event_dispatcher()
+        if dispatcher.in_executor_thread():
+            # Triggered by a sync observer - waiting for the executor from one of its workers can deadlock it
+            return self._run_event_inline(dispatcher, *args, **kwargs)
+
+        future = dispatcher.submit(self.event_id, self._run_event(self.event_id, *args, **kwargs))
+        if dispatcher.in_loop_thread():
+            # Triggered by an async observer - waiting here would block the loop forever
+            future.add_done_callback(self._log_exception)
+            return
+        return future.result()
+
+    def trigger_event_threaded(self, *args, **kwargs) -> Future:
+        """
+            Fire and forget - runs all observers on the shared event loop without waiting for them
+        """
+        future = get_event_dispatcher().submit(self.event_id, self._run_event(self.event_id, *args, **kwargs))
+        future.add_done_callback(self._log_exception)
+        return future
+
+    async def trigger_event_async(self, *args, **kwargs):
+        """
+            Awaitable variant for coroutines running on any event loop
+        """
+        future = get_event_dispatcher().submit(self.event_id, self._run_event(self.event_id, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    def _log_exception(self, future: Future):
+        if future.cancelled() or future.exception() is None:
+            return
+        log.error(f"Event {self.event_id} failed: {future.exception()}")
+
+    def _run_event_inline(self, dispatcher, *args, **kwargs):
+        """
+            Runs the sync observers in the calling thread, only the async ones go to the loop
+        """
+        start = time.perf_counter()
+        futures = []
+        for observer in list(self.observers):
+            if asyncio.iscoroutinefunction(observer):
+                futures.append(asyncio.run_coroutine_threadsafe(observer(self.event_id, *args, **kwargs), dispatcher.loop))
+                continue
+            try:
+                observer(self.event_id, *args, **kwargs)
+            except Exception as e:
+                log.error(f"Callback {observer.__name__} in {self.event_id} could not be called")
+
+        failed = False
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failed = True
+                log.error(f"Event {self.event_id} failed: {e}")
+        dispatcher.record(self.event_id, start, failed=failed)
 
     async def _run_event(self, *args, **kwargs):
         coroutines = [self._ensure_coroutine(observer, *args, **kwargs) for observer in self.observers]
@@ -37,6 +37,8 @@ class PluginBase(rpyc.Service):
 
     plugins = {}
     disabled_plugins = {}
+    # Plugins get initialized in parallel
+    register_lock = threading.Lock()
 
     def __init__(self):
         self.backend_connection: Connection = None
@@ -59,6 +61,9 @@ class PluginBase(rpyc.Service):
 
         self.registered_pages: list[str] = []
 
+        # Set once the backend connected - lets wait_for_backend return right away
+        self.backend_registered = threading.Event()
+
     @lru_cache(maxsize=1)
     def get_plugin_id(self) -> str:
         """
@@ -116,6 +121,10 @@ class PluginBase(rpyc.Service):
             return
 
 
+        with PluginBase.register_lock:
+            self._register()
+
+    def _register(self):
         for plugin_id in PluginBase.plugins.keys():
             plugin = PluginBase.plugins[plugin_id]["object"]
             if plugin.plugin_name == self.plugin_name:
@@ -299,6 +308,10 @@ class PluginBase(rpyc.Service):
             None
         """
         plugin = self.get_plugin(plugin_id)
+        if plugin is None:
+            # The plugin might be initializing in parallel right now
+            gl.plugin_manager.wait_for_plugin(plugin_id)
+            plugin = self.get_plugin(plugin_id)
         if plugin is None:
             log.warning(f"{plugin_id} does not exist")
         else:
@@ -533,9 +546,9 @@ class PluginBase(rpyc.Service):
         Returns:
             None
         """
-        while tries > 0 and self.backend_connection is None:
-            time.sleep(0.1)
-            tries -= 1
+        if self.backend_connection is not None:
+            return
+        self.backend_registered.wait(timeout=tries * 0.1)
 
     def register_backend(self, port: int) -> None:
         """
@@ -552,6 +565,7 @@ class PluginBase(rpyc.Service):
         """
         self.backend_connection = rpyc.connect("localhost", port)
         self.backend = self.backend_connection.root
+        self.backend_registered.set()
         gl.plugin_manager.backends.append(self.backend_connection)
 
     def ping(self) -> bool:
@@ -1,13 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import os
 import importlib
+import json
 import sys
+import time
 from loguru import logger as log
 import threading
+from gi.repository import GLib
 
 # Import own modules
 from src.backend.PluginManager.ActionHolder import ActionHolder
 from src.backend.PluginManager.PluginBase import PluginBase
-from src.backend.DeckManagement.HelperMethods import get_last_dir
+from src.backend.DeckManagement.HelperMethods import get_last_dir, recursive_hasattr
 from streamcontroller_plugin_tools import BackendBase
 
 import globals as gl
@@ -18,27 +22,194 @@ class PluginManager:
         self.initialized_plugin_classes = list[PluginBase]()
         self.backends:list[BackendBase] = []
 
+        # Plugins that are known from the plugin index but haven't been imported yet: {plugin_id: folder}
+        self.lazy_plugins: dict[str, str] = {}
+        # The indexed actions of these plugins: {action_id: plugin_id}
+        self.lazy_actions: dict[str, str] = {}
+        self.lazy_lock = threading.RLock()
+        self.plugin_index_path = os.path.join(gl.DATA_PATH, "cache", "plugin_index.json")
+
+        # {folder: {"import": seconds, "init": seconds}}
+        self.load_times: dict[str, dict[str, float]] = {}
+
+        # Plugin classes that are being initialized right now and events for their plugin ids
+        self.init_lock = threading.Lock()
+        self.initializing_classes: set = set()
+        self.plugin_init_events: dict[str, threading.Event] = {}
+        # Holds the id of the plugin the current thread is initializing
+        self.init_local = threading.local()
+
     def load_plugins(self, show_notification: bool = False):
         # get all folders in plugins folder
         if not os.path.exists(gl.PLUGIN_DIR):
             os.mkdir(gl.PLUGIN_DIR)
         folders = os.listdir(gl.PLUGIN_DIR)
+
+        lazy_loading = gl.settings_manager.get_app_settings().get("performance", {}).get("lazy-plugin-loading", True)
+        plugin_index = self.load_plugin_index() if lazy_loading else {}
+
         for folder in folders:
+            if folder.startswith("."):
+                # Hidden folders like the staging folders of running installs
+                continue
             # Import main module
             import_string = f"plugins.{folder}.main"
-            if import_string not in sys.modules.keys():
+            if import_string in sys.modules.keys():
                 # Import module only if it's not already imported
-                try:
-                    importlib.import_module(f"plugins.{folder}.main")
-                except Exception as e:
-                    log.error(f"Error importing plugin {folder}: {e}")
+                continue
+
+            plugin_id = self.get_lazy_plugin_id(folder, plugin_index.get(folder))
+            if plugin_id is not None:
+                # Gets imported once one of its actions is needed
+                with self.lazy_lock:
+                    self.lazy_plugins[plugin_id] = folder
+                    for action_id in plugin_index[folder].get("actions", []):
+                        self.lazy_actions[action_id] = plugin_id
+                continue
+
+            self.import_plugin(folder)
 
         # Get all classes inheriting from PluginBase and generate objects for them
         self.init_plugins()
 
+        self.update_plugin_index()
+        self.log_load_times()
+
         if show_notification:
             self.show_n_disabled_plugins_notification()
 
+    def import_plugin(self, folder: str) -> None:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(f"plugins.{folder}.main")
+        except Exception as e:
+            log.error(f"Error importing plugin {folder}: {e}")
+        self.load_times.setdefault(folder, {})["import"] = time.perf_counter() - start
+
+    def load_lazy_plugin(self, plugin_id: str) -> bool:
+        """
+        Imports and initializes a plugin that has only been indexed so far.
+        Returns whether the plugin had to be loaded.
+        """
+        with self.lazy_lock:
+            folder = self.lazy_plugins.pop(plugin_id, None)
+            if folder is None:
+                return False
+            for action_id in [action_id for action_id, owner in self.lazy_actions.items() if owner == plugin_id]:
+                del self.lazy_actions[action_id]
+
+        # Not holding the lock - the plugin might need other lazy plugins during its init
+        log.info(f"Loading plugin {plugin_id} on demand")
+        self.import_plugin(folder)
+        self.init_plugins()
+        self.generate_action_index()
+        self.update_plugin_index()
+        self.log_load_times([folder])
+        return True
+
+    def has_lazy_plugins(self) -> bool:
+        with self.lazy_lock:
+            return len(self.lazy_plugins) > 0
+
+    def load_all_lazy_plugins(self) -> None:
+        with self.lazy_lock:
+            plugin_ids = list(self.lazy_plugins.keys())
+        for plugin_id in plugin_ids:
+            self.load_lazy_plugin(plugin_id)
+
+    def get_manifest(self, folder: str) -> dict:
+        path = os.path.join(gl.PLUGIN_DIR, folder, "manifest.json")
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, json.decoder.JSONDecodeError):
+            return {}
+
+    def get_plugin_fingerprint(self, folder: str) -> dict:
+        """
+        Changes whenever the plugin gets updated
+        """
+        fingerprint = {"version": self.get_manifest(folder).get("version")}
+        for file_name in ["main.py", "manifest.json"]:
+            try:
+                fingerprint[file_name] = os.stat(os.path.join(gl.PLUGIN_DIR, folder, file_name)).st_mtime_ns
+            except OSError:
+                fingerprint[file_name] = None
+        return fingerprint
+
+    def get_lazy_plugin_id(self, folder: str, entry: dict) -> str:
+        """
+        Returns the plugin id if the plugin doesn't have to be imported on startup.
+        Plugins are loaded on startup unless they set "lazy-loading" in their manifest, which declares that
+        importing and initializing them later and on any thread has no side effects the user would miss.
+        """
+        if entry is None:
+            return
+        if not self.get_manifest(folder).get("lazy-loading", False):
+            return
+        if entry.get("fingerprint") != self.get_plugin_fingerprint(folder):
+            return
+        # Plugins with own pages have to be loaded for the pages to show up
+        if entry.get("has-pages", True):
+            return
+        return entry.get("plugin-id")
+
+    def load_plugin_index(self) -> dict:
+        """
+        The index maps plugin folders to their id, action ids and a fingerprint of their files.
+        It gets generated whenever plugins are imported and is only valid for the app version that created it.
+        """
+        if not os.path.exists(self.plugin_index_path):
+            return {}
+        try:
+            with open(self.plugin_index_path) as f:
+                index = json.load(f)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.error(f"Failed to load plugin index: {e}")
+            return {}
+        if index.get("app-version") != gl.app_version:
+            return {}
+        return index.get("plugins", {})
+
+    @log.catch
+    def update_plugin_index(self) -> None:
+        index = self.load_plugin_index()
+        for plugin_id, plugin in PluginBase.plugins.items():
+            plugin_base: PluginBase = plugin["object"]
+            folder = os.path.basename(plugin["folder_path"])
+            index[folder] = {
+                "plugin-id": plugin_id,
+                "fingerprint": self.get_plugin_fingerprint(folder),
+                "actions": list(plugin_base.action_holders.keys()),
+                "has-pages": len(plugin_base.registered_pages) > 0,
+            }
+
+        # Forget uninstalled plugins
+        for folder in list(index.keys()):
+            if not os.path.isdir(os.path.join(gl.PLUGIN_DIR, folder)):
+                del index[folder]
+
+        os.makedirs(os.path.dirname(self.plugin_index_path), exist_ok=True)
+        tmp_path = f"{self.plugin_index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"app-version": gl.app_version, "plugins": index}, f, indent=4)
+        os.replace(tmp_path, self.plugin_index_path)
+
+    def log_load_times(self, folders: list[str] = None) -> None:
+        if folders is None:
+            folders = list(self.load_times.keys())
+        for folder in sorted(folders, key=lambda f: -sum(self.load_times.get(f, {}).values())):
+            times = self.load_times.get(folder, {})
+            log.info(f"Plugin {folder}: import {times.get('import', 0):.3f}s, init {times.get('init', 0):.3f}s")
+        with self.lazy_lock:
+            if len(self.lazy_plugins) > 0:
+                log.info(f"Deferred loading of {len(self.lazy_plugins)} plugins: {', '.join(self.lazy_plugins.keys())}")
+
+    def get_load_times(self) -> dict[str, dict[str, float]]:
+        return self.load_times
+
     def show_n_disabled_plugins_notification(self):
         n_deactivated_plugins = len(PluginBase.disabled_plugins)
         if n_deactivated_plugins == 0:
@@ -59,22 +230,180 @@ class PluginManager:
         else:
             call()
 
+    PLUGIN_INIT_TIMEOUT = 30 # Seconds
+    MAX_INIT_WORKERS = 8
+
     def init_plugins(self):
-        subclasses = PluginBase.__subclasses__()
-        for subclass in subclasses:
-            if subclass in self.initialized_plugin_classes:
-                log.info(f"Skipping {subclass} because it's already initialized")
-                continue
+        """
+        Initializes all new plugin classes on the calling thread.
+        Plugins with "init-off-main-thread" in their manifest are initialized in parallel on a thread pool instead.
+        This can't be the default: a plugin's __init__ creates widgets, registers pages and launches backends in one go,
+        so there is no part of it that is known to be safe to move off the calling thread.
+        Plugins listed under "dependencies" in a manifest are started first and awaited by the plugins depending on them.
+        """
+        # Claim the classes so that concurrent calls (e.g. lazy loading) don't initialize them twice
+        subclasses = []
+        with self.init_lock:
+            for subclass in PluginBase.__subclasses__():
+                if subclass in self.initialized_plugin_classes or subclass in self.initializing_classes:
+                    log.info(f"Skipping {subclass} because it's already initialized")
+                    continue
+                self.initializing_classes.add(subclass)
+                subclasses.append(subclass)
+
+        if len(subclasses) == 0:
+            return
+
+        infos = {subclass: self.get_plugin_class_info(subclass) for subclass in subclasses}
+        with self.init_lock:
+            for info in infos.values():
+                self.plugin_init_events.setdefault(info["plugin-id"], threading.Event())
+
+        ordered = self.sort_by_dependencies(subclasses, infos)
+        parallel = [subclass for subclass in ordered if infos[subclass]["off-main-thread"]]
+        serial = [subclass for subclass in ordered if not infos[subclass]["off-main-thread"]]
+
+        phase_start = time.perf_counter()
+        timeline: dict[str, tuple[float, float]] = {}
+
+        # The pool works in submission order and dependencies are submitted first,
+        # so a plugin waiting for a dependency never blocks the worker the dependency needs
+        pool = ThreadPoolExecutor(max_workers=min(self.MAX_INIT_WORKERS, max(1, len(parallel))), thread_name_prefix="plugin_init")
+        futures = {subclass: pool.submit(self.init_plugin_class, subclass, infos, phase_start, timeline) for subclass in parallel}
+
+        # Runs while the pool works, plugins on either side might depend on each other
+        for subclass in serial:
+            self.init_plugin_class(subclass, infos, phase_start, timeline)
+
+        for subclass, future in futures.items():
             try:
-                obj = subclass()
-            except Exception as e:
-                log.error(f"Error initializing plugin {subclass}: {e}. Skipping...")
+                future.result(timeout=self.PLUGIN_INIT_TIMEOUT)
+            except TimeoutError:
+                with self.init_lock:
+                    # The plugin might have finished in the meantime
+                    timed_out = not infos[subclass].get("finished", False)
+                    infos[subclass]["timed-out"] = timed_out
+                if timed_out:
+                    log.error(f"Plugin {infos[subclass]['folder']} did not finish its initialization within {self.PLUGIN_INIT_TIMEOUT} seconds. Continuing without waiting for it...")
+        # Don't wait for plugins that timed out - on_late_plugin_init adds them once they are done
+        pool.shutdown(wait=False)
+
+        self.log_startup_timeline(timeline)
+
+    def init_plugin_class(self, subclass: type, infos: dict, phase_start: float, timeline: dict) -> None:
+        info = infos[subclass]
+
+        # Wait for the dependencies that are initialized in this phase
+        for dependency in info["dependencies"]:
+            self.wait_for_plugin(dependency, self.PLUGIN_INIT_TIMEOUT)
+
+        self.init_local.plugin_id = info["plugin-id"]
+        start = time.perf_counter()
+        try:
+            obj = subclass()
+        except Exception as e:
+            log.error(f"Error initializing plugin {subclass}: {e}. Skipping...")
+        else:
+            with self.init_lock:
+                self.initialized_plugin_classes.append(subclass)
+        finally:
+            end = time.perf_counter()
+            self.init_local.plugin_id = None
+            self.load_times.setdefault(info["folder"], {})["init"] = end - start
+            timeline[info["folder"]] = (start - phase_start, end - phase_start)
+            with self.init_lock:
+                self.initializing_classes.discard(subclass)
+                event = self.plugin_init_events.pop(info["plugin-id"], None)
+                info["finished"] = True
+                late = info.get("timed-out", False)
+            if event is not None:
+                event.set()
+            if late:
+                self.on_late_plugin_init(subclass, info)
+
+    def on_late_plugin_init(self, subclass: type, info: dict) -> None:
+        """
+        Called once a plugin finishes its initialization after init_plugins stopped waiting for it
+        """
+        if subclass not in self.initialized_plugin_classes:
+            return
+        log.info(f"Plugin {info['folder']} finished its initialization late, adding its actions")
+        self.generate_action_index()
+        self.update_plugin_index()
+
+        if recursive_hasattr(gl, "app.main_win.sidebar.action_chooser"):
+            GLib.idle_add(gl.app.main_win.sidebar.action_chooser.plugin_group.update)
+
+        # Pages loaded in the meantime are missing the actions of the plugin
+        if gl.deck_manager is None:
+            return
+        for controller in gl.deck_manager.deck_controller:
+            if getattr(controller, "active_page", None) is None:
                 continue
-            self.initialized_plugin_classes.append(subclass)
+            controller.active_page.load_action_objects()
+            controller.load_page(controller.active_page)
+
+    def wait_for_plugin(self, plugin_id: str, timeout: float = None) -> None:
+        """
+        Blocks while the plugin is being initialized by init_plugins
+        """
+        if getattr(self.init_local, "plugin_id", None) == plugin_id:
+            # Called by the plugin itself
+            return
+        with self.init_lock:
+            event = self.plugin_init_events.get(plugin_id)
+        if event is None:
+            return
+        if not event.wait(timeout if timeout is not None else self.PLUGIN_INIT_TIMEOUT):
+            log.warning(f"Timed out waiting for plugin {plugin_id} to initialize")
+
+    def get_plugin_class_info(self, subclass: type) -> dict:
+        # Module is plugins.<folder>.main
+        folder = subclass.__module__.split(".")[1] if subclass.__module__.startswith("plugins.") else subclass.__module__
+        manifest = self.get_manifest(folder)
+        return {
+            "folder": folder,
+            "plugin-id": manifest.get("id") or folder,
+            "dependencies": list(manifest.get("dependencies", [])),
+            "off-main-thread": manifest.get("init-off-main-thread", False),
+        }
+
+    def sort_by_dependencies(self, subclasses: list[type], infos: dict) -> list[type]:
+        """
+        Puts plugins after the plugins they depend on. Dependency cycles are broken with a warning.
+        """
+        by_id = {infos[subclass]["plugin-id"]: subclass for subclass in subclasses}
+        ordered: list[type] = []
+        state: dict[type, str] = {}
+
+        def visit(subclass: type):
+            if state.get(subclass) == "done":
+                return
+            if state.get(subclass) == "visiting":
+                log.warning(f"Plugin dependency cycle involving {infos[subclass]['plugin-id']}")
+                return
+            state[subclass] = "visiting"
+            for dependency in infos[subclass]["dependencies"]:
+                if dependency in by_id:
+                    visit(by_id[dependency])
+            state[subclass] = "done"
+            ordered.append(subclass)
+
+        for subclass in subclasses:
+            visit(subclass)
+        return ordered
+
+    def log_startup_timeline(self, timeline: dict[str, tuple[float, float]]) -> None:
+        if len(timeline) == 0:
+            return
+        log.info("Plugin initialization timeline:")
+        for folder, (start, end) in sorted(timeline.items(), key=lambda item: item[1][0]):
+            log.info(f"  {folder}: +{start:.3f}s -> +{end:.3f}s ({end - start:.3f}s)")
 
     def generate_action_index(self):
         self.action_index.clear()
-        plugins = self.get_plugins()
+        # Not get_plugins() - that would load all lazy plugins
+        plugins = PluginBase.plugins
         for plugin in plugins.values():
             plugin_base = plugin["object"]
             self.action_index.update(plugin_base.action_holders)
@@ -94,7 +423,11 @@ class PluginManager:
                 path = get_last_dir(path)
                 self.action_index[action_id] = plugins[plugin]["object"].ACTIONS[action_id]
 
-    def get_plugins(self, include_disabled: bool = False) -> list[PluginBase]:
+    def get_plugins(self, include_disabled: bool = False, load_lazy_plugins: bool = True) -> list[PluginBase]:
+        # Everything that lists the plugins needs all of them
+        if load_lazy_plugins:
+            self.load_all_lazy_plugins()
+
         plugins = PluginBase.plugins
 
         if include_disabled:
@@ -103,12 +436,19 @@ class PluginManager:
         return plugins
     
     def get_actions_for_plugin_id(self, plugin_id: str):
+        self.load_lazy_plugin(plugin_id)
         return PluginBase.plugins[plugin_id]["object"].ACTIONS
     
     def get_action_holder_from_id(self, action_id: str) -> ActionHolder:
         """
         Example string: dev_core447_MediaPlugin::Pause
         """
+        if action_id not in self.action_index:
+            # The plugin might not have been loaded yet
+            with self.lazy_lock:
+                plugin_id = self.lazy_actions.get(action_id)
+            if plugin_id is not None:
+                self.load_lazy_plugin(plugin_id)
         try:
             return self.action_index[action_id]
         except KeyError:
@@ -116,7 +456,11 @@ class PluginManager:
             return None
             
     def get_plugin_by_id(self, plugin_id:str, include_disabled: bool = True) -> PluginBase:
-        return self.get_plugins(include_disabled).get(plugin_id, {}).get("object", None)
+        self.load_lazy_plugin(plugin_id)
+        plugin = PluginBase.plugins.get(plugin_id)
+        if plugin is None and include_disabled:
+            plugin = PluginBase.disabled_plugins.get(plugin_id)
+        return (plugin or {}).get("object", None)
             
     def remove_plugin_from_list(self, plugin_base: PluginBase):
         del PluginBase.plugins[plugin_base.plugin_id]
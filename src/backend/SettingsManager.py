@@ -13,18 +13,53 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 # Import Python modules
+import atexit
 import os, json
+import copy
+import threading
 from loguru import logger as log
 
+# Import gtk modules
+from gi.repository import Gio, GLib
+
 # Import own modules
 import globals as gl
 
 class SettingsManager:
+    SAVE_DELAY = 0.5 # Seconds to wait for more changes before writing a file
+
     def __init__(self):
+        # Settings are loaded once and then served from memory
+        self.lock = threading.RLock()
+        self.cache: dict[str, dict] = {}
+        # Settings that still have to be written to disk
+        self.pending_saves: dict[str, dict] = {}
+        self.save_timer: threading.Timer = None
+        # Modification times of our own writes - these don't invalidate the cache
+        self.written_mtimes: dict[str, int] = {}
+        self.monitors: dict[str, Gio.FileMonitor] = {}
+        # Pending saves must survive every exit that runs the interpreter's shutdown. Paths using os._exit flush themselves.
+        atexit.register(self.flush)
+
         self.font_defaults: dict = {} # Used by the LabelManager to get the default font settings
         self.load_font_defaults()
 
     def load_settings_from_file(self, file_path: str) -> dict:
+        """
+        Returns a copy of the settings in the file, so callers can modify it freely before saving it back.
+        Only the first call for each file reads from the disk.
+        """
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            if file_path in self.cache:
+                return copy.deepcopy(self.cache[file_path])
+
+            settings = self.read_settings_file(file_path)
+            self.cache[file_path] = settings
+            self.watch_directory(os.path.dirname(file_path))
+            return copy.deepcopy(settings)
+
+    def read_settings_file(self, file_path: str) -> dict:
         if not os.path.exists(file_path):
             return {}
         try:
@@ -36,12 +71,80 @@ class SettingsManager:
         
         
     def save_settings_to_file(self, file_path: str, settings: dict) -> None:
+        """
+        Updates the cached settings right away. Writing to the disk is debounced.
+        """
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            self.cache[file_path] = copy.deepcopy(settings)
+            self.pending_saves[file_path] = self.cache[file_path]
+            self.watch_directory(os.path.dirname(file_path))
+
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+            self.save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+            self.save_timer.setDaemon(True)
+            self.save_timer.setName("SaveSettings")
+            self.save_timer.start()
+
+    @log.catch
+    def flush(self) -> None:
+        """
+        Writes all pending settings to the disk
+        """
+        with self.lock:
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+            pending = self.pending_saves
+            self.pending_saves = {}
+
+            for file_path, settings in pending.items():
+                self.write_settings_file(file_path, settings)
+
+    def write_settings_file(self, file_path: str, settings: dict) -> None:
         # Create directories if they don't exist
         if not os.path.exists(os.path.dirname(file_path)) and os.path.dirname(file_path) != "":
             os.makedirs(os.path.dirname(file_path))
 
-        with open(file_path, "w") as f:
+        # Write to a temporary file first so that the settings never end up half written
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "w") as f:
             json.dump(settings, f, indent=4)
+        os.replace(tmp_path, file_path)
+
+        self.written_mtimes[file_path] = os.stat(file_path).st_mtime_ns
+
+    def watch_directory(self, directory: str) -> None:
+        if directory in self.monitors:
+            return
+        try:
+            monitor = Gio.File.new_for_path(directory).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            log.warning(f"Could not watch {directory} for settings changes: {e}")
+            return
+        monitor.connect("changed", self.on_file_changed)
+        self.monitors[directory] = monitor
+
+    def on_file_changed(self, monitor: Gio.FileMonitor, file: Gio.File, other_file: Gio.File, event_type: Gio.FileMonitorEvent) -> None:
+        changed_paths = [f.get_path() for f in (file, other_file) if f is not None]
+
+        with self.lock:
+            for file_path in changed_paths:
+                if file_path not in self.cache or file_path in self.pending_saves:
+                    continue
+
+                # Ignore our own writes
+                try:
+                    mtime = os.stat(file_path).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if mtime is not None and mtime == self.written_mtimes.get(file_path):
+                    continue
+
+                log.debug(f"Settings file changed on disk: {file_path}")
+                self.cache.pop(file_path, None)
+                self.written_mtimes.pop(file_path, None)
 
     def get_deck_settings(self, deck_serial_number: str) -> dict:
         """
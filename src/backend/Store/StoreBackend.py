@@ -14,7 +14,6 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
  
 import sys
-import zipfile
 import requests
 from async_lru import alru_cache
 import json
@@ -29,7 +28,6 @@ import os
 import uuid
 import shutil
 from packaging import version
-import urllib.request
 
 # Import GLib
 import gi
@@ -38,6 +36,10 @@ from gi.repository import GLib
 # Import own modules
 from autostart import is_flatpak
 from src.backend.Store.StoreCache import StoreCache
+from src.backend.Store.StoreClient import StoreClient
+from src.backend.Store.ZipStreamExtractor import ZipStreamExtractor, ZipStreamError
+from src.backend.Store.UpdatePipeline import UpdatePipeline, UpdateReport
+from src.backend.Store.StoreCatalogue import StoreCatalogue
 from src.backend.PluginManager.PluginBase import PluginBase
 from src.backend.DeckManagement.HelperMethods import recursive_hasattr
 
@@ -61,6 +63,8 @@ class StoreBackend:
 
     def __init__(self):
         self.store_cache = StoreCache()
+        self.client = StoreClient()
+        self.catalogue = StoreCatalogue()
 
         self.official_store_branch_cache: str = None
 
@@ -92,20 +96,22 @@ class StoreBackend:
     async def get_official_store_branch(self) -> str:
         if self.official_store_branch_cache is not None:
             return self.official_store_branch_cache
-        versions_file = await self.get_remote_file(self.STORE_REPO_URL, "versions.json", branch_name="versions", force_refetch=True)
-        if isinstance(versions_file, NoConnectionError):
-            return versions_file
-        versions = json.loads(versions_file)
+        versions = await self.get_remote_file(self.STORE_REPO_URL, "versions.json", branch_name="versions", data_type="json", force_refetch=True)
+        if isinstance(versions, NoConnectionError):
+            return versions
         v = versions.get(gl.app_version, "main")
         self.official_store_branch_cache = v
         return v
 
-    async def request_from_url(self, url: str) -> requests.Response:
+    async def request_from_url(self, url: str, headers: dict = None) -> requests.Response:
         try:
-            req = requests.get(url, stream=True)
+            req = await self.client.get(url, headers=headers)
             if req.status_code == 200:
                 return req
-        except requests.exceptions.ConnectionError as e:
+            if req.status_code == 304 and headers:
+                # Not modified since the conditional request's cached version
+                return req
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
             log.error(e)
             return NoConnectionError()
     
@@ -121,7 +127,7 @@ class StoreBackend:
         Returns:
             str: The constructed URL for the specified file path in the repository's branch.
         """
-        repo_url = repo_url.replace("github.com", "raw.githubusercontent.com")
+        repo_url = self.client.get_raw_url(repo_url)
         return f"{repo_url}/{branch_name}/{file_path}"
 
     async def get_remote_file(self, repo_url: str, file_path: str, branch_name: str = "main", data_type: str = "text", force_refetch: bool = False):
@@ -134,6 +140,11 @@ class StoreBackend:
             branch_name (str, optional): The name of the branch to retrieve the file from. Defaults to "main".
                                          Alternatively, you can specify a specific commit hash.
 
+            data_type (str, optional): "text", "content" for bytes or "json" for the parsed content.
+                                       Parsed content is shared with later calls and must not be modified.
+            force_refetch (bool, optional): Ask the server whether the file changed even if it is cached.
+                                            Unchanged files are answered with a 304 and served from the cache.
+
         Returns:
             str: The content of the remote file.
 
@@ -146,45 +157,64 @@ class StoreBackend:
         if data_type == "content":
             byte_suffix = "b"
 
-        is_cached = False
-        if not force_refetch:
-            is_cached = self.store_cache.is_cached(
-                url=repo_url,
-                branch=branch_name,
-                path=file_path
-            )
-        if is_cached:
-            with self.store_cache.open_cache_file(url=repo_url, branch=branch_name, path=file_path, mode=f"r{byte_suffix}") as f:
-                return f.read()
-        else:
-            pass
+        is_cached = self.store_cache.is_cached(
+            url=repo_url,
+            branch=branch_name,
+            path=file_path
+        )
+        if is_cached and not force_refetch:
+            return self.read_cached_file(repo_url, file_path, branch_name, data_type)
 
         url = self.build_url(repo_url, file_path, branch_name)
 
-        answer = await self.request_from_url(url)
+        headers = None
+        if is_cached:
+            headers = self.store_cache.get_conditional_headers(url=repo_url, branch=branch_name, path=file_path)
+
+        answer = await self.request_from_url(url, headers=headers)
 
         if isinstance(answer, NoConnectionError):
             return answer
         
         if answer is None:
             return
+
+        if answer.status_code == 304:
+            self.store_cache.touch(url=repo_url, branch=branch_name, path=file_path)
+            return self.read_cached_file(repo_url, file_path, branch_name, data_type)
         
         with self.store_cache.open_cache_file(url=repo_url, branch=branch_name, path=file_path, mode=f"w{byte_suffix}") as f:
-            if answer is None:
-                return
-            if data_type == "text":
-                f.write(answer.text)
-            elif data_type == "content":
+            if data_type == "content":
                 f.write(answer.content)
+            else:
+                f.write(answer.text)
+        self.store_cache.set_validators(url=repo_url, branch=branch_name, path=file_path,
+                                        etag=answer.headers.get("ETag"), last_modified=answer.headers.get("Last-Modified"))
 
         if data_type == "text":
             return answer.text
         elif data_type == "content":
             return answer.content
+        elif data_type == "json":
+            parsed = answer.json()
+            self.store_cache.set_json(url=repo_url, branch=branch_name, path=file_path, parsed=parsed)
+            return parsed
+
+    def read_cached_file(self, repo_url: str, file_path: str, branch_name: str = "main", data_type: str = "text"):
+        if data_type == "json":
+            return self.store_cache.get_json(url=repo_url, branch=branch_name, path=file_path)
+
+        byte_suffix = "b" if data_type == "content" else ""
+        with self.store_cache.open_cache_file(url=repo_url, branch=branch_name, path=file_path, mode=f"r{byte_suffix}") as f:
+            return f.read()
         
     async def get_last_commit(self, repo_url: str, branch_name: str = "main") -> str:
-        url = f"https://api.github.com/repos/{self.get_user_name(repo_url)}/{self.get_repo_name(repo_url)}/commits?sha={branch_name}&per_page=1"
-        response = requests.get(url)
+        url = f"{self.client.api_base_url}/repos/{self.get_user_name(repo_url)}/{self.get_repo_name(repo_url)}/commits?sha={branch_name}&per_page=1"
+        try:
+            response = await self.client.get(url)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            log.error(e)
+            return
 
         if response.status_code != 200:
             return
@@ -195,26 +225,32 @@ class StoreBackend:
         return commits[0].get("sha")
     
     async def get_official_authors(self) -> list:
-        authors_json = await self.get_remote_file(self.STORE_REPO_URL, "OfficialAuthors.json", self.STORE_BRANCH, force_refetch=True)
-        if isinstance(authors_json, NoConnectionError):
-            return authors_json
-        authors_json = json.loads(authors_json)
+        authors_json = await self.get_remote_file(self.STORE_REPO_URL, "OfficialAuthors.json", self.STORE_BRANCH, data_type="json", force_refetch=True)
         return authors_json
     
     async def fetch_and_parse_store_json(self, url: str, filename: str, branch: str, n_stores_with_errors: int = 0):
         try:
-            store_file_json = await self.get_remote_file(url, filename, branch, force_refetch=True)
+            store_file_json = await self.get_remote_file(url, filename, branch, data_type="json", force_refetch=True)
             if isinstance(store_file_json, NoConnectionError):
                 n_stores_with_errors += 1
                 return None, n_stores_with_errors
-            store_file_json = json.loads(store_file_json)
+            if store_file_json is None:
+                # The store answered with an error status
+                log.error(f"Failed to fetch {filename} from {url} ({branch})")
+                n_stores_with_errors += 1
+                return None, n_stores_with_errors
             return store_file_json, n_stores_with_errors
         except (json.decoder.JSONDecodeError, TypeError) as e:
             n_stores_with_errors += 1
             log.error(e)
             return None, n_stores_with_errors
 
-    async def process_store_data(self, filename: str, process_func: callable, get_custom_func: callable, data_class, include_images=True):
+    async def process_store_data(self, filename: str, process_func: callable, get_custom_func: callable, data_class, include_images=True, catalogue_kind: str = None,
+                                 update_catalogue: bool = True):
+        """
+        catalogue_kind: the catalogue entries to reuse and to replace with the results
+        update_catalogue: if False, the catalogue is only read
+        """
         n_stores_with_errors = 0
         data_list = []
 
@@ -228,7 +264,11 @@ class StoreBackend:
         if n_stores_with_errors >= len(stores):
             return NoConnectionError()
 
-        prepare_tasks = [process_func(data, include_images, True) for data in data_list]
+        # Only the images of the catalogue are pre-scaled, so entries without images are not cached
+        if not include_images:
+            catalogue_kind = None
+
+        prepare_tasks = [self.prepare_with_catalogue(catalogue_kind, process_func, data, include_images, True) for data in data_list]
 
         if get_custom_func is not None:
             for url, branch in get_custom_func():
@@ -241,16 +281,59 @@ class StoreBackend:
         results = await asyncio.gather(*prepare_tasks)
         results = [result for result in results if isinstance(result, data_class)]
 
+        if catalogue_kind is not None and update_catalogue:
+            self.catalogue.update(catalogue_kind, results)
+
         return results
 
-    async def get_all_plugins_async(self, include_images: bool = True) -> int:
-        return await self.process_store_data("Plugins.json", self.prepare_plugin, self.get_custom_plugins, PluginData, include_images)
+    async def prepare_with_catalogue(self, catalogue_kind: str, process_func: callable, asset: dict, include_images: bool, verified: bool):
+        """
+        Reuses the entry of the catalogue if the asset's commit didn't change since it was prepared
+        """
+        if catalogue_kind is not None and "url" in asset and asset.get("commits") and asset.get("branch") is None:
+            version = self.get_newest_compatible_version(asset["commits"]) or self.get_newest_version(list(asset["commits"].keys()))
+            key = self.catalogue.get_asset_key(asset["url"], asset["commits"][version], verified)
+            data = self.catalogue.get_entry(catalogue_kind, key)
+            if data is not None:
+                await self.refresh_local_state(catalogue_kind, data)
+                return data
+
+        return await process_func(asset, include_images, verified)
+
+    async def refresh_local_state(self, catalogue_kind: str, data):
+        """
+        Updates the parts of a catalogue entry that depend on this installation instead of the asset's commit
+        """
+        if catalogue_kind == "plugins":
+            local_path = os.path.join(gl.PLUGIN_DIR, data.plugin_id or "")
+        else:
+            asset_id = data.icon_id if catalogue_kind == "icons" else data.wallpaper_id
+            local_path = os.path.join(gl.DATA_PATH, catalogue_kind, asset_id or "")
+        data.local_sha = await self.get_local_sha(local_path)
+
+        if isinstance(self.official_authors, list):
+            data.official = data.author in self.official_authors
+        data.description = gl.lm.get_custom_translation(data.descriptions or {}) or data.description
+        data.short_description = gl.lm.get_custom_translation(data.short_descriptions or {}) or data.short_description
+
+    async def get_catalogue_entries(self, catalogue_kind: str) -> list:
+        """
+        Returns the entries of the last store visit without fetching anything, so that the store can show them right away
+        """
+        entries = self.catalogue.get_entries(catalogue_kind)
+        await asyncio.gather(*[self.refresh_local_state(catalogue_kind, data) for data in entries])
+        return entries
+
+    async def get_all_plugins_async(self, include_images: bool = True, update_catalogue: bool = True) -> int:
+        return await self.process_store_data("Plugins.json", self.prepare_plugin, self.get_custom_plugins, PluginData, include_images, "plugins",
+                                             update_catalogue=update_catalogue)
 
-    async def get_all_icons(self) -> int:
-        return await self.process_store_data("Icons.json", self.prepare_icon, None, IconData)
+    async def get_all_icons(self, update_catalogue: bool = True) -> int:
+        return await self.process_store_data("Icons.json", self.prepare_icon, None, IconData, catalogue_kind="icons", update_catalogue=update_catalogue)
 
-    async def get_all_wallpapers(self) -> int:
-        return await self.process_store_data("Wallpapers.json", self.prepare_wallpaper, None, WallpaperData)
+    async def get_all_wallpapers(self, update_catalogue: bool = True) -> int:
+        return await self.process_store_data("Wallpapers.json", self.prepare_wallpaper, None, WallpaperData, catalogue_kind="wallpapers",
+                                             update_catalogue=update_catalogue)
     
     async def get_manifest(self, url:str, commit:str) -> dict:
         # url = self.build_url(url, "manifest.json", commit)
@@ -635,29 +718,12 @@ class StoreBackend:
     async def os_sys(self, args):
         return os.system(args)
     
-    def get_main_folder_of_zip(self, zip_path: str) -> str:
-        extracted_folder_name = None
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_contents = zip_ref.namelist()
-            for item in zip_contents:
-                if not item.endswith("/"): # Directories end with /
-                    continue
-                if item.count("/") > 1:
-                    continue
-                
-                if extracted_folder_name is not None:
-                    log.error("Multiple folders in zip")
-                    return 400
-                extracted_folder_name = item.split("/")[0]
-
-
-        if extracted_folder_name is None:
-            log.error("Could not find extracted folder name")
-            return 400
-        
-        return extracted_folder_name
-    
-    async def download_repo(self, repo_url:str, directory:str, commit_sha:str = None, branch_name:str = None):
+    async def download_repo(self, repo_url:str, directory:str, commit_sha:str = None, branch_name:str = None, on_progress: callable = None):
+        """
+        Downloads the archive of the repository at the given commit or branch into directory.
+        The archive is extracted while it is downloaded into a staging folder next to directory, which then replaces it.
+        on_progress is called from a worker thread with the number of received bytes and the total size (None if unknown).
+        """
         if not is_flatpak() and gl.argparser.parse_args().devel:
             await self.clone_repo(repo_url, directory, commit_sha, branch_name)
             return
@@ -668,51 +734,71 @@ class StoreBackend:
         sha = commit_sha
         if commit_sha is None and branch_name is not None:
             # Used to write the version
-            sha = self.get_last_commit(repo_url, branch_name)
-        zip_url = f"https://github.com/{username}/{projectname}/archive/{sha}.zip"
-        
-        # Download
+            sha = await self.get_last_commit(repo_url, branch_name)
+        zip_url = f"{self.client.github_base_url}/{username}/{projectname}/archive/{sha}.zip"
+
+        directory = os.path.abspath(directory)
+        # Same file system as the destination, so that it can be swapped in with a rename. Hidden to keep it out of the asset lists.
+        staging_dir = os.path.join(os.path.dirname(directory), f".{os.path.basename(directory)}.staging-{uuid.uuid4().hex[:8]}")
+
+        # Download and extract
+        ## The archive contains a single <projectname>-<sha> folder - github is not case sensitive for the urls, so its casing might differ. It gets stripped.
+        extractor: ZipStreamExtractor = None
         try:
-            # Create cache dir
-            os.makedirs(os.path.join(gl.DATA_PATH, "cache"), exist_ok=True)
-            urllib.request.urlretrieve(zip_url, os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}.zip"))
-        except TypeError as e:
+            extractor = ZipStreamExtractor(staging_dir, strip_components=1)
+            status = await self.client.stream(zip_url, extractor.feed, on_progress)
+            if status != 200:
+                log.error(f"Failed to download {zip_url}: {status}")
+                return NoConnectionError()
+            extractor.close()
+
+            log.info(f"Downloaded {zip_url}: {extractor.n_files} files, {extractor.bytes_received} bytes, sha256 {extractor.get_digest()}")
+
+            ## Write version
+            path = os.path.join(staging_dir, "VERSION")
+            with open(path, "w") as f:
+                f.write(sha)
+
+            self.swap_directory(staging_dir, directory)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
             log.error(e)
             return NoConnectionError()
-        
-        ## Extract
-        if os.path.exists(os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}")):
-            shutil.rmtree(os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}"))
-        shutil.unpack_archive(os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}.zip"), os.path.join(gl.DATA_PATH, "cache"))
-
+        except ZipStreamError as e:
+            log.error(f"Failed to extract {zip_url}: {e}")
+            return 400
+        except Exception as e:
+            # E.g. an interrupted transfer (ChunkedEncodingError), corrupt data (zlib.error) or a full disk (OSError)
+            log.error(f"Failed to install {zip_url}: {e}")
+            return 400
+        finally:
+            if extractor is not None:
+                extractor.abort()
+            # Already gone if it has been swapped in
+            shutil.rmtree(staging_dir, ignore_errors=True)
 
-        ## Why - because github is not case sensitive for the urls, so the casing of the zip file might be different than the one of the contained folder
-        extracted_folder_name = self.get_main_folder_of_zip(os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}.zip"))
-        
-        extracted_folder = os.path.join(gl.DATA_PATH, "cache", extracted_folder_name)
+        return 200
 
-        # Remove destination folder
-        if os.path.isdir(directory):
-            shutil.rmtree(directory)
-        if os.path.isfile(directory): # No idea how this could happen - but just in case
+    def swap_directory(self, new_dir: str, directory: str) -> None:
+        """
+        Replaces directory with new_dir. Both have to be on the same file system.
+        """
+        old_dir = None
+        if os.path.isdir(directory) and not os.path.islink(directory):
+            old_dir = os.path.join(os.path.dirname(directory), f".{os.path.basename(directory)}.old-{uuid.uuid4().hex[:8]}")
+            os.rename(directory, old_dir)
+        elif os.path.lexists(directory): # No idea how this could happen - but just in case
             os.remove(directory)
 
-        # Create empty destination folder
-        os.makedirs(directory, exist_ok=True)
-
-        for name in os.listdir(extracted_folder):
-            shutil.move(os.path.join(extracted_folder, name), directory)
-
-
-        os.remove(os.path.join(gl.DATA_PATH, "cache", f"{projectname}-{sha}.zip"))
-        shutil.rmtree(extracted_folder)
-        
-        ## Write version
-        path = os.path.join(directory, "VERSION")
-        with open(path, "w") as f:
-            f.write(sha)
-        
-        return 200
+        try:
+            os.rename(new_dir, directory)
+        except OSError:
+            # Put the old version back
+            if old_dir is not None:
+                os.rename(old_dir, directory)
+            raise
+
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
     
     async def clone_repo(self, repo_url:str, local_path:str, commit_sha:str = None, branch_name:str = None):
         # if branch_name == None and commit_sha == None:
@@ -758,13 +844,42 @@ class StoreBackend:
             return
         
         
-    async def install_plugin(self, plugin_data:PluginData, auto_update: bool = False):
+    def get_download_error(self, result) -> str:
+        """
+        Returns why download_repo failed or None if it succeeded
+        """
+        if isinstance(result, NoConnectionError):
+            return "No connection"
+        if isinstance(result, Exception):
+            return str(result)
+        if result not in (200, None): # None: cloned in devel mode
+            return f"Download returned {result}"
+
+    async def install_plugin(self, plugin_data:PluginData, auto_update: bool = False, on_progress: callable = None):
+        """
+        Returns the result of download_repo, check it with get_download_error
+        """
         url = plugin_data.github
 
         local_path = os.path.join(gl.PLUGIN_DIR, plugin_data.plugin_id)
 
-        response = await self.download_repo(repo_url=url, directory=local_path, commit_sha=plugin_data.commit_sha, branch_name=plugin_data.branch)
+        response = await self.download_repo(repo_url=url, directory=local_path, commit_sha=plugin_data.commit_sha, branch_name=plugin_data.branch, on_progress=on_progress)
+        error = self.get_download_error(response)
+        if error is not None:
+            log.error(f"Failed to install plugin {plugin_data.plugin_id}: {error}")
+            return response
+
+        self.run_plugin_install_steps(local_path)
+        
+        self.reload_plugins()
+
+        # Notify plugin actions
+        gl.signal_manager.trigger_signal(Signals.PluginInstall, plugin_data.plugin_id)
+
+        log.success(f"Plugin {plugin_data.plugin_id} installed successfully under: {local_path} with sha: {plugin_data.commit_sha}")
+        return response
 
+    def run_plugin_install_steps(self, local_path: str) -> None:
         # Run install script if present. Make sure to use python binary used to run this process to not break venv dependency installations
         if os.path.isfile(os.path.join(local_path, "__install__.py")):
             subprocess.run(f"{sys.executable} {os.path.join(local_path, '__install__.py')}", shell=True, start_new_session=True)
@@ -773,9 +888,7 @@ class StoreBackend:
         if os.path.isfile(os.path.join(local_path, "requirements.txt")):
             subprocess.run(f"{sys.executable} -m pip install -r {os.path.join(local_path, 'requirements.txt')}", shell=True, start_new_session=True)
 
-        if response == 404:
-            return 404
-        
+    def reload_plugins(self) -> None:
         # Update plugin manager
         gl.plugin_manager.load_plugins()
         gl.plugin_manager.init_plugins()
@@ -794,11 +907,6 @@ class StoreBackend:
                     # Load action objects
                     controller.active_page.load_action_objects()
                     controller.load_page(controller.active_page)
-
-        # Notify plugin actions
-        gl.signal_manager.trigger_signal(Signals.PluginInstall, plugin_data.plugin_id)
-
-        log.success(f"Plugin {plugin_data.plugin_id} installed successfully under: {local_path} with sha: {plugin_data.commit_sha}")
         
     def uninstall_plugin(self, plugin_id:str, remove_from_pages:bool = False, remove_files:bool = True) -> bool:
         ## 1. Remove all action objects in all pages
@@ -864,24 +972,36 @@ class StoreBackend:
                     controller.active_page.load_action_objects()
                     controller.load_page(controller.active_page)
 
-    async def install_icon(self, icon_data:IconData):
+    async def install_icon(self, icon_data:IconData, on_progress: callable = None):
+        """
+        Returns the result of download_repo, check it with get_download_error
+        """
         icon_path = os.path.join(gl.DATA_PATH, "icons", icon_data.icon_id)
 
-        await self.uninstall_icon(icon_data)
-
-        await self.download_repo(repo_url=icon_data.github, directory=icon_path, commit_sha=icon_data.commit_sha)
+        # The old version is only replaced once the new one is completely extracted
+        response = await self.download_repo(repo_url=icon_data.github, directory=icon_path, commit_sha=icon_data.commit_sha, on_progress=on_progress)
+        error = self.get_download_error(response)
+        if error is not None:
+            log.error(f"Failed to install icon pack {icon_data.icon_id}: {error}")
+        return response
 
     async def uninstall_icon(self, icon_data:IconData):
         folder_name = icon_data.icon_id
         if os.path.exists(os.path.join(gl.DATA_PATH, "icons", folder_name)):
             shutil.rmtree(os.path.join(gl.DATA_PATH, "icons", folder_name))
 
-    async def install_wallpaper(self, wallpaper_data:WallpaperData):
+    async def install_wallpaper(self, wallpaper_data:WallpaperData, on_progress: callable = None):
+        """
+        Returns the result of download_repo, check it with get_download_error
+        """
         wallpaper_path = os.path.join(gl.DATA_PATH, "wallpapers", wallpaper_data.wallpaper_id)
 
-        await self.uninstall_wallpaper(wallpaper_data)
-
-        await self.download_repo(repo_url=wallpaper_data.github, directory=wallpaper_path, commit_sha=wallpaper_data.commit_sha)
+        # The old version is only replaced once the new one is completely extracted
+        response = await self.download_repo(repo_url=wallpaper_data.github, directory=wallpaper_path, commit_sha=wallpaper_data.commit_sha, on_progress=on_progress)
+        error = self.get_download_error(response)
+        if error is not None:
+            log.error(f"Failed to install wallpaper pack {wallpaper_data.wallpaper_id}: {error}")
+        return response
 
     async def uninstall_wallpaper(self, wallpaper_data:WallpaperData):
         folder_name = wallpaper_data.wallpaper_id
@@ -895,8 +1015,8 @@ class StoreBackend:
                 return plugin
             
     ## Updates
-    async def get_plugins_to_update(self):
-        plugins =  await self.get_all_plugins_async()
+    async def get_plugins_to_update(self, update_catalogue: bool = True):
+        plugins =  await self.get_all_plugins_async(update_catalogue=update_catalogue)
         if isinstance(plugins, NoConnectionError):
             return plugins
 
@@ -915,20 +1035,10 @@ class StoreBackend:
         """
         Returns number of updated plugins
         """
-        plugins_to_update = await self.get_plugins_to_update()
-        if isinstance(plugins_to_update, NoConnectionError):
-            return plugins_to_update
-        for plugin in plugins_to_update:
-            try:
-                self.uninstall_plugin(plugin.plugin_id, remove_from_pages=False, remove_files=False)
-            except Exception as e:
-                log.error(e)
-            await self.install_plugin(plugin)
-        
-        return len(plugins_to_update)
+        return self.get_update_count(await self.run_updates(kinds=("plugins",)))
 
-    async def get_icons_to_update(self):
-        icons = await self.get_all_icons()
+    async def get_icons_to_update(self, update_catalogue: bool = True):
+        icons = await self.get_all_icons(update_catalogue=update_catalogue)
         if isinstance(icons, NoConnectionError):
             return icons
 
@@ -947,16 +1057,10 @@ class StoreBackend:
         """
         Returns number of updated icons
         """
-        icons_to_update = await self.get_icons_to_update()
-        if isinstance(icons_to_update, NoConnectionError):
-            return icons_to_update
-        for icon in icons_to_update:
-            await self.install_icon(icon)
-
-        return len(icons_to_update)
+        return self.get_update_count(await self.run_updates(kinds=("icons",)))
     
-    async def get_wallpapers_to_update(self):
-        wallpapers = await self.get_all_wallpapers()
+    async def get_wallpapers_to_update(self, update_catalogue: bool = True):
+        wallpapers = await self.get_all_wallpapers(update_catalogue=update_catalogue)
         if isinstance(wallpapers, NoConnectionError):
             return wallpapers
 
@@ -975,26 +1079,26 @@ class StoreBackend:
         """
         Returns number of updated wallpapers
         """
-        wallpapers_to_update = await self.get_wallpapers_to_update()
-        if isinstance(wallpapers_to_update, NoConnectionError):
-            return wallpapers_to_update
-        for wallpaper in wallpapers_to_update:
-            await self.install_wallpaper(wallpaper)
-
-        return len(wallpapers_to_update)
+        return self.get_update_count(await self.run_updates(kinds=("wallpapers",)))
 
     async def update_everything(self) -> int:
         """
         Returns number of updated assets
         """
-        n_plugins = await self.update_all_plugins()
-        n_icons = await self.update_all_icons()
-        n_wallpapers = await self.update_all_wallpapers()
+        return self.get_update_count(await self.run_updates())
 
-        if isinstance(n_plugins, NoConnectionError) or isinstance(n_icons, NoConnectionError):
-            return NoConnectionError()
+    async def run_updates(self, kinds: tuple[str] = UpdatePipeline.KINDS, dry_run: bool = False, on_progress: callable = None) -> UpdateReport:
+        """
+        Updates all installed assets of the given kinds and returns a report with the timings of every step.
+        With dry_run nothing gets installed and the report lists the available updates.
+        """
+        pipeline = UpdatePipeline(self, kinds=kinds, dry_run=dry_run, on_progress=on_progress)
+        return await pipeline.run()
 
-        return n_plugins + n_icons + n_wallpapers
+    def get_update_count(self, report: UpdateReport) -> int:
+        if report.no_connection and report.n_updated == 0:
+            return NoConnectionError()
+        return report.n_updated
 
 class NoCompatibleVersion:
     pass
\ No newline at end of file
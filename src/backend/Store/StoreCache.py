@@ -15,6 +15,10 @@ class StoreCache:
 
         self.write_lock = threading.Lock()
 
+        # Parsed json of cached files: cache_string: (mtime_ns, parsed)
+        self.parsed_cache: dict[str, tuple[int, object]] = {}
+        self.parsed_lock = threading.Lock()
+
         self.files = self.get_files()
         self.remove_old_cache_files()
 
@@ -118,10 +122,96 @@ class StoreCache:
         cache_path = self.get_cache_path(url, path, branch, data_type)
         os.makedirs(os.path.dirname(cache_path), exist_ok=True)
 
-        self.files[self.generate_cache_string(url, path, branch, data_type)] = {
+        cache_string = self.generate_cache_string(url, path, branch, data_type)
+        entry = self.files.get(cache_string, {})
+        entry.update({
             "path": cache_path,
             "date": time.time()
-        }
+        })
+        if "w" in mode:
+            # The validators belong to the old content
+            entry.pop("etag", None)
+            entry.pop("last-modified", None)
+        self.files[cache_string] = entry
         self.set_files(self.files)
         
-        return open(cache_path, mode)
\ No newline at end of file
+        return open(cache_path, mode)
+
+    def get_conditional_headers(self, url: str, path: str, branch: str = "main", data_type: str = "text") -> dict:
+        """
+        Returns the If-None-Match/If-Modified-Since headers for a conditional request of the cached file
+        """
+        if not self.is_cached(url, path, branch, data_type):
+            return {}
+        entry = self.files[self.generate_cache_string(url, path, branch, data_type)]
+
+        headers = {}
+        if entry.get("etag") is not None:
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last-modified") is not None:
+            headers["If-Modified-Since"] = entry["last-modified"]
+        return headers
+
+    def set_validators(self, url: str, path: str, branch: str = "main", data_type: str = "text", etag: str = None, last_modified: str = None) -> None:
+        entry = self.files.get(self.generate_cache_string(url, path, branch, data_type))
+        if entry is None:
+            return
+        entry["etag"] = etag
+        entry["last-modified"] = last_modified
+        self.set_files(self.files)
+
+    def touch(self, url: str, path: str, branch: str = "main", data_type: str = "text") -> None:
+        """
+        Marks the cached file as fresh, used when the server confirmed that it didn't change
+        """
+        entry = self.files.get(self.generate_cache_string(url, path, branch, data_type))
+        if entry is None:
+            return
+        entry["date"] = time.time()
+        self.set_files(self.files)
+
+    def get_json(self, url: str, path: str, branch: str = "main", data_type: str = "text"):
+        """
+        Returns the parsed content of the cached file.
+        The result is kept in memory as long as the file doesn't change, so unchanged files are only parsed once.
+        The returned object is shared with later calls and must not be modified.
+        Returns None if the file isn't cached (anymore).
+        """
+        cache_string = self.generate_cache_string(url, path, branch, data_type)
+        cache_path = self.files.get(cache_string, {}).get("path")
+        if cache_path is None:
+            return
+        try:
+            mtime_ns = os.stat(cache_path).st_mtime_ns
+        except FileNotFoundError:
+            # Removed since it got cached, e.g. by remove_old_cache_files
+            return
+
+        with self.parsed_lock:
+            cached = self.parsed_cache.get(cache_string)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        try:
+            with open(cache_path, "r") as f:
+                parsed = json.load(f)
+        except FileNotFoundError:
+            return
+        with self.parsed_lock:
+            self.parsed_cache[cache_string] = (mtime_ns, parsed)
+        return parsed
+
+    def set_json(self, url: str, path: str, parsed, branch: str = "main", data_type: str = "text") -> None:
+        """
+        Remembers the parsed content of a freshly written cache file
+        """
+        cache_string = self.generate_cache_string(url, path, branch, data_type)
+        cache_path = self.files.get(cache_string, {}).get("path")
+        if cache_path is None:
+            return
+        try:
+            mtime_ns = os.stat(cache_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        with self.parsed_lock:
+            self.parsed_cache[cache_string] = (mtime_ns, parsed)
\ No newline at end of file
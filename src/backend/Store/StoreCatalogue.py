@@ -0,0 +1,196 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from PIL import Image
+from loguru import logger as log
+
+import globals as gl
+
+from src.windows.Store.StoreData import StoreData, PluginData, IconData, WallpaperData
+
+class StoreCatalogue:
+    """
+    On-disk snapshot of the prepared store entries, so that the store can be shown before anything is fetched.
+    Entries are keyed by their repository and the commit they were prepared for, so a refresh only has to prepare
+    the assets whose commit changed. Thumbnails are stored pre-scaled next to the snapshot.
+    Entries that follow a branch instead of a pinned commit are kept for the first render but never reused.
+    """
+    VERSION = 1
+    THUMBNAIL_SIZE = (250, 90)
+    DATA_CLASSES = {
+        "plugins": PluginData,
+        "icons": IconData,
+        "wallpapers": WallpaperData,
+    }
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.path.join(gl.DATA_PATH, "Store", "cache", "catalogue.json")
+        self.path = path
+        self.thumbnail_dir = os.path.join(os.path.dirname(path), "thumbnails")
+
+        self.lock = threading.Lock()
+        # Serializes updates, so that the thumbnail cleanup of one kind can't remove the new thumbnails of another
+        self.update_lock = threading.Lock()
+        # kind: {key: fields}
+        self.kinds: dict[str, dict[str, dict]] = {}
+
+        self.load()
+
+    @staticmethod
+    def get_key(data: StoreData) -> str:
+        return f"{data.github}@{data.branch or data.commit_sha}@{data.verified}"
+
+    @staticmethod
+    def get_asset_key(url: str, commit_sha: str, verified: bool) -> str:
+        return f"{url}@{commit_sha}@{verified}"
+
+    @staticmethod
+    def get_fields(data: StoreData) -> dict:
+        """
+        Returns the fields of the entry except for its image.
+        Not dataclasses.asdict - that would deep-copy the image.
+        """
+        return {field.name: getattr(data, field.name) for field in dataclasses.fields(data) if field.name != "image"}
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.error(f"Failed to load store catalogue: {e}")
+            return
+
+        # The compatibility of the entries depends on the app version
+        if snapshot.get("version") != self.VERSION or snapshot.get("app-version") != gl.app_version:
+            return
+        self.kinds = snapshot.get("kinds", {})
+
+    def save(self) -> None:
+        with self.lock:
+            snapshot = {
+                "version": self.VERSION,
+                "app-version": gl.app_version,
+                "kinds": self.kinds,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+
+    def get_entries(self, kind: str) -> list[StoreData]:
+        with self.lock:
+            entries = list(self.kinds.get(kind, {}).values())
+        return [self.to_data(kind, fields) for fields in entries]
+
+    def get_entry(self, kind: str, key: str) -> StoreData:
+        """
+        Returns the prepared entry if it was prepared for the same commit, otherwise None
+        """
+        with self.lock:
+            fields = self.kinds.get(kind, {}).get(key)
+        if fields is None or fields.get("branch") is not None:
+            return
+        return self.to_data(kind, fields)
+
+    def update(self, kind: str, entries: list[StoreData]) -> None:
+        """
+        Replaces the entries of the kind with the freshly prepared ones
+        """
+        with self.update_lock:
+            new_entries = {}
+            for data in entries:
+                key = self.get_key(data)
+                fields = self.get_fields(data)
+                fields["thumbnail-path"] = self.save_thumbnail(self.get_thumbnail_key(data), data.image,
+                                                               overwrite=data.branch is not None and data.commit_sha is None)
+                new_entries[key] = fields
+
+            with self.lock:
+                self.kinds[kind] = new_entries
+            self.save()
+            self.remove_unused_thumbnails()
+
+    def to_data(self, kind: str, fields: dict) -> StoreData:
+        fields = dict(fields)
+        thumbnail_path = fields.pop("thumbnail-path", None)
+
+        data_class = self.DATA_CLASSES[kind]
+        names = {f.name for f in dataclasses.fields(data_class)}
+        data = data_class(**{name: value for name, value in fields.items() if name in names})
+        data.image = self.load_thumbnail(thumbnail_path)
+        return data
+
+    def get_thumbnail_key(self, data: StoreData) -> str:
+        """
+        Entries that follow a branch keep their key across commits, so their thumbnails are keyed by the resolved commit
+        """
+        if data.branch is None:
+            return self.get_key(data)
+        return f"{self.get_key(data)}@{data.commit_sha}"
+
+    def get_thumbnail_path(self, key: str) -> str:
+        return os.path.join(self.thumbnail_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.png")
+
+    def save_thumbnail(self, key: str, image: Image.Image, overwrite: bool = False) -> str:
+        """
+        overwrite: replace an existing thumbnail, used if the commit of the entry is unknown
+        """
+        if image is None:
+            return
+        path = self.get_thumbnail_path(key)
+        if os.path.exists(path) and not overwrite:
+            # Same key means same commit and therefore the same thumbnail
+            return path
+
+        thumbnail = image.copy()
+        if thumbnail.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            thumbnail = thumbnail.convert("RGBA")
+        thumbnail.thumbnail(self.THUMBNAIL_SIZE)
+
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+        try:
+            thumbnail.save(path, "PNG")
+        except OSError as e:
+            log.error(f"Failed to save store thumbnail: {e}")
+            return
+        return path
+
+    def load_thumbnail(self, path: str) -> Image.Image:
+        if path is None or not os.path.exists(path):
+            return
+        try:
+            image = Image.open(path)
+            image.load()
+            return image
+        except OSError:
+            return
+
+    def remove_unused_thumbnails(self) -> None:
+        if not os.path.isdir(self.thumbnail_dir):
+            return
+        with self.lock:
+            used = {fields.get("thumbnail-path") for entries in self.kinds.values() for fields in entries.values()}
+        for name in os.listdir(self.thumbnail_dir):
+            path = os.path.join(self.thumbnail_dir, name)
+            if path not in used:
+                os.remove(path)
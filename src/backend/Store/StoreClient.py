@@ -0,0 +1,160 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger as log
+
+import globals as gl
+
+class StoreClient:
+    """
+    Shared HTTP client of the store.
+    All requests go through one pooled session, so connections to GitHub are kept alive and reused.
+    The blocking requests run on a bounded pool of worker threads, which makes the store coroutines
+    actually run in parallel when gathered, no matter which event loop awaits them.
+
+    The base urls can be changed in the store settings to test against a local stand-in for GitHub.
+    """
+    DEFAULT_MAX_CONCURRENT_REQUESTS = 16
+    DEFAULT_CONNECTIONS_PER_HOST = 8
+    DEFAULT_TIMEOUT = 15 # Seconds
+    CHUNK_SIZE = 2**16
+
+    GITHUB_BASE_URL = "https://github.com"
+    RAW_BASE_URL = "https://raw.githubusercontent.com"
+    API_BASE_URL = "https://api.github.com"
+
+    def __init__(self, max_concurrent_requests: int = None, connections_per_host: int = None, timeout: float = None,
+                 github_base_url: str = None, raw_base_url: str = None, api_base_url: str = None):
+        settings = self.get_settings()
+
+        self.max_concurrent_requests = max_concurrent_requests or settings.get("max-concurrent-requests", self.DEFAULT_MAX_CONCURRENT_REQUESTS)
+        self.connections_per_host = connections_per_host or settings.get("connections-per-host", self.DEFAULT_CONNECTIONS_PER_HOST)
+        self.timeout = timeout or settings.get("request-timeout", self.DEFAULT_TIMEOUT)
+
+        self.github_base_url = (github_base_url or settings.get("github-base-url", self.GITHUB_BASE_URL)).rstrip("/")
+        self.raw_base_url = (raw_base_url or settings.get("raw-base-url", self.RAW_BASE_URL)).rstrip("/")
+        self.api_base_url = (api_base_url or settings.get("api-base-url", self.API_BASE_URL)).rstrip("/")
+
+        self.session = requests.Session()
+        # pool_block makes requests wait for a free connection instead of opening extra ones, which limits the connections per host
+        adapter = HTTPAdapter(pool_connections=self.connections_per_host, pool_maxsize=self.connections_per_host, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent_requests, thread_name_prefix="store_request")
+
+        self.stats_lock = threading.Lock()
+        self.n_requests: int = 0
+        self.n_failed: int = 0
+        self.bytes_received: int = 0
+
+    def get_settings(self) -> dict:
+        if gl.settings_manager is None:
+            return {}
+        return gl.settings_manager.get_app_settings().get("store", {})
+
+    def get_raw_url(self, repo_url: str) -> str:
+        """
+        Returns the base url for raw files of the given repository
+        """
+        return repo_url.replace(self.GITHUB_BASE_URL, self.raw_base_url, 1).replace(self.github_base_url, self.raw_base_url, 1)
+
+    async def run(self, func: callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        Fetches the url and returns the response with the body already read.
+        Raises requests.exceptions.RequestException if the request failed.
+        """
+        return await self.run(self._get, url, headers)
+
+    def _get(self, url: str, headers: dict = None) -> requests.Response:
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            # Read the body in the worker thread so that accessing it later doesn't block the loop
+            content = response.content
+        except requests.exceptions.RequestException:
+            self.count_request(failed=True)
+            raise
+
+        self.count_request(bytes_received=len(content or b""))
+        return response
+
+    async def download(self, url: str, path: str, on_progress: callable = None) -> int:
+        """
+        Streams the url into the given file. Returns the status code.
+        on_progress is called with the number of received bytes and the total size (None if unknown).
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            return await self.stream(url, f.write, on_progress)
+
+    async def stream(self, url: str, on_chunk: callable, on_progress: callable = None) -> int:
+        """
+        Passes the body of the url chunk by chunk to on_chunk, which runs in the worker thread. Returns the status code.
+        on_progress is called with the number of received bytes and the total size (None if unknown).
+        Exceptions raised by on_chunk abort the transfer and are passed on.
+        """
+        return await self.run(self._stream, url, on_chunk, on_progress)
+
+    def _stream(self, url: str, on_chunk: callable, on_progress: callable = None) -> int:
+        received = 0
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    self.count_request(failed=True)
+                    return response.status_code
+
+                total = response.headers.get("Content-Length")
+                total = int(total) if total is not None and total.isdigit() else None
+
+                for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+                    on_chunk(chunk)
+                    received += len(chunk)
+                    if on_progress is not None:
+                        on_progress(received, total)
+        except Exception:
+            self.count_request(failed=True, bytes_received=received)
+            raise
+
+        self.count_request(bytes_received=received)
+        return 200
+
+    def count_request(self, failed: bool = False, bytes_received: int = 0) -> None:
+        with self.stats_lock:
+            self.n_requests += 1
+            if failed:
+                self.n_failed += 1
+            self.bytes_received += bytes_received
+
+    def get_stats(self) -> dict:
+        with self.stats_lock:
+            return {
+                "requests": self.n_requests,
+                "failed": self.n_failed,
+                "bytes-received": self.bytes_received,
+            }
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
+        log.trace(f"Closed store client after {self.n_requests} requests")
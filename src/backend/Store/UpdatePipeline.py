@@ -0,0 +1,246 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from dataclasses import dataclass, field
+import os
+import time
+from loguru import logger as log
+
+import globals as gl
+
+from src.Signals import Signals
+
+# Import typing
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.backend.Store.StoreBackend import StoreBackend
+
+@dataclass
+class UpdateItem:
+    kind: str # "plugin", "icon" or "wallpaper"
+    asset_id: str
+    name: str
+    directory: str
+    local_sha: str
+    new_sha: str
+    data: object = field(repr=False)
+
+    status: str = "pending" # pending, downloading, downloaded, installed or failed
+    error: str = None
+    bytes_received: int = 0
+    download_time: float = 0
+    install_time: float = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "id": self.asset_id,
+            "name": self.name,
+            "local-sha": self.local_sha,
+            "new-sha": self.new_sha,
+            "status": self.status,
+            "error": self.error,
+            "bytes-received": self.bytes_received,
+            "download-time": self.download_time,
+            "install-time": self.install_time,
+        }
+
+@dataclass
+class UpdateReport:
+    dry_run: bool
+    items: list[UpdateItem] = field(default_factory=list)
+    # True if at least one of the store indices couldn't be fetched
+    no_connection: bool = False
+
+    check_time: float = 0
+    download_time: float = 0
+    install_time: float = 0
+    total_time: float = 0
+
+    @property
+    def n_updated(self) -> int:
+        return len([item for item in self.items if item.status == "installed"])
+
+    @property
+    def n_failed(self) -> int:
+        return len([item for item in self.items if item.status == "failed"])
+
+    def to_dict(self) -> dict:
+        return {
+            "dry-run": self.dry_run,
+            "no-connection": self.no_connection,
+            "updated": self.n_updated,
+            "failed": self.n_failed,
+            "check-time": self.check_time,
+            "download-time": self.download_time,
+            "install-time": self.install_time,
+            "total-time": self.total_time,
+            "items": [item.to_dict() for item in self.items],
+        }
+
+    def summary(self) -> str:
+        if self.dry_run:
+            return f"{len(self.items)} assets can be updated (checked in {self.check_time:.2f}s)"
+        return (f"Updated {self.n_updated} of {len(self.items)} assets in {self.total_time:.2f}s "
+                f"(check: {self.check_time:.2f}s, download: {self.download_time:.2f}s, install: {self.install_time:.2f}s)")
+
+class UpdatePipeline:
+    """
+    Updates the installed store assets in stages:
+    1. The versions of all asset kinds are checked concurrently
+    2. All archives are downloaded with bounded parallelism
+    3. The plugin install scripts, pip installs and the plugin reload run one after another, because they must not overlap
+
+    With dry_run only the first stage runs and the report lists what would be updated. The store catalogue and
+    its thumbnails are left untouched then. Dry runs are not read-only though: the fetched store files still go into
+    the StoreCache (get_remote_file) and the GitHub api answers into api.json (make_api_call). Both only mirror remote
+    files, never change what is installed and let the following real run revalidate them instead of downloading them again.
+    on_progress is called with the UpdateItem whenever its status changes.
+    """
+    KINDS = ("plugins", "icons", "wallpapers")
+    DEFAULT_MAX_PARALLEL_DOWNLOADS = 4
+
+    def __init__(self, backend: "StoreBackend", kinds: tuple[str] = KINDS, dry_run: bool = False,
+                 max_parallel_downloads: int = None, on_progress: callable = None):
+        self.backend = backend
+        self.kinds = kinds
+        self.on_progress = on_progress
+
+        if max_parallel_downloads is None:
+            max_parallel_downloads = gl.settings_manager.get_app_settings().get("store", {}).get("max-parallel-downloads", self.DEFAULT_MAX_PARALLEL_DOWNLOADS)
+        self.max_parallel_downloads = max(1, max_parallel_downloads)
+
+        self.report = UpdateReport(dry_run=dry_run)
+
+    async def run(self) -> UpdateReport:
+        start = time.perf_counter()
+
+        await self.check()
+
+        if not self.report.dry_run and len(self.report.items) > 0:
+            self.prepare_plugins()
+            await self.download_all()
+            self.install_all()
+
+        self.report.total_time = time.perf_counter() - start
+        log.info(self.report.summary())
+        return self.report
+
+    def set_status(self, item: UpdateItem, status: str, error: str = None) -> None:
+        item.status = status
+        item.error = error
+        if error is not None:
+            log.error(f"Failed to update {item.kind} {item.asset_id}: {error}")
+        if self.on_progress is not None:
+            self.on_progress(item)
+
+    ## Check
+    async def check(self) -> None:
+        from src.backend.Store.StoreBackend import NoConnectionError
+
+        start = time.perf_counter()
+        checks = {
+            "plugins": self.backend.get_plugins_to_update,
+            "icons": self.backend.get_icons_to_update,
+            "wallpapers": self.backend.get_wallpapers_to_update,
+        }
+        # A dry run must not replace the entries the store shows
+        update_catalogue = not self.report.dry_run
+        results = await asyncio.gather(*[checks[kind](update_catalogue=update_catalogue) for kind in self.kinds])
+
+        for kind, result in zip(self.kinds, results):
+            if isinstance(result, NoConnectionError):
+                self.report.no_connection = True
+                continue
+            for asset in result:
+                self.report.items.append(self.create_item(kind, asset))
+
+        self.report.check_time = time.perf_counter() - start
+
+    def create_item(self, kind: str, asset) -> UpdateItem:
+        if kind == "plugins":
+            return UpdateItem("plugin", asset.plugin_id, asset.plugin_name, os.path.join(gl.PLUGIN_DIR, asset.plugin_id),
+                              asset.local_sha, asset.commit_sha, asset)
+        if kind == "icons":
+            return UpdateItem("icon", asset.icon_id, asset.icon_name, os.path.join(gl.DATA_PATH, "icons", asset.icon_id),
+                              asset.local_sha, asset.commit_sha, asset)
+        return UpdateItem("wallpaper", asset.wallpaper_id, asset.wallpaper_name, os.path.join(gl.DATA_PATH, "wallpapers", asset.wallpaper_id),
+                          asset.local_sha, asset.commit_sha, asset)
+
+    def get_items(self, kind: str, status: str) -> list[UpdateItem]:
+        return [item for item in self.report.items if item.kind == kind and item.status == status]
+
+    ## Download
+    def prepare_plugins(self) -> None:
+        # Remove the action objects of the old versions before their files get replaced
+        for item in self.get_items("plugin", "pending"):
+            try:
+                self.backend.uninstall_plugin(item.asset_id, remove_from_pages=False, remove_files=False)
+            except Exception as e:
+                log.error(e)
+
+    async def download_all(self) -> None:
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_parallel_downloads)
+        await asyncio.gather(*[self.download(item, semaphore) for item in self.report.items])
+        self.report.download_time = time.perf_counter() - start
+
+    async def download(self, item: UpdateItem, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            self.set_status(item, "downloading")
+            start = time.perf_counter()
+
+            def on_progress(received: int, total: int = None):
+                item.bytes_received = received
+
+            try:
+                result = await self.backend.download_repo(repo_url=item.data.github, directory=item.directory,
+                                                          commit_sha=item.data.commit_sha, branch_name=getattr(item.data, "branch", None),
+                                                          on_progress=on_progress)
+            except Exception as e:
+                result = e
+            item.download_time = time.perf_counter() - start
+
+        error = self.backend.get_download_error(result)
+        if error is not None:
+            self.set_status(item, "failed", error)
+        else:
+            self.set_status(item, "downloaded")
+
+    ## Install
+    def install_all(self) -> None:
+        start = time.perf_counter()
+
+        for item in self.get_items("icon", "downloaded") + self.get_items("wallpaper", "downloaded"):
+            self.set_status(item, "installed")
+
+        plugin_items = self.get_items("plugin", "downloaded")
+        for item in plugin_items:
+            item_start = time.perf_counter()
+            try:
+                self.backend.run_plugin_install_steps(item.directory)
+            except Exception as e:
+                log.error(e)
+            item.install_time = time.perf_counter() - item_start
+
+        # The old versions have been unloaded in prepare_plugins, so reload even if all downloads failed
+        if any(item.kind == "plugin" for item in self.report.items):
+            self.backend.reload_plugins()
+
+        for item in plugin_items:
+            self.set_status(item, "installed")
+            gl.signal_manager.trigger_signal(Signals.PluginInstall, item.asset_id)
+
+        self.report.install_time = time.perf_counter() - start
@@ -0,0 +1,250 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+import hashlib
+import os
+import struct
+import zlib
+
+class ZipStreamError(Exception):
+    pass
+
+class ZipStreamEntry:
+    def __init__(self, name: str, method: int, crc: int, compressed_size: int, uses_descriptor: bool, zip64: bool):
+        self.name = name
+        self.method = method
+        self.expected_crc = crc
+        self.remaining = compressed_size
+        self.uses_descriptor = uses_descriptor
+        self.zip64 = zip64
+
+        self.crc = 0
+        self.file = None
+        self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == ZipStreamExtractor.DEFLATED else None
+        # The data descriptor follows the data once the deflate stream ended
+        self.reading_descriptor = False
+
+class ZipStreamExtractor:
+    """
+    Extracts a zip archive while it is being downloaded.
+    The archive is read front to back by its local file headers, so no temporary copy of the archive is needed
+    and the central directory at the end is ignored. The crc of every entry is checked and the whole archive
+    is hashed on the way.
+
+    strip_components removes leading folders from the paths, like tar's --strip-components. GitHub archives
+    contain a single <repo>-<sha> folder whose casing might not match the repository name.
+    """
+    STORED = 0
+    DEFLATED = 8
+
+    LOCAL_FILE_HEADER = b"PK\x03\x04"
+    DATA_DESCRIPTOR = b"PK\x07\x08"
+    # Any of these means that all entries have been read
+    END_SIGNATURES = (b"PK\x01\x02", b"PK\x05\x06", b"PK\x06\x06", b"PK\x06\x07")
+
+    HEADER = struct.Struct("<4sHHHHHIIIHH")
+    ZIP64_EXTRA_ID = 0x0001
+
+    def __init__(self, destination: str, strip_components: int = 1, hash_algorithm: str = "sha256"):
+        self.destination = os.path.abspath(destination)
+        self.strip_components = strip_components
+        self.hasher = hashlib.new(hash_algorithm)
+
+        self.buffer = bytearray()
+        self.entry: ZipStreamEntry = None
+        self.finished: bool = False
+
+        self.bytes_received: int = 0
+        self.bytes_written: int = 0
+        self.n_files: int = 0
+
+        os.makedirs(self.destination, exist_ok=True)
+
+    def feed(self, chunk: bytes) -> None:
+        self.hasher.update(chunk)
+        self.bytes_received += len(chunk)
+        if self.finished:
+            return
+
+        self.buffer += chunk
+        while not self.finished:
+            if self.entry is None:
+                progressed = self.read_header()
+            elif self.entry.reading_descriptor:
+                progressed = self.read_descriptor()
+            else:
+                progressed = self.read_data()
+            if not progressed:
+                break
+
+        if self.finished:
+            self.buffer.clear()
+
+    def close(self) -> None:
+        """
+        Must be called after the last chunk. Raises ZipStreamError if the archive was incomplete.
+        """
+        if self.entry is not None and self.entry.file is not None:
+            self.entry.file.close()
+        if not self.finished:
+            raise ZipStreamError("Archive ended unexpectedly")
+
+    def abort(self) -> None:
+        if self.entry is not None and self.entry.file is not None:
+            self.entry.file.close()
+        self.entry = None
+        self.finished = True
+
+    def get_digest(self) -> str:
+        return self.hasher.hexdigest()
+
+    def read_header(self) -> bool:
+        if len(self.buffer) < 4:
+            return False
+        signature = bytes(self.buffer[:4])
+        if signature in self.END_SIGNATURES:
+            self.finished = True
+            return True
+        if signature != self.LOCAL_FILE_HEADER:
+            raise ZipStreamError(f"Unexpected signature {signature!r}")
+
+        if len(self.buffer) < self.HEADER.size:
+            return False
+        _, _, flags, method, _, _, crc, compressed_size, _, name_length, extra_length = self.HEADER.unpack_from(self.buffer)
+        header_size = self.HEADER.size + name_length + extra_length
+        if len(self.buffer) < header_size:
+            return False
+
+        raw_name = bytes(self.buffer[self.HEADER.size:self.HEADER.size + name_length])
+        extra = bytes(self.buffer[self.HEADER.size + name_length:header_size])
+        del self.buffer[:header_size]
+
+        name = raw_name.decode("utf-8" if flags & 0x800 else "cp437")
+
+        zip64_compressed_size = self.get_zip64_compressed_size(extra)
+        # Data descriptors use 8 byte sizes if the header has a zip64 field
+        zip64 = zip64_compressed_size is not None
+        if compressed_size == 0xFFFFFFFF:
+            if zip64_compressed_size is None:
+                raise ZipStreamError(f"{name} is missing its zip64 extra field")
+            compressed_size = zip64_compressed_size
+
+        if flags & 0x1:
+            raise ZipStreamError(f"{name} is encrypted")
+        if method not in (self.STORED, self.DEFLATED):
+            raise ZipStreamError(f"{name} uses the unsupported compression method {method}")
+        uses_descriptor = bool(flags & 0x8)
+        is_directory = name.endswith("/")
+        if uses_descriptor and method == self.STORED and not is_directory:
+            # The end of the entry can't be found without knowing its size
+            raise ZipStreamError(f"{name} is stored without a known size")
+
+        self.entry = ZipStreamEntry(name, method, crc, compressed_size, uses_descriptor, zip64)
+        if uses_descriptor and method == self.STORED:
+            # Directories have no data
+            self.entry.reading_descriptor = True
+        self.open_entry(self.entry)
+        return True
+
+    def get_zip64_compressed_size(self, extra: bytes) -> int:
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, size = struct.unpack_from("<HH", extra, offset)
+            if header_id == self.ZIP64_EXTRA_ID and size >= 16:
+                # Uncompressed size comes first
+                return struct.unpack_from("<Q", extra, offset + 12)[0]
+            offset += 4 + size
+
+    def open_entry(self, entry: ZipStreamEntry) -> None:
+        parts = [part for part in entry.name.split("/") if part != ""]
+        if len(parts) <= self.strip_components:
+            if not entry.name.endswith("/"):
+                raise ZipStreamError(f"{entry.name} is outside of the archive's main folder")
+            return
+
+        path = os.path.normpath(os.path.join(self.destination, *parts[self.strip_components:]))
+        if not path.startswith(self.destination + os.sep):
+            raise ZipStreamError(f"{entry.name} points outside of the destination")
+
+        if entry.name.endswith("/"):
+            os.makedirs(path, exist_ok=True)
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry.file = open(path, "wb")
+        self.n_files += 1
+
+    def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self.entry.crc = zlib.crc32(data, self.entry.crc)
+        if self.entry.file is not None:
+            self.entry.file.write(data)
+            self.bytes_written += len(data)
+
+    def read_data(self) -> bool:
+        entry = self.entry
+
+        if entry.uses_descriptor:
+            if len(self.buffer) == 0:
+                return False
+            self.write(entry.decompressor.decompress(bytes(self.buffer)))
+            if not entry.decompressor.eof:
+                self.buffer.clear()
+                return False
+            self.buffer = bytearray(entry.decompressor.unused_data)
+            entry.reading_descriptor = True
+            return True
+
+        take = min(entry.remaining, len(self.buffer))
+        if take == 0 and entry.remaining > 0:
+            return False
+        data = bytes(self.buffer[:take])
+        del self.buffer[:take]
+        entry.remaining -= take
+
+        if entry.decompressor is not None:
+            self.write(entry.decompressor.decompress(data))
+        else:
+            self.write(data)
+
+        if entry.remaining > 0:
+            return False
+
+        if entry.decompressor is not None:
+            self.write(entry.decompressor.flush())
+        self.finish_entry(entry.expected_crc)
+        return True
+
+    def read_descriptor(self) -> bool:
+        size_format = "Q" if self.entry.zip64 else "I"
+        descriptor = struct.Struct(f"<I{size_format}{size_format}")
+
+        has_signature = bytes(self.buffer[:4]) == self.DATA_DESCRIPTOR
+        offset = 4 if has_signature else 0
+        if len(self.buffer) < offset + descriptor.size:
+            return False
+
+        crc, _, _ = descriptor.unpack_from(self.buffer, offset)
+        del self.buffer[:offset + descriptor.size]
+        self.finish_entry(crc)
+        return True
+
+    def finish_entry(self, expected_crc: int) -> None:
+        entry = self.entry
+        self.entry = None
+        if entry.file is not None:
+            entry.file.close()
+        if entry.crc != expected_crc:
+            raise ZipStreamError(f"Checksum mismatch for {entry.name}")
@@ -34,6 +34,9 @@ class WallpaperPackManager:
         packs = {}
         os.makedirs(os.path.join(gl.DATA_PATH, "wallpapers"), exist_ok=True)
         for pack in os.listdir(os.path.join(gl.DATA_PATH, "wallpapers")):
+            if pack.startswith("."):
+                # Hidden folders like the staging folders of running installs
+                continue
             wallpaper_pack = WallpaperPack(os.path.join(gl.DATA_PATH, "wallpapers", pack))
             if wallpaper_pack.is_valid:
                 packs[pack] =  wallpaper_pack
@@ -0,0 +1,61 @@
+"""
+Author: Core447
+Year: 2024
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+This programm comes with ABSOLUTELY NO WARRANTY!
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import threading
+from loguru import logger as log
+
+import globals as gl
+
+from src.backend.WindowGrabber.Window import Window
+
+# Import typing
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from src.backend.WindowGrabber.Integration import Integration
+
+class ActiveWindowEventWatcher(threading.Thread):
+    """
+    Base for threads that get notified about active window changes by the compositor or the X server instead of polling.
+    Subclasses implement listen(), which blocks while reading the event stream and calls dispatch() for every change.
+    If the stream can't be opened or ends unexpectedly, on_failed is called so that the integration can fall back to polling.
+    Without an event stream listen() returns right away, which leads to the same fallback.
+    """
+    def __init__(self, integration: "Integration", on_failed: callable = None):
+        super().__init__(name="ActiveWindowEventWatcher", daemon=True)
+        self.integration = integration
+        self.on_failed = on_failed
+
+        self.last_active_window: Window = None
+
+    def run(self) -> None:
+        try:
+            self.listen()
+        except Exception as e:
+            log.warning(f"Active window event stream failed: {e}")
+
+        if gl.threads_running and self.on_failed is not None:
+            self.on_failed()
+
+    def listen(self) -> None:
+        return
+
+    def dispatch(self, window: Window) -> None:
+        if window is None:
+            return
+        if window == self.last_active_window:
+            return
+
+        self.last_active_window = window
+        self.integration.window_grabber.on_active_window_changed(window)
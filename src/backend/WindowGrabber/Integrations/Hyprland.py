@@ -14,10 +14,13 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 from re import sub
+import os
+import socket
 import threading
 import time
 from src.backend.WindowGrabber.Integration import Integration
 from src.backend.WindowGrabber.Window import Window
+from src.backend.WindowGrabber.ActiveWindowEventWatcher import ActiveWindowEventWatcher
 
 import subprocess
 import json
@@ -46,9 +49,24 @@ class Hyprland(Integration):
         self.start_active_window_change_thread()
         
     def start_active_window_change_thread(self):
+        self.active_window_change_thread = HyprlandEventWatcher(self, on_failed=self.start_polling_thread)
+        self.active_window_change_thread.start()
+
+    def start_polling_thread(self):
+        log.warning("Hyprland event socket is not available, falling back to polling")
         self.active_window_change_thread = WatchForActiveWindowChange(self)
         self.active_window_change_thread.start()
 
+    def get_event_socket_path(self) -> str:
+        signature = os.getenv("HYPRLAND_INSTANCE_SIGNATURE")
+        if signature is None:
+            return
+        # Newer versions use the runtime dir, older ones /tmp
+        for base_dir in [os.path.join(os.getenv("XDG_RUNTIME_DIR", ""), "hypr"), "/tmp/hypr"]:
+            path = os.path.join(base_dir, signature, ".socket2.sock")
+            if os.path.exists(path):
+                return path
+
     def get_all_windows(self) -> list[Window]:
         windows: list[Window] = []
         try:
@@ -84,6 +102,48 @@ class Hyprland(Integration):
 
         return None
     
+class HyprlandEventWatcher(ActiveWindowEventWatcher):
+    """
+    Reads the events of Hyprland's event socket (.socket2.sock)
+    """
+    def __init__(self, hyprland: Hyprland, on_failed: callable = None, socket_path: str = None):
+        super().__init__(integration=hyprland, on_failed=on_failed)
+        self.hyprland = hyprland
+        self.socket_path = socket_path
+
+    def listen(self) -> None:
+        socket_path = self.socket_path or self.hyprland.get_event_socket_path()
+        if socket_path is None:
+            raise RuntimeError("Event socket not found")
+
+        self.last_active_window = self.hyprland.get_active_window()
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            with sock.makefile("r", encoding="utf-8", errors="replace") as stream:
+                for line in stream:
+                    if not gl.threads_running:
+                        return
+                    self.dispatch(self.parse_event(line))
+
+        raise RuntimeError("Event socket closed")
+
+    def parse_event(self, line: str) -> Window:
+        """
+        Returns the new active window or None if the event doesn't concern it
+        """
+        event, _, data = line.rstrip("\n").partition(">>")
+        if event == "activewindow":
+            # The class can't contain commas but the title can
+            wm_class, _, title = data.partition(",")
+            if wm_class == "" and title == "":
+                # No window is focused
+                return
+            return Window(wm_class, title)
+        if event == "windowtitle":
+            # Only the address of the window is sent
+            return self.hyprland.get_active_window()
+
 class WatchForActiveWindowChange(threading.Thread):
     def __init__(self, hyprland: Hyprland):
         super().__init__(name="WatchForActiveWindowChange", daemon=True)
@@ -17,6 +17,7 @@ import threading
 import time
 from src.backend.WindowGrabber.Integration import Integration
 from src.backend.WindowGrabber.Window import Window
+from src.backend.WindowGrabber.ActiveWindowEventWatcher import ActiveWindowEventWatcher
 
 import subprocess
 import json
@@ -45,6 +46,11 @@ class Sway(Integration):
         self.start_active_window_change_thread()
 
     def start_active_window_change_thread(self):
+        self.active_window_change_thread = SwayEventWatcher(self, on_failed=self.start_polling_thread)
+        self.active_window_change_thread.start()
+
+    def start_polling_thread(self):
+        log.warning("Sway window events are not available, falling back to polling")
         self.active_window_change_thread = WatchForActiveWindowChange(self)
         self.active_window_change_thread.start()
 
@@ -90,6 +96,53 @@ class Sway(Integration):
         else:
             return Window(client.get("app_id", ""), client["name"])
 
+class SwayEventWatcher(ActiveWindowEventWatcher):
+    """
+    Reads the window events of a persistent `swaymsg -t subscribe` process
+    """
+    def __init__(self, sway: Sway, on_failed: callable = None, command: list[str] = None):
+        super().__init__(integration=sway, on_failed=on_failed)
+        self.sway = sway
+
+        if command is None:
+            command = self.sway.command_prefix.split() + ["swaymsg", "-t", "subscribe", "-m", "-r", '["window"]']
+        self.command = command
+
+    def listen(self) -> None:
+        self.last_active_window = self.sway.get_active_window()
+
+        process = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, cwd="/")
+        try:
+            buffer = ""
+            for line in process.stdout:
+                if not gl.threads_running:
+                    return
+                # Events may span multiple lines if swaymsg pretty prints them
+                buffer += line
+                try:
+                    event = json.loads(buffer)
+                except json.JSONDecodeError:
+                    continue
+                buffer = ""
+
+                self.dispatch(self.parse_event(event))
+        finally:
+            process.kill()
+            process.wait()
+
+        raise RuntimeError(f"swaymsg exited with code {process.returncode}")
+
+    def parse_event(self, event: dict[str, Any]) -> Window:
+        """
+        Returns the focused window of the event or None if the event doesn't concern it
+        """
+        if event.get("change") not in ["focus", "title"]:
+            return
+        container = event.get("container") or {}
+        if not container.get("focused"):
+            return
+        return self.sway._parse_window(container)
+
 class WatchForActiveWindowChange(threading.Thread):
     def __init__(self, sway: Sway):
         super().__init__(name="WatchForActiveWindowChange", daemon=True)
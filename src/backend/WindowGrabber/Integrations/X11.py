@@ -18,6 +18,7 @@ import threading
 import time
 from src.backend.WindowGrabber.Integration import Integration
 from src.backend.WindowGrabber.Window import Window
+from src.backend.WindowGrabber.ActiveWindowEventWatcher import ActiveWindowEventWatcher
 
 import subprocess
 import json
@@ -56,6 +57,12 @@ class X11(Integration):
 
     @log.catch
     def start_active_window_change_thread(self):
+        self.active_window_change_thread = X11EventWatcher(self, on_failed=self.start_polling_thread)
+        self.active_window_change_thread.start()
+
+    @log.catch
+    def start_polling_thread(self):
+        log.warning("X11 property events are not available, falling back to polling")
         self.active_window_change_thread = WatchForActiveWindowChange(self)
         self.active_window_change_thread.start()
 
@@ -146,6 +153,107 @@ class X11(Integration):
         except subprocess.CalledProcessError as e:
             log.error(f"An error occurred while running xprop: {e}")
         
+class X11EventWatcher(ActiveWindowEventWatcher):
+    """
+    Uses `xprop -spy`, which keeps its connection to the X server open and prints a line for every PropertyNotify.
+    One process watches _NET_ACTIVE_WINDOW on the root window, a second one the title of the active window.
+    xprop is already required by the rest of this integration. If it can't be started or exits, on_failed falls back to polling.
+
+    command: replaces the xprop call watching the active window
+    title_command: replaces the xprop call watching the title, "{window_id}" gets replaced with the id of the window
+    """
+    def __init__(self, x11: X11, on_failed: callable = None, command: list[str] = None, title_command: list[str] = None):
+        super().__init__(integration=x11, on_failed=on_failed)
+        self.x11 = x11
+
+        if command is None:
+            command = ["xprop", "-root", "-spy", "_NET_ACTIVE_WINDOW"]
+        self.command = command
+        if title_command is None:
+            title_command = ["xprop", "-id", "{window_id}", "-spy", "WM_NAME"]
+        self.title_command = title_command
+
+        self.lock = threading.Lock()
+        self.active_window_id: str = None
+        self.active_window_class: str = None
+        self.title_process: subprocess.Popen = None
+
+    def listen(self) -> None:
+        self.last_active_window = self.x11.get_active_window()
+
+        # _run_command modifies the list in flatpaks
+        process = self.x11._run_command(list(self.command))
+        if process is None:
+            raise RuntimeError(f"Failed to start {self.command[0]}")
+        try:
+            for line in iter(process.stdout.readline, b""):
+                if not gl.threads_running:
+                    return
+                window_id = self.parse_active_window_id(line.decode(errors="replace"))
+                if window_id is None:
+                    continue
+                self.on_active_window_id_changed(window_id)
+        finally:
+            process.kill()
+            process.wait()
+            with self.lock:
+                self.stop_title_process()
+
+        raise RuntimeError(f"{self.command[0]} exited with code {process.returncode}")
+
+    def parse_active_window_id(self, line: str) -> str:
+        # _NET_ACTIVE_WINDOW(WINDOW): window id # 0x3a00007
+        split = line.strip().split()
+        if len(split) == 0:
+            return
+        return split[-1]
+
+    def parse_title(self, line: str) -> str:
+        # WM_NAME(STRING) = "title"
+        split = line.split('"', 1)
+        if len(split) < 2:
+            return
+        return split[1].rstrip('"\n')
+
+    def on_active_window_id_changed(self, window_id: str) -> None:
+        with self.lock:
+            if window_id == self.active_window_id:
+                return
+            self.active_window_id = window_id
+            self.stop_title_process()
+
+            if window_id == "0x0":
+                # No window is focused
+                return
+            self.active_window_class = self.x11.get_class(window_id)
+
+            # xprop -spy prints the current title right away, so this also reports the new window
+            self.title_process = self.x11._run_command([arg.replace("{window_id}", window_id) for arg in self.title_command])
+            if self.title_process is None:
+                return
+            threading.Thread(target=self.read_titles, args=(self.title_process,), name="X11TitleWatcher", daemon=True).start()
+
+    def read_titles(self, process: subprocess.Popen) -> None:
+        for line in iter(process.stdout.readline, b""):
+            if not gl.threads_running:
+                break
+            title = self.parse_title(line.decode(errors="replace"))
+            with self.lock:
+                if process is not self.title_process:
+                    # The active window changed in the meantime
+                    break
+                if None in [title, self.active_window_class]:
+                    continue
+                window = Window(self.active_window_class, title)
+            self.dispatch(window)
+        process.wait()
+
+    def stop_title_process(self) -> None:
+        if self.title_process is None:
+            return
+        self.title_process.kill()
+        self.title_process = None
+
 class WatchForActiveWindowChange(threading.Thread):
     def __init__(self, x11: X11):
         super().__init__(name="WatchForActiveWindowChange", daemon=True)
@@ -104,23 +104,12 @@ class WindowGrabber:
         # log.info(f"Active window changed to: {window}")
         for deck_controller in gl.deck_manager.deck_controller:
             found_page = False
-            for page_path in gl.page_manager.get_pages():
-                abs_path = os.path.abspath(page_path)
-                if abs_path not in gl.page_manager.auto_change_info:
-                    continue
-                info = gl.page_manager.auto_change_info[abs_path]
-                wm_regex = info.get("wm_class")
-                title_regex = info.get("title")
-                enabled = info.get("enable", False)
-                decks = info.get("decks", [])
-                if not enabled:
-                    continue
-
-                if self.get_is_window_matching(window, wm_regex, title_regex):
+            # Only the rules of enabled pages that are assigned to this deck
+            for rule in gl.page_manager.get_auto_change_rules_for_deck(deck_controller.serial_number()):
+                page_path = rule.page_path
+                if rule.matches(window.wm_class, window.title):
                     if not deck_controller.deck.is_open():
                         return
-                    if deck_controller.serial_number() not in decks:
-                        continue
 
                     if deck_controller.active_page.json_path != page_path:
                         log.debug(f"Auto changing page: {page_path} on deck {deck_controller.deck.get_serial_number()}")
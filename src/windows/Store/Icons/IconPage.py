@@ -47,6 +47,8 @@ import globals as gl
 
 
 class IconPage(StorePage):
+    CATALOGUE_KIND = "icons"
+
     def __init__(self, store: "Store"):
         super().__init__(store=store)
         self.store = store
@@ -55,21 +57,11 @@ class IconPage(StorePage):
 
         threading.Thread(target=self.load, name="load_icon_page").start()
 
-    @log.catch
-    def load(self):
-        self.set_loading()
-        icons: list[IconData] = asyncio.run(self.store.backend.get_all_icons())
-        if isinstance(icons, NoConnectionError):
-            self.show_connection_error()
-            return
-        for icon in icons:
-            if icon.is_compatible:
-                section = self.compatible_section
-            else:
-                section = self.incompatible_section
-            GLib.idle_add(section.append_child, IconPreview(icon_page=self, icon_data=icon))
+    def fetch_entries(self) -> list[IconData]:
+        return asyncio.run(self.store.backend.get_all_icons())
 
-        self.set_loaded()
+    def create_preview(self, icon: IconData) -> "IconPreview":
+        return IconPreview(icon_page=self, icon_data=icon)
 
 
 class IconPreview(StorePreview):
@@ -108,7 +100,7 @@ class IconPreview(StorePreview):
         self.set_description(description)
 
     def install(self):
-        asyncio.run(self.store.backend.install_icon(icon_data=self.icon_data))
+        asyncio.run(self.store.backend.install_icon(icon_data=self.icon_data, on_progress=self.on_install_progress))
         self.set_install_state(1)
 
     def uninstall(self):
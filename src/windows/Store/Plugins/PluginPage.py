@@ -46,6 +46,8 @@ import globals as gl
 
 
 class PluginPage(StorePage):
+    CATALOGUE_KIND = "plugins"
+
     def __init__(self, store: "Store"):
         super().__init__(store=store)
         self.store = store
@@ -54,21 +56,11 @@ class PluginPage(StorePage):
 
         threading.Thread(target=self.load, name="load_plugin_page").start()
 
-    @log.catch
-    def load(self):
-        self.set_loading()
-        plugins: list[PluginData] = self.store.backend.get_all_plugins()
-        if isinstance(plugins, NoConnectionError):
-            self.show_connection_error()
-            return
-        for plugin in plugins:
-            if plugin.is_compatible:
-                section = self.compatible_section
-            else:
-                section = self.incompatible_section
-            GLib.idle_add(section.append_child, PluginPreview(plugin_page=self, plugin_data=plugin))
-
-        self.set_loaded()
+    def fetch_entries(self) -> list[PluginData]:
+        return self.store.backend.get_all_plugins()
+
+    def create_preview(self, plugin: PluginData) -> "PluginPreview":
+        return PluginPreview(plugin_page=self, plugin_data=plugin)
 
     def check_required_version(self, app_version_to_check: str, is_min_app_version: bool = False):
         if is_min_app_version:
@@ -108,7 +100,7 @@ class PluginPreview(StorePreview):
         self.set_description(description)
 
     def install(self):
-        asyncio.run(self.store.backend.install_plugin(plugin_data=self.plugin_data))
+        asyncio.run(self.store.backend.install_plugin(plugin_data=self.plugin_data, on_progress=self.on_install_progress))
         self.set_install_state(1)
 
     def uninstall(self):
@@ -151,7 +151,16 @@ class StorePreview(Gtk.FlowBoxChild):
         self.install_spinner = Gtk.Spinner(spinning=False, visible=True, halign=Gtk.Align.CENTER, hexpand=True)
         self.install_spinner_box.append(self.install_spinner)
 
+        # Replaces the spinner once the download reports its progress
+        self.install_progress_bar = Gtk.ProgressBar(visible=False, hexpand=True, valign=Gtk.Align.CENTER,
+                                                    margin_start=10, margin_end=10)
+        self.install_spinner_box.append(self.install_progress_bar)
+        self.last_install_progress_update: float = 0
+
     def show_install_spinner(self, show: bool = True):
+        self.install_progress_bar.set_visible(False)
+        self.install_progress_bar.set_fraction(0)
+        self.install_spinner.set_visible(True)
         if show:
             self.install_uninstall_button.set_visible(False)
             self.install_spinner_box.set_visible(True)
@@ -161,6 +170,29 @@ class StorePreview(Gtk.FlowBoxChild):
             self.install_spinner_box.set_visible(False)
             self.install_spinner.set_spinning(False)
 
+    def on_install_progress(self, received: int, total: int = None):
+        """
+        Called from the download thread for every received chunk
+        """
+        # Limit the ui updates
+        now = time.monotonic()
+        if now - self.last_install_progress_update < 0.1 and received != total:
+            return
+        self.last_install_progress_update = now
+        GLib.idle_add(self.set_install_progress, received, total)
+
+    def set_install_progress(self, received: int, total: int = None):
+        if not self.install_spinner_box.get_visible():
+            # The install already finished
+            return
+        self.install_spinner.set_visible(False)
+        self.install_progress_bar.set_visible(True)
+        if total:
+            self.install_progress_bar.set_fraction(min(1, received / total))
+        else:
+            # GitHub doesn't always send the size of the archive
+            self.install_progress_bar.pulse()
+
     def set_image(self, image:Image):
         if image is None:
             return
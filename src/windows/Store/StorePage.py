@@ -22,6 +22,7 @@ from gi.repository import Gtk, GLib
 
 # Import python modules
 from fuzzywuzzy import fuzz
+import asyncio
 import threading
 from loguru import logger as log
 
@@ -29,6 +30,8 @@ from loguru import logger as log
 from src.windows.Store.InfoPage import InfoPage
 from GtkHelper.GtkHelper import ErrorPage
 from src.windows.Store.NoConnectionError import NoConnectionError
+from src.backend.Store.StoreBackend import NoConnectionError as StoreNoConnectionError
+from src.backend.Store.StoreCatalogue import StoreCatalogue
 from packaging import version
 
 # Typing
@@ -40,8 +43,14 @@ if TYPE_CHECKING:
 import globals as gl
 
 class StorePage(Gtk.Stack):
+    # Kind of the store catalogue whose snapshot is shown while the store gets fetched
+    CATALOGUE_KIND: str = None
+
     def __init__(self, store: "Store"):
         super().__init__()
+        # catalogue key: (section, preview, fields of the shown entry)
+        self.previews: dict[str, tuple[StorePageSection, Gtk.Widget, dict]] = {}
+
         self.set_hexpand(True)
         self.set_vexpand(True)
         self.set_margin_start(15)
@@ -107,6 +116,62 @@ class StorePage(Gtk.Stack):
         GLib.idle_add(self.spinner.set_spinning, False)
         GLib.idle_add(self.section_switcher.set_visible, True)
 
+    @log.catch
+    def load(self):
+        # Show the entries of the last visit right away and update them once the store has been fetched
+        entries = asyncio.run(self.store.backend.get_catalogue_entries(self.CATALOGUE_KIND))
+        if len(entries) > 0:
+            self.apply_entries(entries)
+            self.set_loaded()
+        else:
+            self.set_loading()
+
+        fetched_entries = self.fetch_entries()
+        if isinstance(fetched_entries, StoreNoConnectionError):
+            if len(entries) == 0:
+                self.show_connection_error()
+            return
+        self.apply_entries(fetched_entries)
+
+        self.set_loaded()
+
+    def fetch_entries(self) -> list:
+        raise NotImplementedError
+
+    def create_preview(self, data) -> Gtk.Widget:
+        raise NotImplementedError
+
+    def apply_entries(self, entries: list):
+        """
+        Adds previews for new entries and removes the ones of entries that are gone.
+        Entries of unchanged assets keep their preview, the others get a new one.
+        The key of entries following a branch stays the same between commits, so the fields are compared as well.
+        """
+        keys = set()
+        for data in entries:
+            key = StoreCatalogue.get_key(data)
+            keys.add(key)
+            fields = StoreCatalogue.get_fields(data)
+            if key in self.previews:
+                old_section, old_preview, old_fields = self.previews[key]
+                if old_fields == fields:
+                    continue
+                GLib.idle_add(old_section.remove_child, old_preview)
+
+            if data.is_compatible:
+                section = self.compatible_section
+            else:
+                section = self.incompatible_section
+            preview = self.create_preview(data)
+            self.previews[key] = (section, preview, fields)
+            GLib.idle_add(section.append_child, preview)
+
+        for key in list(self.previews.keys()):
+            if key in keys:
+                continue
+            section, preview, _ = self.previews.pop(key)
+            GLib.idle_add(section.remove_child, preview)
+
     def set_info_visible(self, visible:bool):
         if visible:
             self.set_visible_child(self.info_page)
@@ -64,6 +64,11 @@ class StorePageSection(Gtk.Stack):
         self.flow_box.append(item)
         self.set_visible_child(self.main_box)
 
+    def remove_child(self, item):
+        self.flow_box.remove(item)
+        if self.flow_box.get_child_at_index(0) is None:
+            self.set_visible_child(self.nothing_here)
+
     def on_search_changed(self, search_entry):
         self.flow_box.invalidate_filter()
         self.flow_box.invalidate_sort()
@@ -46,6 +46,8 @@ if TYPE_CHECKING:
     from src.windows.Store.Store import Store
 
 class WallpaperPage(StorePage):
+    CATALOGUE_KIND = "wallpapers"
+
     def __init__(self, store: "Store"):
         super().__init__(store=store)
         self.store = store
@@ -53,21 +55,11 @@ class WallpaperPage(StorePage):
 
         threading.Thread(target=self.load, name="load_wallpaper_page").start()
 
-    @log.catch
-    def load(self):
-        self.set_loading()
-        wallpapers = asyncio.run(self.store.backend.get_all_wallpapers())
-        if isinstance(wallpapers, NoConnectionError):
-            self.show_connection_error()
-            return
-        for wallpaper in wallpapers:
-            if wallpaper.is_compatible:
-                section = self.compatible_section
-            else:
-                section = self.incompatible_section
-            GLib.idle_add(section.append_child, WallpaperPreview(wallpaper_page=self, wallpaper_data=wallpaper))
+    def fetch_entries(self) -> list[WallpaperData]:
+        return asyncio.run(self.store.backend.get_all_wallpapers())
 
-        self.set_loaded()
+    def create_preview(self, wallpaper: WallpaperData) -> "WallpaperPreview":
+        return WallpaperPreview(wallpaper_page=self, wallpaper_data=wallpaper)
 
 
 class WallpaperPreview(StorePreview):
@@ -102,7 +94,7 @@ class WallpaperPreview(StorePreview):
         self.set_description(description)
 
     def install(self):
-        asyncio.run(self.store.backend.install_wallpaper(wallpaper_data=self.wallpaper_data))
+        asyncio.run(self.store.backend.install_wallpaper(wallpaper_data=self.wallpaper_data, on_progress=self.on_install_progress))
         self.set_install_state(1)
 
     def uninstall(self):
@@ -32,6 +32,7 @@ import globals as gl
 
 # Import own modules
 from src.backend.DeckManagement.ImageHelpers import image2pixbuf, is_transparent
+from src.Signals import Signals
 
 class BackgroundGroup(Adw.PreferencesGroup):
     def __init__(self, settings_page):
@@ -94,6 +95,10 @@ class BackgroundMediaRow(Adw.PreferencesRow):
         self.media_selector_button = Gtk.Button(label=gl.lm.get("select"), css_classes=["page-settings-media-selector"])
         self.media_selector.append(self.media_selector_button)
 
+        # Shown while the frames of the background video are being cached
+        self.caching_bar = Gtk.ProgressBar(show_text=True, visible=False, margin_top=10)
+        self.media_selector.append(self.caching_bar)
+
         self.loop_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, hexpand=True, margin_bottom=15)
         self.config_box.append(self.loop_box)
 
@@ -114,6 +119,7 @@ class BackgroundMediaRow(Adw.PreferencesRow):
 
         # Signals get directly disconnected by disconnect_signals() but we have to connect them beforehand to prevent errors
         self.connect_signals()
+        gl.signal_manager.connect_signal(signal=Signals.VideoCacheProgress, callback=self.on_video_cache_progress)
 
         self.load_defaults_from_page()
 
@@ -164,6 +170,8 @@ class BackgroundMediaRow(Adw.PreferencesRow):
 
         # Set config box state
         self.config_box.set_visible(overwrite)
+        # Shown again by the next progress update if the video of this page is still being cached
+        self.caching_bar.set_visible(False)
 
         self.set_thumbnail(file_path)
 
@@ -209,6 +217,15 @@ class BackgroundMediaRow(Adw.PreferencesRow):
 
         deck_controller.active_page.reload_similar_pages()
 
+    def on_video_cache_progress(self, video_path: str, progress: float) -> None:
+        video = self.settings_page.deck_page.deck_controller.background.video
+        if video is None or video.video_path != video_path:
+            return
+
+        self.caching_bar.set_visible(progress < 1)
+        self.caching_bar.set_fraction(progress)
+        self.caching_bar.set_text(f"{gl.lm.get('page-settings-deck-background-caching')} {floor(progress * 100)}%")
+
     def on_choose_image(self, button):
         self.settings_page.deck_page.deck_controller.active_page.dict.setdefault("background", {})
         media_path = self.settings_page.deck_page.deck_controller.active_page.dict["background"].setdefault("path", None)
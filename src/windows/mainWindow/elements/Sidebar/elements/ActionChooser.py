@@ -21,9 +21,10 @@ from src.backend.PluginManager.ActionInputSupport import ActionInputSupport
 
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
 
 # Import Python modules
+import threading
 from loguru import logger as log
 from fuzzywuzzy import fuzz, process
 
@@ -51,6 +52,8 @@ class ActionChooser(Gtk.Box):
         self.callback_kwargs = None
         self.identifier: InputIdentifier = None
 
+        self.loading_lazy_plugins: bool = False
+
         self.build()
 
     def build(self):
@@ -77,6 +80,10 @@ class ActionChooser(Gtk.Box):
         self.header = Gtk.Label(label=gl.lm.get("action-chooser.header"), xalign=0, css_classes=["page-header"], margin_start=20, margin_top=30)
         self.main_box.append(self.header)
 
+        # Shown while the plugins that haven't been needed so far get loaded
+        self.loading_spinner = Gtk.Spinner(spinning=False, visible=False, margin_top=40)
+        self.main_box.append(self.loading_spinner)
+
         self.plugin_group = PluginGroup(self, margin_top=40)
         self.main_box.append(self.plugin_group)
 
@@ -101,10 +108,39 @@ class ActionChooser(Gtk.Box):
         self.callback_args = callback_args
         self.callback_kwargs = callback_kwargs
         self.identifier = identifier
+
+        # Plugins that haven't been needed so far get loaded once the user wants to pick an action
+        if gl.plugin_manager.has_lazy_plugins():
+            self.load_lazy_plugins()
+
         self.plugin_group.set_identifier(identifier)
 
         self.sidebar.main_stack.set_visible_child(self)
 
+    def load_lazy_plugins(self) -> None:
+        if self.loading_lazy_plugins:
+            return
+        self.loading_lazy_plugins = True
+
+        self.loading_spinner.set_visible(True)
+        self.loading_spinner.start()
+        threading.Thread(target=self._load_lazy_plugins, name="load_lazy_plugins", daemon=True).start()
+
+    def _load_lazy_plugins(self) -> None:
+        try:
+            gl.plugin_manager.load_all_lazy_plugins()
+        except Exception as e:
+            log.error(f"Failed to load plugins: {e}")
+        GLib.idle_add(self.on_lazy_plugins_loaded)
+
+    def on_lazy_plugins_loaded(self) -> None:
+        self.loading_lazy_plugins = False
+        self.loading_spinner.stop()
+        self.loading_spinner.set_visible(False)
+
+        self.plugin_group.update()
+        self.plugin_group.set_identifier(self.identifier)
+
     def on_back_button_click(self, button):
         self.sidebar.main_stack.set_visible_child_name("configurator_stack")
 
@@ -136,7 +172,7 @@ class PluginGroup(BetterPreferencesGroup):
     def update(self):
         self.clear()
         self.expander = []
-        for plugin_id, plugin_dir in gl.plugin_manager.get_plugins().items():
+        for plugin_id, plugin_dir in gl.plugin_manager.get_plugins(load_lazy_plugins=False).items():
             plugin_name = plugin_dir["object"].plugin_name
             expander = PluginExpander(self, plugin_name, plugin_dir)
             self.add(expander)
@@ -89,8 +89,8 @@ class MissingRow(Adw.PreferencesRow):
             self.show_install_error()
             return
         # Install plugin
-        success = asyncio.run(gl.store_backend.install_plugin(plugin))
-        if success == 404:
+        response = asyncio.run(gl.store_backend.install_plugin(plugin))
+        if gl.store_backend.get_download_error(response) is not None:
             self.show_install_error()
             return
         
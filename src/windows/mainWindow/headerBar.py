@@ -112,6 +112,8 @@ class HeaderBar(Gtk.HeaderBar):
     def on_quit(self, action, parameter):
         # Close all decks
         gl.deck_manager.close_all()
+        # os._exit skips the atexit handlers - write the settings that are still waiting for their debounced save
+        gl.settings_manager.flush()
         # TODO: Find better way - sys.exit doesn't work because it waits for the threads to finish
         os._exit(0)
 
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The app is run from the repository root and imports its modules from there
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def gl(monkeypatch, tmp_path):
+    """
+    The globals module, imported with a temporary data path instead of pytest's arguments
+    """
+    pytest.importorskip("Pyro5")
+    monkeypatch.setattr(sys, "argv", [sys.argv[0], "--data", str(tmp_path)])
+    import globals as gl
+    monkeypatch.setattr(gl, "threads_running", True, raising=False)
+    return gl
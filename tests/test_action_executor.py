@@ -0,0 +1,62 @@
+import threading
+import time
+
+from src.backend.DeckManagement.Subclasses.action_executor import ActionExecutor
+
+
+def make_executor(max_workers: int = 8) -> ActionExecutor:
+    executor = ActionExecutor(name="test", max_workers=max_workers)
+    executor.BLOCKED_THRESHOLD = 0.2
+    return executor
+
+
+def wait_for_completed(executor: ActionExecutor, n: int) -> None:
+    deadline = time.monotonic() + 10
+    while executor.get_stats()["completed"] < n:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_blocked_task_keeps_the_order_of_its_key():
+    executor = make_executor()
+    events = []
+
+    def down():
+        events.append("down-start")
+        time.sleep(0.8)
+        events.append("down-end")
+
+    executor.submit("key", down)
+    executor.submit("key", events.append, "up")
+    wait_for_completed(executor, 2)
+    executor.shutdown()
+
+    assert executor.get_stats()["handed-off"] == 1
+    assert events == ["down-start", "down-end", "up"]
+
+
+def test_blocked_task_gives_up_its_worker_slot():
+    executor = make_executor(max_workers=1)
+    release = threading.Event()
+    other_done = threading.Event()
+    events = []
+
+    def blocked():
+        release.wait(10)
+        events.append("blocked")
+
+    executor.submit("blocked-key", blocked)
+    executor.submit("blocked-key", events.append, "blocked-up")
+    executor.submit("other-key", lambda: (events.append("other"), other_done.set()))
+
+    # The other key runs on the freed slot while the blocked task still holds its own key
+    assert other_done.wait(5)
+    assert events == ["other"]
+
+    release.set()
+    wait_for_completed(executor, 3)
+    # The blocked thread didn't come back into the pool
+    assert executor.n_workers == 1
+    executor.shutdown()
+
+    assert events == ["other", "blocked", "blocked-up"]
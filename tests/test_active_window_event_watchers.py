@@ -0,0 +1,139 @@
+import json
+import socket
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.backend.WindowGrabber.Window import Window
+
+
+class FakeIntegration:
+    """
+    Stands in for an integration so that the watchers can run without a compositor or X server
+    """
+    def __init__(self, active_window: Window = None):
+        self.active_window = active_window
+        self.changes: list[Window] = []
+        self.window_grabber = SimpleNamespace(on_active_window_changed=self.changes.append)
+
+    def get_active_window(self) -> Window:
+        return self.active_window
+
+
+def run_watcher(watcher) -> None:
+    failed = threading.Event()
+    watcher.on_failed = failed.set
+    watcher.start()
+    # The watchers end with on_failed once their stream is closed
+    assert failed.wait(10)
+
+
+def python_command(script: str) -> list[str]:
+    return [sys.executable, "-c", script]
+
+
+def test_hyprland_events(gl, tmp_path):
+    pytest.importorskip("gi")
+    from src.backend.WindowGrabber.Integrations.Hyprland import HyprlandEventWatcher
+
+    lines = [
+        "workspace>>2",
+        "activewindow>>firefox,Mozilla Firefox",
+        "activewindow>>kitty,vim a,b.py",
+        "windowtitle>>5612d3b13cc0",
+        "activewindow>>,",
+    ]
+
+    socket_path = str(tmp_path / ".socket2.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def serve():
+        connection, _ = server.accept()
+        with connection:
+            connection.sendall("".join(f"{line}\n" for line in lines).encode())
+        server.close()
+    threading.Thread(target=serve, daemon=True).start()
+
+    # Title changes only send the address of the window
+    hyprland = FakeIntegration(active_window=Window("kitty", "vim c.py"))
+    watcher = HyprlandEventWatcher(hyprland, socket_path=socket_path)
+    run_watcher(watcher)
+
+    assert hyprland.changes == [
+        Window("firefox", "Mozilla Firefox"),
+        Window("kitty", "vim a,b.py"),
+        Window("kitty", "vim c.py"),
+    ]
+
+
+def test_sway_events(gl):
+    pytest.importorskip("gi")
+    from src.backend.WindowGrabber.Integrations.Sway import Sway, SwayEventWatcher
+
+    events = [
+        {"change": "new", "container": {"focused": False, "app_id": "kitty", "name": "kitty"}},
+        {"change": "focus", "container": {"focused": True, "app_id": "firefox", "name": "Mozilla Firefox"}},
+        {"change": "title", "container": {"focused": False, "app_id": "kitty", "name": "vim"}},
+        {"change": "title", "container": {"focused": True, "window_properties": {"class": "Steam", "title": "Library"}}},
+    ]
+    # swaymsg prints one event per line with -r but pretty prints them without it
+    output = json.dumps(events[0]) + "\n" + "".join(json.dumps(event, indent=2) + "\n" for event in events[1:])
+
+    sway = FakeIntegration()
+    sway._parse_window = lambda client: Sway._parse_window(sway, client)
+    watcher = SwayEventWatcher(sway, command=python_command(f"import sys; sys.stdout.write({output!r})"))
+    run_watcher(watcher)
+
+    assert sway.changes == [
+        Window("firefox", "Mozilla Firefox"),
+        Window("Steam", "Library"),
+    ]
+
+
+def test_x11_events(gl):
+    pytest.importorskip("gi")
+    from src.backend.WindowGrabber.Integrations.X11 import X11, X11EventWatcher
+
+    x11 = FakeIntegration()
+    x11.flatpak = False
+    x11._run_command = lambda command: X11._run_command(x11, command)
+    x11.get_class = {"0x3a00007": "kitty", "0x4c00003": "firefox"}.get
+
+    # Waits between the changes so that every title process gets read before it's replaced
+    command = python_command(
+        "import time\n"
+        "for line in ['_NET_ACTIVE_WINDOW(WINDOW): window id # 0x3a00007', '_NET_ACTIVE_WINDOW(WINDOW): window id # 0x0',\n"
+        "             '_NET_ACTIVE_WINDOW(WINDOW): window id # 0x4c00003']:\n"
+        "    print(line, flush=True)\n"
+        "    time.sleep(0.5)\n"
+    )
+    title_command = python_command(
+        "import sys, time\n"
+        "print('WM_NAME(STRING) = \"title of ' + sys.argv[1] + '\"', flush=True)\n"
+        "time.sleep(5)\n"
+    ) + ["{window_id}"]
+
+    watcher = X11EventWatcher(x11, command=command, title_command=title_command)
+    run_watcher(watcher)
+
+    assert x11.changes == [
+        Window("kitty", "title of 0x3a00007"),
+        Window("firefox", "title of 0x4c00003"),
+    ]
+    assert watcher.title_process is None
+
+
+def test_x11_parsers(gl):
+    pytest.importorskip("gi")
+    from src.backend.WindowGrabber.Integrations.X11 import X11EventWatcher
+
+    watcher = X11EventWatcher(FakeIntegration())
+
+    assert watcher.parse_active_window_id("_NET_ACTIVE_WINDOW(WINDOW): window id # 0x3a00007\n") == "0x3a00007"
+    assert watcher.parse_active_window_id("\n") is None
+    assert watcher.parse_title('WM_NAME(STRING) = "vim "quoted".py"\n') == 'vim "quoted".py'
+    assert watcher.parse_title("WM_NAME:  not found.\n") is None
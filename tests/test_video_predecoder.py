@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from src.backend.DeckManagement.Subclasses.video_predecoder import VideoPreDecoder
+
+
+def write_video(path: str, n_frames: int) -> None:
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (16, 16))
+    for n in range(n_frames):
+        # The frame index survives the lossy compression
+        writer.write(np.full((16, 16, 3), n * 8, dtype=np.uint8))
+    writer.release()
+
+
+def run_predecoder(video_path: str, n_frames: int, process_frame: callable) -> tuple[VideoPreDecoder, dict]:
+    decoded = {}
+    done = threading.Event()
+
+    def on_progress(progress: float):
+        if progress >= 1:
+            done.set()
+
+    predecoder = VideoPreDecoder(video_path, n_frames, process_frame=process_frame, on_frames=decoded.update,
+                                 on_progress=on_progress, chunk_size=10, read_ahead=100)
+    predecoder.start()
+    assert done.wait(10)
+    return predecoder, decoded
+
+
+def test_failed_chunk_is_left_to_the_caller(tmp_path):
+    video_path = str(tmp_path / "video.avi")
+    write_video(video_path, 30)
+
+    def process_frame(frame):
+        if round(frame.getpixel((8, 8))[0] / 8) in range(10, 20):
+            raise ValueError("broken frame")
+        return frame.copy()
+
+    predecoder, decoded = run_predecoder(video_path, 30, process_frame)
+
+    assert predecoder.is_done()
+    assert sorted(decoded) == list(range(0, 10)) + list(range(20, 30))
+    # Waiting for the failed chunk would freeze the video
+    assert not any(predecoder.will_decode(n) for n in range(10, 20))
+    assert all(predecoder.will_decode(n) for n in decoded)
+
+
+def test_overestimated_frame_count(tmp_path):
+    video_path = str(tmp_path / "video.avi")
+    write_video(video_path, 25)
+
+    predecoder, decoded = run_predecoder(video_path, 30, lambda frame: frame.copy())
+
+    assert sorted(decoded) == list(range(25))
+    assert not any(predecoder.will_decode(n) for n in range(25, 30))
+
+
+def test_stopped_predecoder_decodes_nothing(tmp_path):
+    video_path = str(tmp_path / "video.avi")
+    write_video(video_path, 10)
+
+    predecoder = VideoPreDecoder(video_path, 10, process_frame=lambda frame: frame, on_frames=lambda frames: None)
+    predecoder.stop()
+
+    assert not predecoder.will_decode(0)